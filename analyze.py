@@ -0,0 +1,103 @@
+"""
+Reports over the whole run archive.
+
+    python analyze.py                               # run_history/ (+ legacy run_history.json)
+    python analyze.py --workers 8 --json report.json
+    python analyze.py --generate 10000000 --store /tmp/archive   # synthetic archive for timing
+
+Streams the store through mmap with flat memory; see src/analytics.py.
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+from src.analytics import analyze_store
+from src.actions import ACTIONS
+from src.storage import RunHistoryStore
+
+SCARS = ("Shattered Ribs", "Fractured Mind", "Hollow Gaze", "Trembling Hands")
+ENDINGS = ("TERMINATED", "TERMINATED", "TERMINATED", "MANUAL_EXIT", "ASCENDED")
+
+
+def generate(store, runs, seed=0, batch=100000):
+    """Appends `runs` synthetic run summaries to store."""
+    rng = random.Random(seed)
+    names = [f"Player{i}" for i in range(50)] + ["Traveler"] * 50
+    decisions = list(ACTIONS) + ["None"]
+    while runs > 0:
+        n = min(batch, runs)
+        summaries = []
+        for _ in range(n):
+            ending = rng.choice(ENDINGS)
+            hp = 0 if ending == "TERMINATED" else rng.randrange(5, 101, 5)
+            summaries.append({
+                "player_name": rng.choice(names),
+                "fights": int(rng.expovariate(0.2)),
+                "dominant_decision": rng.choice(decisions),
+                "final_hp": f"{hp}/100",
+                "scars": rng.sample(SCARS, rng.choice((0, 0, 1, 1, 2))),
+                "ending_type": ending,
+            })
+        store.append_many(summaries)
+        runs -= n
+
+
+def print_report(report, players):
+    print(f"runs           : {report.runs:,} ({report.skipped:,} skipped)")
+    if not report.runs:
+        return
+    quantiles = " / ".join(f"{report.fights.quantile(q):.1f}" for q in (0.5, 0.9, 0.99))
+    print(f"fights p50/p90/p99: {quantiles}")
+    hp = report.final_hp.quantile(0.5)
+    if hp is not None:
+        print(f"final HP p50   : {hp:.0f}%")
+
+    print("\nSurvival (P[more than N fights])")
+    for fights, alive in report.survival()[:30]:
+        print(f"  {fights:>4}  {alive:6.1%}  {'#' * round(alive * 40)}")
+
+    print("\nDominant decision x ending")
+    endings = sorted({ending for _, ending in report.outcomes})
+    print(f"  {'':<10}" + "".join(f"{ending:>14}" for ending in endings))
+    for decision in sorted({decision for decision, _ in report.outcomes}):
+        print(f"  {decision:<10}" + "".join(f"{report.outcomes.get((decision, e), 0):>14,}" for e in endings))
+
+    print("\nScars")
+    for scar, n in report.scars.most_common(10):
+        print(f"  {scar:<20} {n:>12,}  {n / report.runs:6.1%}")
+    print("  per run: " + ", ".join(f"{k}: {v:,}" for k, v in sorted(report.scar_counts.items())))
+
+    print("\nPlayers (runs, mean fights, best, fights gained per run)")
+    for name, n, mean, best, slope in report.trends(players):
+        print(f"  {name[:16]:<16} {n:>10,} {mean:8.2f} {best:6} {slope:+10.5f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Outplay run archive analytics")
+    parser.add_argument("--store", default="run_history", help="Run history directory.")
+    parser.add_argument("--legacy", default="run_history.json", help="Legacy JSON array of runs.")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU).")
+    parser.add_argument("--players", type=int, default=10, help="Players to list.")
+    parser.add_argument("--json", metavar="FILE", help="Also write the report as JSON.")
+    parser.add_argument("--generate", type=int, metavar="N", help="First append N synthetic runs to the store.")
+    args = parser.parse_args()
+
+    store = RunHistoryStore(args.store, legacy_file=args.legacy)
+    if args.generate:
+        generate(store, args.generate)
+
+    started = time.perf_counter()
+    report = analyze_store(store, workers=args.workers)
+    elapsed = time.perf_counter() - started
+    print_report(report, args.players)
+    size = sum(os.path.getsize(p) for p in store.segment_paths(migrate=False))
+    print(f"\nScanned {size / 1e6:,.1f} MB in {elapsed:.2f}s ({report.runs / max(elapsed, 1e-9):,.0f} runs/s)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report.to_dict(args.players), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""
+Offline benchmark suite for Outplay's hot paths.
+
+    python bench.py                              # run and print results
+    python bench.py --out results.json           # save machine-readable results
+    python bench.py --baseline results.json      # fail on regressions vs. a saved run
+    python bench.py --quick --only turn_resolution,frame_render
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from src.combat import CombatManager, COMBAT_LOG
+from src.events import EVENTS
+from src.enemy import Enemy
+from src.engine import GameEngine
+from src.history import PlayerHistory
+from src.player import Player
+from src.render import FrameRenderer
+from src.actions import ACTIONS
+from src.autoplay import MCTSPlayer
+from src.memory import MemorySystem
+
+SEED = 1234
+BENCHMARKS = {}
+
+
+def benchmark(name, unit, higher_is_better=True):
+    def register(fn):
+        BENCHMARKS[name] = (fn, unit, higher_is_better)
+        return fn
+    return register
+
+
+class _NullWriter:
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def _best_of(repeats, fn):
+    """Runs fn repeatedly and returns the fastest wall time in seconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _cycle_policy(seed):
+    """Scripted policy: a seeded, fixed sequence of tactics."""
+    rng = random.Random(seed)
+    script = [rng.choice(ACTIONS) for _ in range(1024)]
+    position = [0]
+
+    def next_action():
+        position[0] = (position[0] + 1) % len(script)
+        return script[position[0]]
+
+    return next_action
+
+
+# --- Benchmarks -----------------------------------------------------------
+
+@benchmark("turn_resolution", "turns/s")
+def bench_turn_resolution(quick):
+    turns = 20000 if quick else 100000
+
+    def run():
+        rng = random.Random(SEED)
+        next_action = _cycle_policy(SEED)
+        player = Player()
+        combat = CombatManager(player, Enemy(), PlayerHistory(), rng=rng)
+        with EVENTS.subscribed(COMBAT_LOG.handlers):  # as during an encounter
+            for _ in range(turns):
+                combat._execute_turn(next_action())
+                if combat.enemy.hp <= 0 or player.hp <= 0:
+                    player.hp, player.focus, player.risk = player.max_hp, player.max_focus, 0
+                    combat.enemy.hp = combat.enemy.max_hp
+
+    return turns / _best_of(3, run)
+
+
+@benchmark("enemy_decision", "decisions/s")
+def bench_enemy_decision(quick):
+    decisions = 50000 if quick else 300000
+    rng = random.Random(SEED)
+    enemy = Enemy("Bench", aggression=7, patience=4, adapt_rate=5)
+    histories = []
+    for _ in range(64):
+        history = PlayerHistory()
+        for _ in range(rng.randint(0, 12)):
+            history.append(rng.choice(ACTIONS))
+        histories.append(history)
+
+    def run():
+        draw = random.Random(SEED)
+        for i in range(decisions):
+            enemy.choose_response(histories[i & 63], rng=draw)
+
+    return decisions / _best_of(3, run)
+
+
+@benchmark("pattern_decision", "turns/s")
+def bench_pattern_decision(quick):
+    turns = 20000 if quick else 100000
+    script = _cycle_policy(SEED)
+
+    def run():
+        enemy = Enemy("Bench", aggression=7, patience=4, adapt_rate=5, pattern_order=3, pattern_decay=0.95)
+        history = PlayerHistory()
+        draw = random.Random(SEED)
+        for _ in range(turns):
+            action = script()
+            enemy.get_adaptation_penalty(action, history, silent=True)
+            history.append(action)
+            enemy.choose_response(history, rng=draw)
+
+    return turns / _best_of(3, run)
+
+
+@benchmark("frame_render", "us/frame", higher_is_better=False)
+def bench_frame_render(quick):
+    frames = 2000 if quick else 10000
+    rng = random.Random(SEED)
+    next_action = _cycle_policy(SEED)
+    player = Player()
+    combat = CombatManager(player, Enemy(), PlayerHistory(), rng=rng)
+    logs = []
+    with EVENTS.subscribed(COMBAT_LOG.handlers):
+        for _ in range(64):
+            logs.append(combat._execute_turn(next_action()))
+            if combat.enemy.hp <= 0 or player.hp <= 0:
+                player.hp, combat.enemy.hp = player.max_hp, combat.enemy.max_hp
+
+    def run():
+        renderer = FrameRenderer(_NullWriter())
+        for i in range(frames):
+            renderer.render(combat._compose_frame(logs[i & 63]))
+
+    return _best_of(3, run) / frames * 1e6
+
+
+@benchmark("history_write", "ms/write", higher_is_better=False)
+def bench_history_write(quick):
+    sizes = (1000, 10000) if quick else (1000, 100000, 1000000)
+    summary = {"player_name": "Bench", "fights": 7, "dominant_decision": "BAIT",
+               "final_hp": "40/100", "scars": ["Nightmares"], "ending_type": "TERMINATED"}
+    results = {}
+    cwd = os.getcwd()
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                from src.storage import RunHistoryStore
+                from src.halloffame import HallOfFame
+                store = RunHistoryStore()
+                hall = HallOfFame()
+                rng = random.Random(SEED)
+                batch = []
+                for i in range(size):
+                    batch.append(dict(summary, player_name=f"p{rng.randrange(1000)}", fights=rng.randrange(30)))
+                    if len(batch) == 10000:
+                        store.append_many(batch)
+                        hall.record_many(batch)
+                        batch = []
+                store.append_many(batch)
+                hall.record_many(batch)
+                hall.close()
+
+                engine = GameEngine(seed=SEED)
+                with contextlib.redirect_stdout(_NullWriter()):
+                    elapsed = _best_of(5, lambda: engine._record_run(summary))
+                results[str(size)] = elapsed * 1000
+            finally:
+                os.chdir(cwd)
+    return results
+
+
+@benchmark("analytics_scan", "runs/s")
+def bench_analytics_scan(quick):
+    size = 100000 if quick else 1000000
+    rng = random.Random(SEED)
+    summary = {"player_name": "Bench", "fights": 7, "dominant_decision": "BAIT",
+               "final_hp": "40/100", "scars": ["Nightmares"], "ending_type": "TERMINATED"}
+    with tempfile.TemporaryDirectory() as tmp:
+        from src.analytics import analyze
+        path = os.path.join(tmp, "runs.jsonl")
+        with open(path, "w") as f:
+            for _ in range(size):
+                run = dict(summary, player_name=f"p{rng.randrange(1000)}", fights=rng.randrange(30),
+                           final_hp=f"{rng.randrange(101)}/100")
+                f.write(json.dumps(run, separators=(",", ":")) + "\n")
+        return size / _best_of(3, lambda: analyze([path], workers=1))
+
+
+@benchmark("mcts_search", "nodes/s")
+def bench_mcts_search(quick):
+    moves = 10 if quick else 50
+    rng = random.Random(SEED)
+    positions = []
+    for _ in range(moves):
+        history = PlayerHistory()
+        memory = MemorySystem()
+        for _ in range(rng.randint(0, 8)):
+            action = rng.choice(ACTIONS)
+            history.append(action)
+            memory.record_decision(action)
+        player = Player()
+        player.hp, player.focus, player.risk = rng.randint(20, 100), rng.randint(2, 10), rng.randint(0, 60)
+        enemy = Enemy("Bench", aggression=rng.randint(3, 10), patience=rng.randint(2, 8), adapt_rate=rng.randint(2, 6))
+        positions.append((player, enemy, history, memory))
+
+    searcher = MCTSPlayer(iterations=500 if quick else 2000, seed=SEED)
+    nodes = 0
+    elapsed = 0.0
+    for player, enemy, history, memory in positions:
+        searcher.choose(player, enemy, history, memory)
+        nodes += searcher.last_nodes
+        elapsed += searcher.last_elapsed
+    return nodes / elapsed
+
+
+@benchmark("tower_climb", "climbs/s")
+def bench_tower_climb(quick):
+    climbs = 20 if quick else 100
+
+    def run():
+        for i in range(climbs):
+            policy = random.Random(SEED + i)
+
+            def read_input(prompt="> "):
+                if "option" in prompt:
+                    return "1"
+                if "name" in prompt:
+                    return "Bench"
+                if "respite" in prompt:
+                    return "2"
+                if "fragment" in prompt:
+                    return "1"
+                return str(policy.randint(1, 4))
+
+            engine = GameEngine(seed=SEED + i, input_fn=read_input, pause_fn=lambda prompt="": None, persist=False)
+            with contextlib.redirect_stdout(_NullWriter()):
+                engine.start()
+
+    return climbs / _best_of(3, run)
+
+
+# --- Runner ---------------------------------------------------------------
+
+def run_benchmarks(names, quick):
+    results = {}
+    for name in names:
+        fn, unit, higher_is_better = BENCHMARKS[name]
+        value = fn(quick)
+        results[name] = {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+        print(f"{name:<18} {_format(value)} {unit}", file=sys.stderr)
+    return results
+
+
+def _format(value):
+    if isinstance(value, dict):
+        return ", ".join(f"{k}: {v:.3f}" for k, v in value.items())
+    return f"{value:,.2f}"
+
+
+def find_regressions(results, baseline, threshold):
+    """Returns (name, current, baseline) for every result worse than baseline by more than threshold."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        current, previous = result["value"], baseline[name]["value"]
+        pairs = current.items() if isinstance(current, dict) else [(None, current)]
+        for key, value in pairs:
+            old = previous.get(key) if key is not None else previous
+            if old is None:
+                continue
+            if result["higher_is_better"]:
+                worse = value < old * (1 - threshold)
+            else:
+                worse = value > old * (1 + threshold)
+            if worse:
+                label = f"{name}[{key}]" if key is not None else name
+                regressions.append((label, value, old))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Outplay benchmark suite")
+    parser.add_argument("--out", metavar="FILE", help="Write JSON results to FILE.")
+    parser.add_argument("--baseline", metavar="FILE", help="Compare against a previous JSON result.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed relative slowdown before failing (default 0.2 = 20%%).")
+    parser.add_argument("--only", help="Comma-separated benchmark names.")
+    parser.add_argument("--quick", action="store_true", help="Smaller workloads for a fast smoke run.")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    results = run_benchmarks(names, args.quick)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": SEED,
+            "quick": args.quick,
+            "timestamp": int(time.time()),
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)["results"]
+        regressions = find_regressions(results, baseline, args.threshold)
+        for label, value, old in regressions:
+            print(f"REGRESSION {label}: {value:,.3f} vs baseline {old:,.3f}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Load generator for the Outplay server.
+
+    python loadgen.py                                   # spawn a local server and measure it
+    python loadgen.py --address 127.0.0.1:7777          # drive an already running server
+    python loadgen.py --sessions 2000 --concurrency 200
+
+Each bot connects, starts a chronicle and answers every prompt until its
+climb ends. Reports sessions/s, turns/s and, for a spawned server, sessions
+per CPU-second of the server process (the server runs on a single core).
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+PROMPTS = (
+    ("Choose your tactic", None),
+    ("Choose an option", "1"),
+    ("Enter your name", "Bot"),
+    ("Select a fragment", "1"),
+    ("Choose your respite", "2"),
+    ("Press Enter", ""),
+)
+ANSI = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+
+async def play_session(address, rng, stats):
+    if address.startswith("unix:"):
+        reader, writer = await asyncio.open_unix_connection(address[5:])
+    else:
+        host, _, port = address.rpartition(":")
+        reader, writer = await asyncio.open_connection(host, int(port))
+
+    buffer = ""
+    started = time.perf_counter()
+    try:
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            buffer += chunk.decode("utf-8", errors="replace")
+            tail = ANSI.sub("", buffer[-200:])
+            for marker, answer in PROMPTS:
+                if marker in tail:
+                    if answer is None:
+                        answer = str(rng.randint(1, 4))
+                        stats["turns"] += 1
+                    writer.write(answer.encode() + b"\n")
+                    buffer = ""
+                    break
+    finally:
+        writer.close()
+    stats["sessions"] += 1
+    stats["latencies"].append(time.perf_counter() - started)
+
+
+async def run_load(address, sessions, concurrency, seed):
+    stats = {"sessions": 0, "turns": 0, "latencies": []}
+    limit = asyncio.Semaphore(concurrency)
+
+    async def bot(i):
+        async with limit:
+            await play_session(address, random.Random(seed + i), stats)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bot(i) for i in range(sessions)))
+    stats["elapsed"] = time.perf_counter() - started
+    return stats
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _cpu_seconds(pid):
+    """User+system CPU time of a live process (Linux only), else None."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Outplay server load generator")
+    parser.add_argument("--address", help="Server to drive (host:port or unix:/path); spawns one when omitted.")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    server = None
+    workdir = None
+    address = args.address
+    if address is None:
+        address = f"127.0.0.1:{_free_port()}"
+        workdir = tempfile.TemporaryDirectory()
+        main_py = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+        server = subprocess.Popen([sys.executable, main_py, "--serve", address], cwd=workdir.name,
+                                  stdout=subprocess.PIPE, text=True)
+        server.stdout.readline()  # "Serving Outplay on ..."
+
+    try:
+        cpu_before = _cpu_seconds(server.pid) if server else None
+        stats = asyncio.run(run_load(address, args.sessions, args.concurrency, args.seed))
+        cpu_after = _cpu_seconds(server.pid) if server else None
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+        if workdir:
+            workdir.cleanup()
+
+    elapsed = stats["elapsed"]
+    latencies = sorted(stats["latencies"])
+    print(f"sessions       : {stats['sessions']} ({args.concurrency} concurrent)")
+    print(f"sessions/s     : {stats['sessions'] / elapsed:,.1f}")
+    print(f"turns/s        : {stats['turns'] / elapsed:,.1f}")
+    if latencies:
+        print(f"session p50/p99: {latencies[len(latencies) // 2]:.3f}s / {latencies[int(len(latencies) * 0.99)]:.3f}s")
+    if cpu_before is not None and cpu_after is not None and cpu_after > cpu_before:
+        print(f"sessions/core-s: {stats['sessions'] / (cpu_after - cpu_before):,.1f}")
+
+
+if __name__ == "__main__":
+    main()
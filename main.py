@@ -1,13 +1,77 @@
+import argparse
+import json
+import time
 from src.engine import GameEngine
+from src.floors import DEFAULT_CURVE, merge_curve
+from src.replay import start_recording, replay
+from src.metrics import METRICS
+from src.inputs import ConsoleInput
+from src.server import run_server
+from src.events import EVENTS, Event
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Outplay RPG")
+    parser.add_argument("--seed", type=int, help="Seed for a reproducible run.")
+    parser.add_argument("--record", metavar="FILE", help="Record inputs and RNG usage to FILE.")
+    parser.add_argument("--replay", metavar="FILE", help="Re-run a recorded session headlessly.")
+    parser.add_argument("--turn-timeout", type=float, metavar="SECONDS",
+                        help="Seconds to choose a tactic before being forced to Observe.")
+    parser.add_argument("--serve", metavar="ADDRESS",
+                        help="Host sessions over the network: host:port, or unix:/path.")
+    parser.add_argument("--curve", metavar="FILE",
+                        help="JSON tower scaling curve (see src/floors.py); set max_floor for a finite tower.")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="Collect timings and counters; write JSON (*.json) or OpenMetrics text on exit.")
+    parser.add_argument("--event-log", metavar="FILE", help="Append every game event to FILE as JSON lines.")
+    return parser.parse_args()
 
 def main():
     """Entry point for the RPG game."""
+    args = parse_args()
+    recorder = None
+    if args.metrics:
+        METRICS.enable()
+    event_log = None
+    if args.event_log:
+        event_log = open(args.event_log, "a")
+        log_event = lambda event: event_log.write(json.dumps(event.to_dict()) + "\n")
+        EVENTS.subscribe(Event, log_event)
     try:
-        game = GameEngine()
+        if args.replay:
+            started = time.perf_counter()
+            game = replay(args.replay)
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"Replayed {args.replay}: floor {game.fight_count}, "
+                  f"{game.player.hp}/{game.player.max_hp} HP, {elapsed:.1f} ms")
+            return
+        if args.serve:
+            run_server(args.serve, turn_timeout=args.turn_timeout)
+            return
+        curve = DEFAULT_CURVE
+        if args.curve:
+            with open(args.curve, "r") as f:
+                curve = json.load(f)
+            merge_curve(curve)  # reject a bad curve before the game starts
+        if args.record:
+            game, recorder = start_recording(args.seed, curve=curve)
+        elif args.turn_timeout:
+            game = GameEngine(seed=args.seed, input_source=ConsoleInput(), turn_timeout=args.turn_timeout, curve=curve)
+        else:
+            game = GameEngine(seed=args.seed, curve=curve)
         game.start()
+    except KeyboardInterrupt:
+        print("\nInterrupted.")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
     finally:
+        if recorder:
+            recorder.save(args.record)
+            print(f"Session recorded to {args.record} (seed {recorder.seed}).")
+        if args.metrics:
+            METRICS.write(args.metrics)
+        if event_log:
+            EVENTS.unsubscribe(Event, log_event)
+            event_log.close()
         print("System shutdown.")
 
 if __name__ == "__main__":
@@ -0,0 +1,12 @@
+# Canonical action orderings shared by the scalar and batch combat engines.
+ACTIONS = ("OBSERVE", "PRESSURE", "BAIT", "ATTACK")
+ENEMY_ACTIONS = ("ATTACK", "DEFEND", "WAIT", "COUNTER")
+
+# Compact integer codes; the tuples above are the string views used for display.
+OBSERVE, PRESSURE, BAIT, ATTACK = range(4)
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+
+
+def action_code(action):
+    """Returns the integer code for an action given by name or code."""
+    return action if type(action) is int else ACTION_CODES[action]
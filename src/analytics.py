@@ -0,0 +1,469 @@
+"""
+Streaming analytics over the run archive.
+
+Run summaries are streamed out of the history store's JSON-lines segments
+through mmap in newline-aligned chunks, so memory stays flat however large
+the archive is. Every statistic lives in a RunReport made of mergeable
+sketches (counters, a log-bucketed quantile sketch, per-player regression
+sums): a segment can be split into byte-range shards, scanned in worker
+processes, and the partial reports merged in archive order. A store is
+read from a snapshot of open segment files, so compaction or rotation in
+another process never pulls a file out from under a report.
+
+Scanning does no per-record Python work on well-formed chunks: a chunk is
+decoded with one json.loads (or, when it mostly repeats itself, once per
+distinct line) and tallied with C-level Counter/itemgetter passes.
+"""
+import gc
+import io
+import json
+import mmap
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from math import ceil, log
+from operator import itemgetter, mul
+
+DEATH_ENDINGS = ("TERMINATED",)  # every other ending leaves the player alive (censored)
+CHUNK_BYTES = 2 * 1024 * 1024
+MIN_SHARD_BYTES = 4 * 1024 * 1024
+DEDUP_SAMPLE = 4096
+DEDUP_RATIO = 2  # tally per distinct line when at most half of a chunk's first lines are distinct
+RECORD_DEFAULTS = {"player_name": "?", "fights": 0, "dominant_decision": "None",
+                   "final_hp": None, "scars": (), "ending_type": "UNKNOWN"}
+_NUMBER_TYPES = {int, float}
+_STR_TYPES = {str}
+_LIST_TYPES = {list}
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with bounded relative error.
+
+    Positive values are counted in logarithmically spaced buckets (as in
+    DDSketch), so any quantile is within `accuracy` of the true value and the
+    sketch's size grows with the log of the value range, not the count.
+    """
+
+    def __init__(self, accuracy=0.01):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = log(self.gamma)
+        self.buckets = Counter()
+        self.zeros = 0  # values <= 0
+        self.count = 0
+
+    def add(self, value, n=1):
+        if value <= 0:
+            self.zeros += n
+        else:
+            self.buckets[ceil(log(value) / self._log_gamma)] += n
+        self.count += n
+
+    def merge(self, other):
+        self.buckets.update(other.buckets)
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def quantile(self, q):
+        """Approximate q-quantile (0 <= q <= 1), or None when empty."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+class RunReport:
+    """
+    Aggregates over a stream of run summaries.
+
+    players maps a name to [runs, sum of fights, sum of run index * fights,
+    best]; a player's run indexes are always 0..runs-1, so these are all a
+    least-squares trend of fights over the player's runs needs, and merging a
+    later report only shifts its indexes by the earlier run count.
+    """
+
+    def __init__(self, accuracy=0.01):
+        self.runs = 0
+        self.skipped = 0  # torn or malformed records
+        self.deaths = Counter()     # fights -> runs that died with that many fights
+        self.survivors = Counter()  # fights -> runs that ended alive (censored)
+        self.fights = QuantileSketch(accuracy)
+        self.final_hp = QuantileSketch(accuracy)  # percent of max HP at the end
+        self.outcomes = Counter()   # (dominant_decision, ending_type) -> runs
+        self.scars = Counter()      # scar -> times inflicted
+        self.scar_counts = Counter()  # scars per run -> runs
+        self.players = {}
+
+    # --- Accumulating -----------------------------------------------------
+
+    def add_record(self, run):
+        """Adds a single run, in archive order; a record with wrong-typed fields is skipped."""
+        if not isinstance(run, dict):
+            self.skipped += 1
+            return
+        run = dict(RECORD_DEFAULTS, **run)
+        fights, scars = run["fights"], run["scars"]
+        if (not isinstance(fights, (int, float)) or not isinstance(scars, (list, tuple))
+                or not all(isinstance(scar, str) for scar in scars)):
+            self.skipped += 1
+            return
+        run["dominant_decision"] = str(run["dominant_decision"])
+        run["ending_type"] = str(run["ending_type"])
+        self._add(run)
+        self._add_trends([str(run["player_name"])], [fights])
+
+    def add_lines(self, lines):
+        """
+        Adds a chunk of JSON lines, in archive order.
+
+        A chunk that mostly repeats itself is tallied per distinct line;
+        otherwise it is decoded as one JSON array and tallied column by
+        column. A chunk with a torn, malformed or wrong-typed line is added
+        record by record instead, skipping the bad ones.
+        """
+        part = RunReport(self.fights.accuracy)
+        try:
+            sample = lines[:DEDUP_SAMPLE]
+            if len(set(sample)) * DEDUP_RATIO <= len(sample):
+                part._add_distinct(lines)
+            else:
+                part._add_batch(lines)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            part = RunReport(self.fights.accuracy)
+            for line in lines:
+                if line:
+                    try:
+                        part.add_record(json.loads(line))
+                    except (ValueError, TypeError, KeyError, AttributeError):
+                        part.skipped += 1
+        self.merge(part)
+
+    def _add(self, run, n=1):
+        fights, ending = run["fights"], run["ending_type"]
+        (self.deaths if ending in DEATH_ENDINGS else self.survivors)[fights] += n
+        self.fights.add(fights, n)
+        hp = _hp_percent(run["final_hp"])
+        if hp is not None:
+            self.final_hp.add(hp, n)
+        self.outcomes[(run["dominant_decision"], ending)] += n
+        scars = run["scars"]
+        self.scar_counts[len(scars)] += n
+        for scar in scars:
+            self.scars[scar] += n
+        self.runs += n
+
+    def _add_distinct(self, lines):
+        counts = Counter(lines)
+        counts.pop(b"", None)
+        keys = {}
+        for line, n in counts.items():
+            run = json.loads(line)
+            _check_columns((run["player_name"],), (run["fights"],), (run["dominant_decision"],),
+                           (run["ending_type"],), (run["scars"],))
+            self._add(run, n)
+            keys[line] = (run["player_name"], run["fights"])
+        keys = list(map(keys.get, filter(None, lines)))
+        self._add_trends(list(map(itemgetter(0), keys)), list(map(itemgetter(1), keys)))
+
+    def _add_batch(self, lines):
+        runs = json.loads(b"[" + b",".join(filter(None, lines)) + b"]")
+        names = list(map(itemgetter("player_name"), runs))
+        fights = list(map(itemgetter("fights"), runs))
+        decisions = list(map(itemgetter("dominant_decision"), runs))
+        endings = list(map(itemgetter("ending_type"), runs))
+        scars = list(map(itemgetter("scars"), runs))
+        _check_columns(names, fights, decisions, endings, scars)
+        for (fight, decision, ending), n in Counter(zip(fights, decisions, endings)).items():
+            (self.deaths if ending in DEATH_ENDINGS else self.survivors)[fight] += n
+            self.fights.add(fight, n)
+            self.outcomes[(decision, ending)] += n
+        for final_hp, n in Counter(map(itemgetter("final_hp"), runs)).items():
+            hp = _hp_percent(final_hp)
+            if hp is not None:
+                self.final_hp.add(hp, n)
+        self.scar_counts.update(map(len, scars))
+        self.scars.update(chain.from_iterable(scars))
+        self.runs += len(runs)
+        self._add_trends(names, fights)
+
+    def _add_trends(self, names, fights):
+        """Extends the per-player sums with runs in order, one player at a time."""
+        order = sorted(range(len(names)), key=names.__getitem__)  # stable: keeps each player's order
+        fights = list(map(fights.__getitem__, order))
+        start = 0
+        for name, k in sorted(Counter(names).items()):
+            runs = fights[start:start + k]
+            start += k
+            stats = self.players.get(name)
+            if stats is None:
+                stats = self.players[name] = [0, 0, 0, runs[0]]
+            first = stats[0]
+            stats[2] += sum(map(mul, range(first, first + k), runs))
+            stats[1] += sum(runs)
+            stats[0] += k
+            stats[3] = max(stats[3], max(runs))
+
+    def merge(self, other):
+        """Folds in a report over the runs that follow this one's."""
+        self.runs += other.runs
+        self.skipped += other.skipped
+        self.deaths.update(other.deaths)
+        self.survivors.update(other.survivors)
+        self.fights.merge(other.fights)
+        self.final_hp.merge(other.final_hp)
+        self.outcomes.update(other.outcomes)
+        self.scars.update(other.scars)
+        self.scar_counts.update(other.scar_counts)
+        for name, (runs, total, weighted, best) in other.players.items():
+            stats = self.players.get(name)
+            if stats is None:
+                self.players[name] = [runs, total, weighted, best]
+                continue
+            stats[2] += weighted + stats[0] * total
+            stats[1] += total
+            stats[0] += runs
+            stats[3] = max(stats[3], best)
+        return self
+
+    # --- Results ----------------------------------------------------------
+
+    def survival(self):
+        """Kaplan-Meier curve: [(fights, probability of surviving beyond that many fights)]."""
+        at_risk = self.runs
+        alive = 1.0
+        curve = []
+        for fights in sorted(set(self.deaths) | set(self.survivors)):
+            died = self.deaths.get(fights, 0)
+            if died:
+                alive *= 1.0 - died / at_risk
+            curve.append((fights, alive))
+            at_risk -= died + self.survivors.get(fights, 0)
+        return curve
+
+    def trends(self, limit=None):
+        """Per-player (name, runs, mean fights, best, fights gained per run), most active first."""
+        rows = []
+        for name, (n, total, weighted, best) in self.players.items():
+            slope = 0.0
+            if n > 1:
+                sum_x = n * (n - 1) / 2
+                sum_xx = (n - 1) * n * (2 * n - 1) / 6
+                slope = (n * weighted - sum_x * total) / (n * sum_xx - sum_x * sum_x)
+            rows.append((name, n, total / n, best, slope))
+        rows.sort(key=lambda row: (-row[1], row[0]))
+        return rows[:limit] if limit is not None else rows
+
+    def to_dict(self, players=20):
+        return {
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "survival": self.survival(),
+            "fights_quantiles": {q: self.fights.quantile(q) for q in (0.5, 0.9, 0.99)},
+            "final_hp_quantiles": {q: self.final_hp.quantile(q) for q in (0.5, 0.9, 0.99)},
+            "outcomes": [[decision, ending, n] for (decision, ending), n in self.outcomes.most_common()],
+            "scars": self.scars.most_common(),
+            "scars_per_run": sorted(self.scar_counts.items()),
+            "players": self.trends(players),
+        }
+
+
+def _check_columns(names, fights, decisions, endings, scars):
+    """
+    Raises TypeError unless every field holds a type add_record takes as is,
+    so the fast paths hand anything else to the per-record fallback.
+    """
+    if not (set(map(type, fights)) <= _NUMBER_TYPES and set(map(type, scars)) <= _LIST_TYPES
+            and set(map(type, chain.from_iterable(scars))) <= _STR_TYPES
+            and set(map(type, names)).union(map(type, decisions), map(type, endings)) <= _STR_TYPES):
+        raise TypeError("record field of the wrong type")
+
+
+def _hp_percent(final_hp):
+    try:
+        hp, max_hp = final_hp.split("/")
+        return 100.0 * int(hp) / int(max_hp)
+    except (AttributeError, ValueError, ZeroDivisionError):
+        return None
+
+
+# --- Reading ------------------------------------------------------------------
+
+def _align(mm, offset):
+    """First line start at or after offset."""
+    if offset <= 0:
+        return 0
+    newline = mm.find(b"\n", offset - 1)
+    return len(mm) if newline < 0 else newline + 1
+
+
+def _is_path(source):
+    return isinstance(source, (str, os.PathLike))
+
+
+def _size(source):
+    return os.path.getsize(source) if _is_path(source) else os.fstat(source.fileno()).st_size
+
+
+def iter_chunks(path, start=0, end=None, chunk_bytes=CHUNK_BYTES):
+    """
+    Yields lists of the complete lines of path (or of an open binary file,
+    which is left open) that start in [start, end), read through mmap about
+    chunk_bytes at a time. A torn last line (a crash mid-append) is dropped,
+    as RunHistoryStore does.
+    """
+    if _is_path(path):
+        with open(path, "rb") as f:
+            yield from iter_chunks(f, start, end, chunk_bytes)
+        return
+    f = path
+    if os.fstat(f.fileno()).st_size == 0:
+        return
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = _align(mm, start)
+        end = _align(mm, len(mm) if end is None else end)
+        while start < end:
+            stop = min(end, _align(mm, start + chunk_bytes))
+            lines = mm[start:stop].split(b"\n")
+            lines.pop()  # empty after the final newline, or a torn line
+            yield lines
+            start = stop
+
+
+def iter_array(path, read_bytes=1024 * 1024):
+    """
+    Yields the records of a JSON array file (the legacy run_history.json), by
+    path or from an open binary file, without loading it whole. A malformed
+    record yields None and reading resumes at the next record (run summaries
+    are flat objects, so the next "{" starts one); a truncated tail ends it.
+    """
+    decoder = json.JSONDecoder()
+    source = open(path, "r", encoding="utf-8") if _is_path(path) else io.TextIOWrapper(path, encoding="utf-8")
+    with source as f:
+        buffer = f.read(read_bytes).lstrip()
+        if not buffer.startswith("["):
+            return
+        pos = 1
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == "]":
+                return
+            try:
+                record, pos = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                resume = buffer.find("{", pos + 1)
+                if resume < 0:
+                    more = f.read(read_bytes)  # the record may just be cut off: read on and retry
+                    if not more:
+                        return  # truncated array
+                    buffer = buffer[pos:] + more
+                    pos = 0
+                    continue
+                yield None  # malformed even though the next record has begun
+                pos = resume
+                continue
+            yield record
+
+
+def shard(paths, shards=1, min_bytes=MIN_SHARD_BYTES):
+    """
+    Splits JSON-lines files (paths or open binary files) into about `shards`
+    (file, start, end) byte ranges, in archive order.
+    """
+    sizes = [(path, _size(path)) for path in paths]
+    total = sum(size for _, size in sizes)
+    step = max(min_bytes, -(-total // max(1, shards)))
+    ranges = []
+    for path, size in sizes:
+        for start in range(0, size, step):
+            ranges.append((path, start, min(size, start + step)))
+    return ranges
+
+
+def scan_shard(byte_range):
+    """RunReport over one (path or open file, start, end) range."""
+    report = RunReport()
+    enabled = gc.isenabled()
+    gc.disable()  # decoding allocates millions of acyclic objects; collections would only slow it down
+    try:
+        for lines in iter_chunks(*byte_range):
+            report.add_lines(lines)
+    finally:
+        if enabled:
+            gc.enable()
+    return report
+
+
+def _scan_task(byte_range):
+    """Picklable form of a byte range: an open file travels as its path and (device, inode)."""
+    source, start, end = byte_range
+    if _is_path(source):
+        return source, None, start, end
+    stat = os.fstat(source.fileno())
+    return source.name, (stat.st_dev, stat.st_ino), start, end
+
+
+def _scan_reopened(task):
+    """
+    scan_shard in a worker process, reopening the file by path. Returns None
+    when the path no longer names the snapshotted file (compacted away or
+    rotated), so the caller scans its own handle instead.
+    """
+    path, identity, start, end = task
+    if identity is None:
+        return scan_shard((path, start, end))
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        stat = os.fstat(f.fileno())
+        if (stat.st_dev, stat.st_ino) != identity:
+            return None
+        return scan_shard((f, start, end))
+
+
+def analyze(paths, legacy_file=None, workers=None):
+    """
+    RunReport over a legacy JSON array (oldest runs) and JSON-lines segments,
+    each given as a path or an open binary file.
+
+    Segments are sharded across `workers` processes (default: one per CPU);
+    workers=1 scans in this process.
+    """
+    report = RunReport()
+    if legacy_file is not None and (not _is_path(legacy_file) or os.path.exists(legacy_file)):
+        for run in iter_array(legacy_file):
+            report.add_record(run)
+
+    workers = workers or os.cpu_count() or 1
+    ranges = shard(paths, workers * 4 if workers > 1 else 1)
+    if workers > 1 and len(ranges) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for byte_range, part in zip(ranges, pool.map(_scan_reopened, map(_scan_task, ranges))):
+                report.merge(part if part is not None else scan_shard(byte_range))
+    else:
+        for byte_range in ranges:
+            report.merge(scan_shard(byte_range))
+    return report
+
+
+def analyze_store(store, workers=None):
+    """RunReport over one consistent snapshot of everything a RunHistoryStore holds, without migrating it."""
+    files = store.open_segments(migrate=False, legacy=True)
+    try:
+        # Until the store first migrates it, the legacy file still holds the oldest runs
+        legacy = files[0] if files and files[0].name == store.legacy_file else None
+        return analyze(files[1:] if legacy else files, legacy_file=legacy, workers=workers)
+    finally:
+        for f in files:
+            f.close()
@@ -0,0 +1,171 @@
+"""
+Monte Carlo tree search autoplayer.
+
+MCTSPlayer searches over the player's tactics with open-loop UCT: every
+iteration replays the real turn rules on a CombatState, sampling the enemy's
+responses and PRESSURE rolls afresh, so the tree averages over the enemy's
+randomness instead of assuming one outcome. It has its own RNG and never
+draws from the game's, so hints and autoplay don't disturb seeded runs.
+"""
+import math
+import random
+from time import perf_counter
+from .actions import ACTIONS
+from .kernel import simulate_encounter
+from .state import CombatState, HP, MAX_HP, ENEMY_HP
+
+# Wins score between WIN_FLOOR and 1.0 depending on how much HP was kept
+WIN_FLOOR = 0.6
+
+
+class _Node:
+    __slots__ = ("children", "visits", "value")
+
+    def __init__(self):
+        self.children = [None] * len(ACTIONS)
+        self.visits = 0
+        self.value = 0.0
+
+
+class MCTSPlayer:
+    def __init__(self, budget=0.005, iterations=None, exploration=1.4, max_depth=12,
+                 rollout_depth=20, seed=None):
+        """
+        Args:
+            budget (float): Seconds of search per move.
+            iterations (int): Fixed number of playouts per move instead of a time
+                budget (deterministic for a given seed).
+            exploration (float): UCT exploration constant.
+            max_depth (int): Deepest tree level expanded.
+            rollout_depth (int): Random turns played past the tree before scoring.
+            seed (int): Seed for the search's private RNG.
+        """
+        self.budget = budget
+        self.iterations = iterations
+        self.exploration = exploration
+        self.max_depth = max_depth
+        self.rollout_depth = rollout_depth
+        self.rng = random.Random(seed)
+        self.last_root = None
+        self.last_playouts = 0
+        self.last_nodes = 0
+        self.last_elapsed = 0.0
+
+    def __call__(self, player, enemy, player_history, memory=None):
+        """Kernel policy interface: returns the chosen tactic's name."""
+        return self.choose(player, enemy, player_history, memory)
+
+    def choose(self, player, enemy, player_history, memory=None):
+        state = CombatState.capture(player, enemy, memory, player_history)
+        root = self.search(state)
+        best = max(range(len(ACTIONS)),
+                   key=lambda code: root.children[code].visits if root.children[code] else -1)
+        return ACTIONS[best]
+
+    def scores(self):
+        """Mean playout score per tactic from the last search ({} before any search)."""
+        root = self.last_root
+        if root is None:
+            return {}
+        return {ACTIONS[code]: child.value / child.visits
+                for code, child in enumerate(root.children) if child and child.visits}
+
+    def search(self, state):
+        rng = self.rng
+        root = _Node()
+        playouts = nodes = 0
+        started = perf_counter()
+        deadline = started + self.budget
+        limit = self.iterations
+        if state.outcome() is not None:
+            limit = 0  # Nothing left to decide
+
+        while True:
+            if limit is not None:
+                if playouts >= limit:
+                    break
+            elif playouts >= len(ACTIONS) and perf_counter() >= deadline:
+                break
+
+            mark = state.snapshot()
+            path = [root]
+            node = root
+            depth = 0
+
+            # Selection / expansion
+            while state.outcome() is None and depth < self.max_depth:
+                code = self._select(node)
+                child = node.children[code]
+                state.step(ACTIONS[code], rng)
+                nodes += 1
+                depth += 1
+                if child is None:
+                    child = node.children[code] = _Node()
+                    path.append(child)
+                    break
+                path.append(child)
+                node = child
+
+            # Rollout
+            for _ in range(self.rollout_depth):
+                if state.outcome() is not None:
+                    break
+                state.step(ACTIONS[int(rng.random() * len(ACTIONS))], rng)
+                nodes += 1
+
+            value = self.evaluate(state)
+            for visited in path:
+                visited.visits += 1
+                visited.value += value
+            state.undo(mark)
+            playouts += 1
+
+        self.last_root = root
+        self.last_playouts = playouts
+        self.last_nodes = nodes
+        self.last_elapsed = perf_counter() - started
+        return root
+
+    def _select(self, node):
+        """Index of the first unexpanded tactic, else the UCT-best child."""
+        children = node.children
+        for code, child in enumerate(children):
+            if child is None:
+                return code
+        log_n = math.log(node.visits)
+        c = self.exploration
+        best, best_score = 0, -1.0
+        for code, child in enumerate(children):
+            score = child.value / child.visits + c * math.sqrt(log_n / child.visits)
+            if score > best_score:
+                best, best_score = code, score
+        return best
+
+    @staticmethod
+    def evaluate(state):
+        """Scores a state in [0, 1]: defeats 0, wins WIN_FLOOR..1, unfinished fights by HP balance."""
+        values = state.values
+        hp_share = values[HP] / values[MAX_HP] if values[MAX_HP] else 0.0
+        if values[ENEMY_HP] <= 0:
+            return WIN_FLOOR + (1.0 - WIN_FLOOR) * hp_share
+        if values[HP] <= 0:
+            return 0.0
+        enemy_share = values[ENEMY_HP] / state.enemy.max_hp
+        return WIN_FLOOR * 0.5 * (hp_share + 1.0 - enemy_share)
+
+    def nodes_per_second(self):
+        """Search speed of the last move."""
+        return self.last_nodes / self.last_elapsed if self.last_elapsed else 0.0
+
+
+def measure_strength(make_enemy, encounters=50, budget=0.005, iterations=None, seed=0):
+    """
+    Pits MCTSPlayer against fresh enemies from make_enemy() and returns its win
+    rate, a measure of how hard an enemy configuration is against strong play.
+    """
+    wins = 0
+    for i in range(encounters):
+        player = MCTSPlayer(budget=budget, iterations=iterations, seed=seed + i)
+        result = simulate_encounter(player, seed=seed + i, enemy=make_enemy())
+        wins += result["outcome"] == "VICTORY"
+    return wins / encounters if encounters else 0.0
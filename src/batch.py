@@ -0,0 +1,344 @@
+"""
+Vectorized batch simulator: advances N independent tower climbs in lockstep.
+
+Mirrors the rules of CombatManager._execute_turn, Enemy.choose_response,
+MemorySystem and the floor loop in GameEngine._handle_gameplay, with every
+player, enemy and memory field stored as a NumPy array. Enemies follow the
+most-frequent-action rule only; sequence learning (Enemy pattern_order) is
+not modeled. Requires numpy.
+"""
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for batch simulations
+    np = None
+
+from .actions import ACTIONS, ENEMY_ACTIONS, OBSERVE, PRESSURE, BAIT, ATTACK
+from .enemy import Enemy, HISTORY_WINDOW
+from .perks import PERK_NAMES
+from .floors import Tower, DEFAULT_CURVE
+E_ATTACK, E_DEFEND, E_WAIT, E_COUNTER = range(4)
+
+# Perk columns follow the registry order (vectorized effects are hand-written below)
+FOCUSED_MIND, IRON_RESOLVE, KEEN_INSIGHT, ADRENALINE, STEADY_BREATH = map(PERK_NAMES.index, (
+    "Focused Mind", "Iron Resolve", "Keen Insight", "Adrenaline", "Steady Breath"))
+
+DEFEAT_TYPES = ("DEFEAT", "PHYSICAL_TRAUMA", "MENTAL_COLLAPSE", "ESCAPED_COWARDLY")
+
+# Effectiveness lost to the player's own memory, indexed by repetition count
+MEMORY_PENALTY = (0.0, 0.0, 0.1, 0.3, 0.5, 0.5)
+
+
+_TOWERS = {}  # difficulty_step -> Tower
+
+
+def default_enemy_curve(floor, difficulty_step=0.15):
+    """Enemy stats for a floor, as spawned by GameEngine._handle_gameplay."""
+    tower = _TOWERS.get(difficulty_step)
+    if tower is None:
+        tower = _TOWERS[difficulty_step] = Tower({"hp": dict(DEFAULT_CURVE["hp"], step=difficulty_step)})
+    return tower.spec(floor).stats()
+
+
+def random_policy(sim, rng):
+    """Picks a tactic uniformly at random for every encounter."""
+    return rng.integers(0, 4, size=sim.n)
+
+
+def fixed_policy(action):
+    """Returns a policy that always plays the same tactic."""
+    code = ACTIONS.index(action)
+
+    def policy(sim, rng):
+        return np.full(sim.n, code, dtype=np.int64)
+
+    return policy
+
+
+class _Window:
+    """A fixed-size ring of action codes per row with running per-action counts."""
+
+    def __init__(self, n, size=5):
+        self.size = size
+        self.codes = np.zeros((n, size), dtype=np.int8)
+        self.pos = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.counts = np.zeros((n, 4), dtype=np.int64)
+
+    def push(self, rows, actions):
+        full = rows[self.length[rows] == self.size]
+        if full.size:
+            evicted = self.codes[full, self.pos[full]]
+            self.counts[full, evicted] -= 1
+        self.codes[rows, self.pos[rows]] = actions
+        self.counts[rows, actions] += 1
+        self.pos[rows] = (self.pos[rows] + 1) % self.size
+        self.length[rows] = np.minimum(self.length[rows] + 1, self.size)
+
+    def reset(self, rows):
+        self.pos[rows] = 0
+        self.length[rows] = 0
+        self.counts[rows] = 0
+
+
+class BatchSimulator:
+    """
+    Runs many tower climbs at once.
+
+    Args:
+        n (int): Number of independent climbs.
+        seed (int): Seed for the shared NumPy generator.
+        max_floor (int): Climbs that clear this floor stop as survivors.
+        difficulty_step (float): Per-floor enemy HP growth (engine default 0.15).
+        enemy_curve (callable): enemy_curve(floor, difficulty_step) -> stats dict.
+        rest_choice (str): "HP" to bandage or "FOCUS" to meditate at rest stops.
+        max_turns (int): Per-encounter cap; capped encounters end the climb.
+    """
+
+    def __init__(self, n, seed=None, max_floor=20, difficulty_step=0.15,
+                 enemy_curve=default_enemy_curve, rest_choice="HP", max_turns=500):
+        if np is None:
+            raise RuntimeError("BatchSimulator requires numpy (pip install numpy).")
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self.max_floor = max_floor
+        self.difficulty_step = difficulty_step
+        self.enemy_curve = enemy_curve
+        self.rest_choice = rest_choice
+        self.max_turns = max_turns
+
+        # Player
+        self.hp = np.full(n, 100, dtype=np.int64)
+        self.max_hp = np.full(n, 100, dtype=np.int64)
+        self.focus = np.full(n, 10, dtype=np.int64)
+        self.max_focus = np.full(n, 10, dtype=np.int64)
+        self.insight = np.full(n, 10, dtype=np.int64)
+        self.risk = np.zeros(n, dtype=np.int64)
+        self.perks = np.zeros((n, len(PERK_NAMES)), dtype=bool)
+        self.scars = np.zeros(n, dtype=np.int64)
+
+        # Enemy
+        self.e_hp = np.zeros(n, dtype=np.int64)
+        self.e_max_hp = np.zeros(n, dtype=np.int64)
+        self.aggression = np.zeros(n, dtype=np.int64)
+        self.patience = np.zeros(n, dtype=np.int64)
+        self.adapt_rate = np.zeros(n, dtype=np.int64)
+
+        # Memory (per encounter) and run-long history window seen by the enemy
+        self.memory = _Window(n)
+        self.history = _Window(n)
+        self.action_counts = np.zeros((n, 4), dtype=np.int64)
+        self.last_action = np.full(n, -1, dtype=np.int64)
+
+        # Progress
+        self.floor = np.ones(n, dtype=np.int64)
+        self.fight_count = np.zeros(n, dtype=np.int64)
+        self.turns = np.zeros(n, dtype=np.int64)
+        self.encounter_turns = np.zeros(n, dtype=np.int64)
+        self.alive = np.ones(n, dtype=bool)
+        self.active = np.ones(n, dtype=bool)
+        self.defeat_type = np.full(n, -1, dtype=np.int64)
+
+        self._build_decision_tables()
+        self._spawn(np.arange(n))
+
+    # --- Floor handling ---------------------------------------------------
+
+    def _build_decision_tables(self):
+        """Stacks each floor's Enemy alias tables into (floor, state, column) arrays."""
+        states = 1 + len(ACTIONS) * HISTORY_WINDOW
+        shape = (self.max_floor + 1, states, len(ENEMY_ACTIONS))
+        self.table_prob = np.ones(shape, dtype=np.float64)
+        self.table_alias = np.zeros(shape, dtype=np.int64)
+        for floor in range(1, self.max_floor + 1):
+            stats = self.enemy_curve(floor, self.difficulty_step)
+            enemy = Enemy("Batch", stats["aggression"], stats["patience"], stats["adapt_rate"])
+            for state, table in enumerate(enemy.decision_table):
+                self.table_prob[floor, state] = table.prob
+                self.table_alias[floor, state] = table.alias
+
+    def _spawn(self, rows):
+        """Spawns each row's enemy for its current floor."""
+        for floor in np.unique(self.floor[rows]):
+            sel = rows[self.floor[rows] == floor]
+            stats = self.enemy_curve(int(floor), self.difficulty_step)
+            self.e_max_hp[sel] = stats["max_hp"]
+            self.e_hp[sel] = stats["max_hp"]
+            self.aggression[sel] = stats["aggression"]
+            self.patience[sel] = stats["patience"]
+            self.adapt_rate[sel] = stats["adapt_rate"]
+        self.memory.reset(rows)
+        self.encounter_turns[rows] = 0
+
+    def _finish_encounters(self, won, lost, stalled):
+        """Applies _process_combat_result, perk selection and rest stops."""
+        if lost.size:
+            self._record_defeats(lost)
+            self.alive[lost] = False
+            self.active[lost] = False
+        if stalled.size:
+            self.active[stalled] = False
+        if not won.size:
+            return
+
+        # Victory rewards
+        self.focus[won] = np.minimum(self.focus[won] + 1, self.max_focus[won])
+        self.insight[won] += 2
+        self.fight_count[won] = self.floor[won]
+
+        # Perk selection: the first offered fragment is a uniform pick among unowned perks
+        scores = self.rng.random((won.size, len(PERK_NAMES)))
+        scores[self.perks[won]] = -1.0
+        picks = scores.argmax(axis=1)
+        can_pick = scores.max(axis=1) >= 0.0
+        self.perks[won[can_pick], picks[can_pick]] = True
+
+        self.floor[won] += 1
+
+        # Rest stops every 2 floors
+        rest = won[self.floor[won] % 2 == 0]
+        if self.rest_choice == "HP":
+            self.hp[rest] = np.minimum(self.max_hp[rest], self.hp[rest] + 20)
+        elif self.rest_choice == "FOCUS":
+            self.focus[rest] = np.minimum(self.max_focus[rest], self.focus[rest] + 5)
+
+        done = won[self.floor[won] > self.max_floor]
+        self.active[done] = False
+        climbing = won[self.floor[won] <= self.max_floor]
+        if climbing.size:
+            self._spawn(climbing)
+
+    def _record_defeats(self, rows):
+        """Classifies defeats like CombatManager._determine_defeat_type."""
+        kind = np.zeros(rows.size, dtype=np.int64)
+        kind[self.last_action[rows] == OBSERVE] = 3
+        kind[self.focus[rows] <= 2] = 2
+        kind[self.risk[rows] > 50] = 1
+        self.defeat_type[rows] = kind
+
+        trauma = rows[kind == 1]
+        self.max_hp[trauma] = np.maximum(1, self.max_hp[trauma] - 5)
+        self.hp[trauma] = np.minimum(self.hp[trauma], self.max_hp[trauma])
+        collapse = rows[kind == 2]
+        self.max_focus[collapse] = np.maximum(1, self.max_focus[collapse] - 2)
+        self.focus[collapse] = np.minimum(self.focus[collapse], self.max_focus[collapse])
+        self.scars[rows[(kind == 1) | (kind == 2)]] += 1
+        self.insight[rows[kind == 3]] -= 3
+
+    # --- Turn resolution --------------------------------------------------
+
+    def _enemy_responses(self, rows):
+        """Vectorized Enemy.choose_response: one alias-table draw per row."""
+        counts = self.history.counts[rows]
+        freq = counts.max(axis=1)
+        state = np.where(self.history.length[rows] > 0,
+                         1 + counts.argmax(axis=1) * HISTORY_WINDOW + freq - 1, 0)
+        floor = self.floor[rows]
+
+        u = self.rng.random(rows.size) * len(ENEMY_ACTIONS)
+        col = u.astype(np.int64)
+        prob = self.table_prob[floor, state, col]
+        alias = self.table_alias[floor, state, col]
+        return np.where(u - col < prob, col, alias)
+
+    def step(self, actions):
+        """Resolves one turn for every active climb. actions is an int array of size n."""
+        rows = np.nonzero(self.active)[0]
+        if not rows.size:
+            return
+        act = np.asarray(actions)[rows]
+        obs, pre, bait, atk = act == OBSERVE, act == PRESSURE, act == BAIT, act == ATTACK
+
+        hp, max_hp = self.hp[rows], self.max_hp[rows]
+        focus, max_focus = self.focus[rows], self.max_focus[rows]
+        insight, risk = self.insight[rows], self.risk[rows]
+        e_hp = self.e_hp[rows]
+        perks = self.perks[rows]
+
+        # Calculate modifiers
+        mem_counts = self.memory.counts[rows]
+        rep = mem_counts[np.arange(rows.size), act]
+        mem_mod = np.where(self.memory.length[rows] > 0, 1.0 - np.take(MEMORY_PENALTY, rep), 1.0)
+        occurrence = self.history.counts[rows, act]
+        enemy_mod = np.maximum(0.4, 1.0 - (occurrence * self.adapt_rate[rows]) / 20.0)
+        enemy_mod = np.where(self.history.length[rows] > 0, enemy_mod, 1.0)
+        modifier = np.minimum(mem_mod, enemy_mod)
+
+        # Apply Fatigue System
+        focus = np.where(obs & (rep >= 2), np.clip(focus - rep, 0, max_focus), focus)
+        risk = np.where(atk & (rep >= 2), risk + rep * 5, risk)
+
+        self.history.push(rows, act)
+        self.memory.push(rows, act)
+        self.action_counts[rows, act] += 1
+        self.last_action[rows] = act
+
+        enemy_act = self._enemy_responses(rows)
+        e_attacks = enemy_act == E_ATTACK
+        e_defends = enemy_act == E_DEFEND
+
+        # OBSERVE
+        gain = np.trunc(2 * modifier).astype(np.int64) + perks[:, KEEN_INSIGHT]
+        insight = np.where(obs, insight + gain, insight)
+        risk = np.where(obs, np.maximum(0, risk - 5), risk)
+        focus = np.where(obs & perks[:, STEADY_BREATH], np.minimum(focus + 1, max_focus), focus)
+        hit = obs & e_attacks
+        dmg = np.trunc(5 * (1.0 + risk / 100.0)).astype(np.int64)
+        dmg = np.where(perks[:, IRON_RESOLVE], np.maximum(1, dmg - 2), dmg)
+        hp = np.where(hit, np.clip(hp - dmg, 0, max_hp), hp)
+        insight = np.where(hit, insight + 1, insight)
+
+        # PRESSURE
+        roll = self.rng.integers(3, 8, size=rows.size)
+        e_hp = np.where(pre, e_hp - np.trunc(roll * modifier).astype(np.int64), e_hp)
+        risk = np.where(pre, risk + 2, risk)
+        focus = np.where(pre, np.clip(focus - 1, 0, max_focus), focus)
+
+        # BAIT
+        risk = np.where(bait, risk + 15, risk)
+        countered = bait & e_attacks
+        counter_dmg = np.trunc((15 + insight // 2) * modifier).astype(np.int64)
+        e_hp = np.where(countered, e_hp - counter_dmg, e_hp)
+        risk = np.where(countered, np.maximum(0, risk - 10), risk)
+        focus = np.where(countered, np.minimum(focus + 2, max_focus), focus)
+
+        # ATTACK
+        focused = perks[:, FOCUSED_MIND]
+        strike = atk & ((focus >= 2) | (focused & (focus >= 1)))
+        base_dmg = np.trunc((8 + insight // 3) * modifier).astype(np.int64)
+        base_dmg += np.where(perks[:, ADRENALINE] & (risk > 40), 4, 0)
+        base_dmg = np.where(e_defends, base_dmg // 2, base_dmg)
+        e_hp = np.where(strike, e_hp - base_dmg, e_hp)
+        focus = np.where(strike, np.clip(focus - np.where(focused, 1, 2), 0, max_focus), focus)
+        risk = np.where(strike, risk + 5, risk)
+        focus = np.where(atk & ~strike, np.minimum(focus + 1, max_focus), focus)
+
+        self.hp[rows], self.focus[rows] = hp, focus
+        self.insight[rows], self.risk[rows] = insight, risk
+        self.e_hp[rows] = e_hp
+        self.turns[rows] += 1
+        self.encounter_turns[rows] += 1
+
+        won = rows[e_hp <= 0]
+        lost = rows[(e_hp > 0) & (hp <= 0)]
+        stalled = rows[(e_hp > 0) & (hp > 0) & (self.encounter_turns[rows] >= self.max_turns)]
+        self._finish_encounters(won, lost, stalled)
+
+    def run(self, policy=random_policy):
+        """Steps every climb to completion and returns the aggregated results."""
+        while self.active.any():
+            self.step(policy(self, self.rng))
+        return self.results()
+
+    def results(self):
+        """Per-climb outcome arrays, mirroring the _shutdown summary fields."""
+        played = self.action_counts.sum(axis=1) > 0
+        return {
+            "fights": self.fight_count.copy(),
+            "alive": self.alive.copy(),
+            "dominant_decision": np.where(played, self.action_counts.argmax(axis=1), -1),
+            "defeat_type": self.defeat_type.copy(),
+            "final_hp": self.hp.copy(),
+            "max_hp": self.max_hp.copy(),
+            "scars": self.scars.copy(),
+            "turns": self.turns.copy(),
+        }
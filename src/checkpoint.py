@@ -0,0 +1,217 @@
+"""
+Binary checkpoints of a tower run.
+
+A checkpoint holds everything needed to resume a run at the start of a
+floor: player stats, name, scars and perks, the encoded PlayerHistory, the
+floor reached, the tower's scaling curve and the RNG state. The format is little-endian struct data
+behind a magic/version/CRC32 header; it is written with an atomic rename
+(without fsync, so a crash can at worst leave a damaged file, which the CRC
+rejects) and encodes or decodes in tens of microseconds.
+"""
+import json
+import os
+import random
+import struct
+import zlib
+from array import array
+from .actions import ACTIONS
+from .history import PlayerHistory, RECENT_WINDOW
+from .storage import _atomic_write
+
+MAGIC = b"OPCK"
+CHECKPOINT_VERSION = 3  # 1 predates the stored curve, 2 had 16-bit string lengths
+
+_HEADER = struct.Struct("<4sHI")          # magic, version, CRC32 of the payload
+_RUN = struct.Struct("<IIiiiiiiQ")        # floor, fights, hp, max_hp, insight, focus, max_focus, risk, seed
+SEED_MASK = (1 << 64) - 1                 # seeds are stored in 64 bits
+_HISTORY = struct.Struct(f"<QHI{len(ACTIONS)}Q")  # length, buffer size, max runs, per-action totals
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_GAUSS = struct.Struct("<?d")             # gauss_next (set, value)
+_RNG_WORDS = 625                          # Mersenne Twister state words + position
+
+
+class CheckpointError(Exception):
+    """Raised when a checkpoint is missing, damaged or from another version."""
+
+
+def encode(engine, floor):
+    """
+    Serializes engine's run state for resuming at the start of floor.
+
+    Raises:
+        CheckpointError: a value does not fit the format (e.g. a stat outside 32 bits).
+    """
+    try:
+        return _encode(engine, floor)
+    except (struct.error, OverflowError) as e:
+        raise CheckpointError(f"Run state does not fit a checkpoint: {e}")
+
+
+def _encode(engine, floor):
+    player = engine.player
+    history = engine.player_history
+    parts = [_RUN.pack(floor, engine.fight_count, player.hp, player.max_hp, player.insight,
+                       player.focus, player.max_focus, player.risk, engine.seed)]
+
+    perk_bytes = player.perks.to_bytes((player.perks.bit_length() + 7) // 8, "little")
+    parts.append(_U16.pack(len(perk_bytes)))
+    parts.append(perk_bytes)
+
+    curve = json.dumps(engine.curve, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    parts.append(_U32.pack(len(curve)))
+    parts.append(curve)
+
+    _pack_str(parts, player.name)
+    parts.append(_U16.pack(len(player.permanent_scars)))
+    for scar in player.permanent_scars:
+        _pack_str(parts, scar)
+
+    parts.append(_HISTORY.pack(history.length, history.buffer.maxlen, history.max_runs, *history.totals))
+    parts.append(_U16.pack(len(history.buffer)))
+    parts.append(bytes(history.buffer))
+    parts.append(_U32.pack(history.run_count))
+    parts.append(_unwrap(history.run_codes, history.run_start, history.run_count))
+    parts.append(_unwrap(history.run_lengths, history.run_start, history.run_count).tobytes())
+
+    _, state, gauss = engine.rng.getstate()
+    parts.append(array("I", state).tobytes())
+    parts.append(_GAUSS.pack(gauss is not None, gauss or 0.0))
+
+    payload = b"".join(parts)
+    return _HEADER.pack(MAGIC, CHECKPOINT_VERSION, zlib.crc32(payload)) + payload
+
+
+def decode(data, engine):
+    """Restores a checkpoint into engine and returns the floor to resume at."""
+    if len(data) < _HEADER.size:
+        raise CheckpointError("Checkpoint is truncated.")
+    magic, version, crc = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise CheckpointError("Not an Outplay checkpoint.")
+    if version != CHECKPOINT_VERSION:
+        raise CheckpointError(f"Unsupported checkpoint version: {version}")
+    payload = memoryview(data)[_HEADER.size:]
+    if zlib.crc32(payload) != crc:
+        raise CheckpointError("Checkpoint is damaged.")
+
+    try:
+        return _restore(payload, engine)
+    except (struct.error, ValueError, IndexError) as e:
+        raise CheckpointError(f"Checkpoint is damaged: {e}")
+
+
+def _restore(payload, engine):
+    floor, fights, hp, max_hp, insight, focus, max_focus, risk, seed = _RUN.unpack_from(payload)
+    offset = _RUN.size
+
+    (n,) = _U16.unpack_from(payload, offset)
+    offset += 2
+    perks = int.from_bytes(payload[offset:offset + n], "little")
+    offset += n
+
+    (n,) = _U32.unpack_from(payload, offset)
+    offset += 4
+    curve = json.loads(str(payload[offset:offset + n], "utf-8"))
+    offset += n
+    if not isinstance(curve, dict):
+        raise CheckpointError("Checkpoint curve is not a mapping.")
+
+    name, offset = _unpack_str(payload, offset)
+    (n,) = _U16.unpack_from(payload, offset)
+    offset += 2
+    scars = []
+    for _ in range(n):
+        scar, offset = _unpack_str(payload, offset)
+        scars.append(scar)
+
+    length, buffer_size, max_runs, *totals = _HISTORY.unpack_from(payload, offset)
+    offset += _HISTORY.size
+    (n,) = _U16.unpack_from(payload, offset)
+    offset += 2
+    buffer = bytes(payload[offset:offset + n])
+    offset += n
+    (n,) = _U32.unpack_from(payload, offset)
+    offset += 4
+    if n > max_runs:
+        raise CheckpointError("Checkpoint has more runs than its history holds.")
+    run_codes = payload[offset:offset + n]
+    offset += n
+    run_lengths = array("I")
+    run_lengths.frombytes(payload[offset:offset + 4 * n])
+    offset += 4 * n
+
+    state = array("I")
+    state.frombytes(payload[offset:offset + 4 * _RNG_WORDS])
+    offset += 4 * _RNG_WORDS
+    has_gauss, gauss = _GAUSS.unpack_from(payload, offset)
+    offset += _GAUSS.size
+    if offset != len(payload):
+        raise CheckpointError("Checkpoint has trailing data.")
+
+    history = PlayerHistory(buffer_size=buffer_size, max_runs=max_runs)
+    history.buffer.extend(buffer)
+    history.run_codes[:n] = run_codes
+    history.run_lengths[:n] = run_lengths
+    history.run_count = n
+    history.run_last = n - 1
+    history.totals = list(totals)
+    history.length = length
+    window = history.window_counts
+    for code in buffer[-RECENT_WINDOW:]:
+        window[code] += 1
+
+    player = engine.player
+    player.name = name
+    player.hp, player.max_hp, player.insight = hp, max_hp, insight
+    player.focus, player.max_focus, player.risk = focus, max_focus, risk
+    player.perks = perks
+    player.permanent_scars = scars
+    engine.player_history = history
+    engine.fight_count = fights
+    engine.seed = seed
+    engine.curve = curve
+    engine.rng.setstate((random.Random.VERSION, tuple(state), gauss if has_gauss else None))
+    return floor
+
+
+def _unwrap(ring, start, count):
+    """The count items of a ring buffer starting at start, in order."""
+    end = start + count
+    if end <= len(ring):
+        return ring[start:end]
+    return ring[start:] + ring[:end - len(ring)]
+
+
+def _pack_str(parts, text):
+    raw = text.encode("utf-8")
+    parts.append(_U32.pack(len(raw)))
+    parts.append(raw)
+
+
+def _unpack_str(payload, offset):
+    (n,) = _U32.unpack_from(payload, offset)
+    offset += 4
+    return str(payload[offset:offset + n], "utf-8"), offset + n
+
+
+def save(engine, floor, path):
+    _atomic_write(path, encode(engine, floor), sync=False)
+
+
+def read(path):
+    """The raw bytes of the checkpoint at path."""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError as e:
+        raise CheckpointError(f"Could not read checkpoint: {e}")
+
+
+def load(path, engine):
+    """Restores the checkpoint at path into engine; returns the floor to resume at."""
+    return decode(read(path), engine)
+
+
+def exists(path):
+    return path is not None and os.path.exists(path)
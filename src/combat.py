@@ -1,194 +1,240 @@
-from .utils import clear_screen, safe_input, print_header, CLR
-from .memory import MemorySystem
+import asyncio
 import random
+from .utils import (safe_input, pause, CLR, render_header, render_box, get_progress_bar,
+                    get_player_ascii, get_enemy_ascii, COMPONENT_CACHE)
+from .render import FrameRenderer
+from .inputs import SyncInput
+from .metrics import METRICS
+from time import perf_counter
+from .memory import MemorySystem
+from .kernel import resolve_turn, determine_defeat_type, with_memory
+from .actions import ACTIONS
+from .autoplay import MCTSPlayer
+from .events import (EVENTS, FatigueApplied, AdaptationTriggered, MemoryPenalty, EnemyResponded,
+                     PerkActivated, TurnResolved)
+
+# Seconds the hint advisor may think
+HINT_BUDGET = 0.05
+
+# Perks that announce themselves in the combat log: (color, effect text)
+PERK_LOG = {
+    "Steady Breath": ("BLUE", "+1 Focus"),
+    "Iron Resolve": ("CYAN", "-2 Dmg"),
+    "Adrenaline": ("RED", "+4 Damage!"),
+}
+
+class CombatLog:
+    """
+    Subscriber that turns a turn's events into the colored combat log lines.
+    Subscribed once per encounter; CombatManager points `lines` at a fresh list
+    while it resolves a turn, so concurrent sessions never share a log.
+    """
+
+    def __init__(self):
+        self.lines = None
+        self.handlers = {
+            FatigueApplied: self._fatigue,
+            AdaptationTriggered: self._adaptation,
+            MemoryPenalty: self._memory,
+            EnemyResponded: self._response,
+            PerkActivated: self._perk,
+            TurnResolved: self._outcome,
+        }
+
+    def _fatigue(self, event):
+        if self.lines is None:
+            return
+        if event.stat == "focus":
+            self.lines.append(f"{CLR['RED']}Mental Strain: -{abs(event.amount)} Focus{CLR['RESET']}")
+        elif event.stat == "risk":
+            self.lines.append(f"{CLR['YELLOW']}Over-extension: +{event.amount}% Risk{CLR['RESET']}")
+
+    def _adaptation(self, event):
+        if self.lines is not None:
+            self.lines.append(f"{CLR['MAGENTA']}{event.enemy} has adapted to your style!{CLR['RESET']}")
+
+    def _memory(self, event):
+        if self.lines is not None:
+            self.lines.append(f"{CLR['BLUE']}You are losing concentration...{CLR['RESET']}")
+
+    def _response(self, event):
+        if self.lines is not None:
+            self.lines.append(f"You : {event.action}")
+            self.lines.append(f"{event.enemy} : {event.response}")
+
+    def _perk(self, event):
+        if self.lines is not None and event.perk in PERK_LOG:
+            color, text = PERK_LOG[event.perk]
+            self.lines.append(f"{CLR[color]}Perk: {event.perk} ({text}){CLR['RESET']}")
+
+    def _outcome(self, event):
+        turn_log = self.lines
+        if turn_log is None:
+            return
+        result = event.result
+        if result.blocked:
+            turn_log.append("Result: Attack partially blocked.")
+
+        outcome = result.outcome
+        if outcome == "CAUGHT":
+            turn_log.append(f"{CLR['RED']}Result: Caught off-guard! Take {result.damage_taken} dmg.{CLR['RESET']}")
+        elif outcome == "INSIGHT":
+            turn_log.append(f"{CLR['GREEN']}Result: Insights gained (+{result.insight_gain}).{CLR['RESET']}")
+        elif outcome == "FORCED_GUARD":
+            turn_log.append(f"Result: Forced their guard! ({result.damage_dealt} dmg)")
+        elif outcome == "STRESSED":
+            turn_log.append(f"Result: Keeping them stressed ({result.damage_dealt} dmg)")
+        elif outcome == "COUNTER":
+            turn_log.append(f"{CLR['BOLD']}Result: PERFECT COUNTER! ({result.damage_dealt} dmg){CLR['RESET']}")
+        elif outcome == "NO_BITE":
+            turn_log.append("Result: They didn't bite. Risk increased.")
+        elif outcome == "STRUCK":
+            turn_log.append(f"Result: Struck for {result.damage_dealt} dmg.")
+        elif outcome == "EXHAUSTED":
+            turn_log.append(f"{CLR['YELLOW']}Result: Too exhausted to attack.{CLR['RESET']}")
+
+COMBAT_LOG = CombatLog()
+
+def _build_portraits(player_name, enemy_name):
+    p_ascii = get_player_ascii()
+    e_ascii = get_enemy_ascii(enemy_name)
+    
+    # Center padding
+    vs_logo = "      VS      "
+    
+    lines = ["", f"      {CLR['GREEN']}{player_name.center(15)}{CLR['RESET']} {vs_logo} {CLR['RED']}{enemy_name.center(15)}{CLR['RESET']}"]
+    for i in range(len(p_ascii)):
+        p_line = p_ascii[i].center(22)
+        e_line = e_ascii[i].center(22)
+        lines.append(f"{p_line}{' ' * 10}{e_line}")
+    return tuple(lines)
 
 class CombatManager:
-    def __init__(self, player, enemy, player_history):
+    def __init__(self, player, enemy, player_history, memory_size=5, rng=random,
+                 input_fn=safe_input, pause_fn=pause, policy=None, input_source=None, turn_timeout=None):
         self.player = player
         self.enemy = enemy
         self.player_history = player_history
-        self.memory = MemorySystem(size=5)
+        self.memory = MemorySystem(size=memory_size)
+        self.rng = rng
+        self.input = input_source if input_source is not None else SyncInput(input_fn, pause_fn)
+        self.read_input = self.input.read
+        self.pause = self.input.pause
+        self.turn_timeout = turn_timeout  # seconds before a hesitating player is forced to OBSERVE
+        # policy(player, enemy, player_history, memory) plays instead of the prompt
+        self.policy = with_memory(policy) if policy is not None else None
+        self.advisor = None
 
-    def start_encounter(self):
-        """Main combat loop."""
+    async def start_encounter(self):
+        """Main combat loop; the combat log is subscribed for its duration."""
+        with EVENTS.subscribed(COMBAT_LOG.handlers):
+            return await self._encounter_loop()
+
+    async def _encounter_loop(self):
         combat_active = True
         last_log = ["The air grows heavy as you face your opponent...", "Waiting for your move."]
+        renderer = FrameRenderer()
         
         while combat_active and self.player.hp > 0 and self.enemy.hp > 0:
-            clear_screen()
-            from .utils import get_progress_bar, get_player_ascii, get_enemy_ascii, box_text
-            
-            # --- SYMMETRIC UI HEADER ---
-            print_header("CHRONICLE OF CONFLICT", color="MAGENTA")
-            
-            # ASCII Portraits
-            p_ascii = get_player_ascii()
-            e_ascii = get_enemy_ascii(self.enemy.name)
-            
-            # Center padding
-            vs_logo = "      VS      "
-            
-            print(f"\n      {CLR['GREEN']}{self.player.name.center(15)}{CLR['RESET']} {vs_logo} {CLR['RED']}{self.enemy.name.center(15)}{CLR['RESET']}")
-            for i in range(len(p_ascii)):
-                p_line = p_ascii[i].center(22)
-                e_line = e_ascii[i].center(22)
-                print(f"{p_line}{' ' * 10}{e_line}")
-                
-            # Status Bars
-            p_hp_bar = get_progress_bar(self.player.hp, self.player.max_hp, length=15, color_mapping="HP")
-            e_hp_bar = get_progress_bar(self.enemy.hp, self.enemy.max_hp, length=15, color_mapping="HP")
-            p_focus_bar = get_progress_bar(self.player.focus, self.player.max_focus, length=15, color_mapping="FOCUS")
-            
-            print(f"\n HP: {p_hp_bar}      HP: {e_hp_bar}")
-            print(f" FC: {p_focus_bar}      STAT: {CLR['YELLOW']}Aggression {self.enemy.aggression}{CLR['RESET']}")
-            
-            # Memory Context
-            print(f"\n{CLR['BOLD']}History:{CLR['RESET']} {CLR['CYAN']}{self.memory.get_history_summary()}{CLR['RESET']}")
-            
-            # --- COMBAT LOG ---
-            box_text(last_log, width=60, title="COMBAT LOG", color="YELLOW")
-            
-            # --- ACTIONS ---
-            print("\n1. Observe  (Insight↑ Risk↓)   2. Pressure (Stress Enemy)")
-            print("3. Bait     (Risk↑↑ Counter)   4. Attack   (Focus Cost)")
+            if METRICS.enabled:
+                started = perf_counter()
+                renderer.render(self._compose_frame(last_log))
+                METRICS.phase("render", perf_counter() - started)
+            else:
+                renderer.render(self._compose_frame(last_log))
             
-            choice = safe_input("\nChoose your tactic: ")
+            hesitated = False
+            if self.policy is not None:
+                choice = self.policy(self.player, self.enemy, self.player_history, self.memory)
+                choice = str(ACTIONS.index(choice) + 1)
+            elif self.turn_timeout is not None:
+                try:
+                    choice = await asyncio.wait_for(self.read_input("\nChoose your tactic: "), self.turn_timeout)
+                except asyncio.TimeoutError:
+                    choice = "1"
+                    hesitated = True
+            else:
+                choice = await self.read_input("\nChoose your tactic: ")
             
             if choice == "1":
                 last_log = self._execute_turn("OBSERVE")
+                if hesitated:
+                    last_log.insert(0, f"{CLR['RED']}You hesitated too long and could only watch.{CLR['RESET']}")
             elif choice == "2":
                 last_log = self._execute_turn("PRESSURE")
             elif choice == "3":
                 last_log = self._execute_turn("BAIT")
             elif choice == "4":
                 last_log = self._execute_turn("ATTACK")
+            elif choice in ("h", "H"):
+                last_log = self._hint()
             elif choice is None:
                 return "EXIT"
             else:
                 last_log = ["Invalid tactic. They are closing in...", "Try again."]
-                input()
+                await self.pause()
 
             if self.enemy.hp <= 0:
                 print(f"\n{CLR['BOLD']}[!] {self.enemy.name} has been suppressed.{CLR['RESET']}")
-                input()
+                await self.pause()
                 return "VICTORY"
             elif self.player.hp <= 0:
                 return self._determine_defeat_type()
 
         return "VICTORY" if self.enemy.hp <= 0 else "DEFEAT"
 
-    def _determine_defeat_type(self):
-        """Logic to decide the nature of the player's defeat."""
-        last_action = self.player_history[-1] if self.player_history else "NONE"
-        
-        if self.player.risk > 50:
-            return "PHYSICAL_TRAUMA"  # Hit 0 HP with high risk
-        elif self.player.focus <= 2:
-            return "MENTAL_COLLAPSE"  # Hit 0 HP while mentally exhausted
-        elif last_action == "OBSERVE":
-            return "ESCAPED_COWARDLY" # Lost while being passive
-        else:
-            return "DEFEAT"
-
-    def _execute_turn(self, player_action):
-        turn_log = []
-        
-        # Calculate modifiers
-        mem_modifier = self.memory.get_effectiveness_modifier(player_action)
-        enemy_modifier = self.enemy.get_adaptation_penalty(player_action, self.player_history)
+    def _compose_frame(self, last_log):
+        """Builds the full combat screen as a list of lines."""
+        # --- SYMMETRIC UI HEADER ---
+        frame = render_header("CHRONICLE OF CONFLICT", color="MAGENTA")
         
-        # Combined effectiveness
-        modifier = min(mem_modifier, enemy_modifier)
+        # ASCII Portraits
+        frame.extend(COMPONENT_CACHE.get(("portraits", self.player.name, self.enemy.name),
+                                         _build_portraits, self.player.name, self.enemy.name))
+            
+        # Status Bars
+        p_hp_bar = get_progress_bar(self.player.hp, self.player.max_hp, length=15, color_mapping="HP")
+        e_hp_bar = get_progress_bar(self.enemy.hp, self.enemy.max_hp, length=15, color_mapping="HP")
+        p_focus_bar = get_progress_bar(self.player.focus, self.player.max_focus, length=15, color_mapping="FOCUS")
         
-        # Apply Fatigue System
-        fatigue_effects = self.memory.get_fatigue_triggers(player_action)
-        if fatigue_effects:
-            if "focus" in fatigue_effects:
-                turn_log.append(f"{CLR['RED']}Mental Strain: -{abs(fatigue_effects['focus'])} Focus{CLR['RESET']}")
-            if "risk" in fatigue_effects:
-                turn_log.append(f"{CLR['YELLOW']}Over-extension: +{fatigue_effects['risk']}% Risk{CLR['RESET']}")
-            self.player.apply_decision_effect(fatigue_effects, silent=True)
+        frame.append("")
+        frame.append(f" HP: {p_hp_bar}      HP: {e_hp_bar}")
+        frame.append(f" FC: {p_focus_bar}      STAT: {CLR['YELLOW']}Aggression {self.enemy.aggression}{CLR['RESET']}")
         
-        self.player_history.append(player_action)
-        self.memory.record_decision(player_action)
+        # Memory Context
+        frame.append("")
+        frame.append(f"{CLR['BOLD']}History:{CLR['RESET']} {CLR['CYAN']}{self.memory.get_history_summary()}{CLR['RESET']}")
         
-        enemy_action = self.enemy.choose_response(self.player_history)
+        # --- COMBAT LOG ---
+        frame.extend(render_box(last_log, width=60, title="COMBAT LOG", color="YELLOW"))
         
-        if modifier < 1.0:
-            if enemy_modifier < mem_modifier:
-                turn_log.append(f"{CLR['MAGENTA']}{self.enemy.name} has adapted to your style!{CLR['RESET']}")
-            else:
-                turn_log.append(f"{CLR['BLUE']}You are losing concentration...{CLR['RESET']}")
-            
-        turn_log.append(f"You : {player_action}")
-        turn_log.append(f"{self.enemy.name} : {enemy_action}")
-
-        # RESOLUTION LOGIC
-        if player_action == "OBSERVE":
-            insight_gain = int(2 * modifier)
-            if "Keen Insight" in self.player.perks:
-                insight_gain += 1
-            
-            self.player.apply_decision_effect({"insight": insight_gain, "risk": -5}, silent=True)
-            
-            if "Steady Breath" in self.player.perks:
-                self.player.apply_decision_effect({"focus": 1}, silent=True)
-                turn_log.append(f"{CLR['BLUE']}Perk: Steady Breath (+1 Focus){CLR['RESET']}")
-
-            if enemy_action == "ATTACK":
-                risk_multiplier = 1.0 + (self.player.risk / 100.0)
-                dmg = int(5 * risk_multiplier)
-                
-                if "Iron Resolve" in self.player.perks:
-                    dmg = max(1, dmg - 2)
-                    turn_log.append(f"{CLR['CYAN']}Perk: Iron Resolve (-2 Dmg){CLR['RESET']}")
-
-                self.player.apply_decision_effect({"hp": -dmg, "insight": 1}, silent=True)
-                turn_log.append(f"{CLR['RED']}Result: Caught off-guard! Take {dmg} dmg.{CLR['RESET']}")
-            else:
-                turn_log.append(f"{CLR['GREEN']}Result: Insights gained (+{insight_gain}).{CLR['RESET']}")
-
-        elif player_action == "PRESSURE":
-            dmg = int(random.randint(3, 7) * modifier)
-            self.enemy.hp -= dmg
-            self.player.apply_decision_effect({"risk": 2, "focus": -1}, silent=True)
-            if enemy_action == "DEFEND":
-                turn_log.append(f"Result: Forced their guard! ({dmg} dmg)")
-            else:
-                turn_log.append(f"Result: Keeping them stressed ({dmg} dmg)")
-
-        elif player_action == "BAIT":
-            self.player.apply_decision_effect({"risk": 15}, silent=True)
-            if enemy_action == "ATTACK":
-                counter_dmg = int((15 + (self.player.insight // 2)) * modifier)
-                self.enemy.hp -= counter_dmg
-                self.player.apply_decision_effect({"risk": -10, "focus": 2}, silent=True)
-                turn_log.append(f"{CLR['BOLD']}Result: PERFECT COUNTER! ({counter_dmg} dmg){CLR['RESET']}")
-            else:
-                turn_log.append(f"Result: They didn't bite. Risk increased.")
-
-        elif player_action == "ATTACK":
-            if self.player.focus >= 2 or ("Focused Mind" in self.player.perks and self.player.focus >= 1):
-                base_dmg = int((8 + (self.player.insight // 3)) * modifier)
-                
-                if "Adrenaline" in self.player.perks and self.player.risk > 40:
-                    base_dmg += 4
-                    turn_log.append(f"{CLR['RED']}Perk: Adrenaline (+4 Damage!){CLR['RESET']}")
-
-                if enemy_action == "DEFEND":
-                    base_dmg //= 2
-                    turn_log.append(f"Result: Attack partially blocked.")
-                
-                self.enemy.hp -= base_dmg
-                
-                focus_cost = -2
-                if "Focused Mind" in self.player.perks:
-                    focus_cost = -1
-                
-                self.player.apply_decision_effect({"focus": focus_cost, "risk": 5}, silent=True)
-                turn_log.append(f"Result: Struck for {base_dmg} dmg.")
-            else:
-                turn_log.append(f"{CLR['YELLOW']}Result: Too exhausted to attack.{CLR['RESET']}")
-                self.player.apply_decision_effect({"focus": 1}, silent=True)
+        # --- ACTIONS ---
+        frame.append("")
+        frame.append("1. Observe  (Insight↑ Risk↓)   2. Pressure (Stress Enemy)")
+        frame.append("3. Bait     (Risk↑↑ Counter)   4. Attack   (Focus Cost)")
+        frame.append(f"{CLR['BLUE']}H. Hint{CLR['RESET']}")
+        return frame
 
+    def _hint(self):
+        """Asks the MCTS advisor for a tactic; uses its own RNG so seeded runs are unaffected."""
+        if self.advisor is None:
+            self.advisor = MCTSPlayer(budget=HINT_BUDGET)
+        action = self.advisor.choose(self.player, self.enemy, self.player_history, self.memory)
+        scores = self.advisor.scores()
+        ranked = "  ".join(f"{a[:4]} {scores[a]:.2f}" for a in ACTIONS if a in scores)
+        return [f"{CLR['BLUE']}Hint: {action} looks strongest.{CLR['RESET']}",
+                f"Playout scores: {ranked}",
+                f"({self.advisor.last_playouts} playouts in {self.advisor.last_elapsed * 1000:.0f} ms)"]
+
+    def _determine_defeat_type(self):
+        """Logic to decide the nature of the player's defeat."""
+        return determine_defeat_type(self.player, self.player_history)
+
+    def _execute_turn(self, player_action):
+        """Resolves a turn and returns its combat log, built from the turn's events."""
+        turn_log = COMBAT_LOG.lines = []
+        try:
+            resolve_turn(self.player, self.enemy, self.memory, self.player_history, player_action, self.rng)
+        finally:
+            COMBAT_LOG.lines = None
         return turn_log
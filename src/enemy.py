@@ -1,8 +1,18 @@
 import random
 from .utils import print_header, CLR
+from .actions import ACTIONS, ENEMY_ACTIONS, action_code
+from .sampling import AliasTable
+from .history import PlayerHistory, RECENT_WINDOW as HISTORY_WINDOW
+from .patterns import PatternModel
+from .events import EVENTS, AdaptationTriggered
+
+# Decision tables depend only on traits, so enemies with equal traits share them
+_DECISION_TABLES = {}
 
 class Enemy:
-    def __init__(self, name="Shadow", aggression=5, patience=5, adapt_rate=2):
+    __slots__ = ("name", "aggression", "patience", "adapt_rate", "hp", "max_hp", "decision_table", "pattern")
+
+    def __init__(self, name="Shadow", aggression=5, patience=5, adapt_rate=2, pattern_order=0, pattern_decay=0.9):
         """
         Initializes an Enemy with specific behavioral traits.
         
@@ -11,6 +21,9 @@ class Enemy:
             aggression (int): Propensity to attack (1-10).
             patience (int): Propensity to wait/defend (1-10).
             adapt_rate (int): How quickly it learns from player patterns (1-10).
+            pattern_order (int): Longest action sequence the enemy learns to
+                anticipate (0: it only tracks the player's most frequent recent action).
+            pattern_decay (float): How much of what it learned survives each player action.
         """
         self.name = name
         self.aggression = aggression
@@ -18,10 +31,13 @@ class Enemy:
         self.adapt_rate = adapt_rate
         self.hp = 50
         self.max_hp = 50
+        self.pattern = PatternModel(pattern_order, pattern_decay) if pattern_order else None
+        self.build_decision_table()
 
-    def choose_response(self, player_history):
+    def response_weights(self, most_frequent=None, freq_count=0):
         """
-        Determines the enemy's next action based on its traits and the player's history.
+        Response weights (ATTACK, DEFEND, WAIT, COUNTER) given the player's most
+        frequent recent action and how often it appeared.
         """
         # Baseline weights
         weights = {
@@ -30,14 +46,6 @@ class Enemy:
             'WAIT': max(1, 10 - self.aggression),
             'COUNTER': 0
         }
-        
-        if not player_history:
-            return random.choices(list(weights.keys()), weights=list(weights.values()))[0]
-
-        # Analyze player patterns
-        recent_5 = player_history[-5:]
-        most_frequent = max(set(recent_5), key=recent_5.count)
-        freq_count = recent_5.count(most_frequent)
 
         # Strategic Adaptation based on player's most used tactic
         if most_frequent == "ATTACK":
@@ -50,12 +58,61 @@ class Enemy:
             weights['DEFEND'] += self.adapt_rate
         elif most_frequent == "OBSERVE":
             weights['ATTACK'] += self.adapt_rate * 1.2
-            
-        # Add slight randomness/unpredictability
-        chosen_action = random.choices(list(weights.keys()), weights=list(weights.values()))[0]
-        return chosen_action
 
-    def get_adaptation_penalty(self, player_action, player_history):
+        return [weights[a] for a in ENEMY_ACTIONS]
+
+    def build_decision_table(self):
+        """
+        Precomputes an alias table for every (most frequent action, frequency)
+        state. Call again after changing aggression, patience or adapt_rate.
+        """
+        key = (self.aggression, self.patience, self.adapt_rate)
+        table = _DECISION_TABLES.get(key)
+        if table is None:
+            table = [AliasTable(self.response_weights())]
+            for action in ACTIONS:
+                for freq in range(1, HISTORY_WINDOW + 1):
+                    table.append(AliasTable(self.response_weights(action, freq)))
+            table = _DECISION_TABLES[key] = tuple(table)
+        self.decision_table = table
+
+    def decision_state(self, player_history):
+        """Index into decision_table for the player's PlayerHistory."""
+        if not player_history:
+            return 0
+        # Ties break in canonical action order so every engine agrees on the pick
+        most_frequent, freq_count = player_history.most_frequent_recent()
+        # The history already holds the action being answered: predict that one,
+        # from what the enemy had seen before it (as get_adaptation_penalty does)
+        pattern = self._pattern(player_history, skip=1)
+        if pattern is not None:
+            predicted = pattern.predict(player_history, skip=1)
+            if predicted is not None:
+                # A confidently predicted action is countered like one repeated that often
+                code, probability = predicted
+                freq = int(probability * HISTORY_WINDOW + 0.5)
+                if freq > freq_count:
+                    most_frequent, freq_count = code, freq
+        return 1 + most_frequent * HISTORY_WINDOW + freq_count - 1
+
+    def _pattern(self, player_history, skip=0):
+        """
+        The pattern model, caught up with a live PlayerHistory except its last
+        skip actions (lookahead views only read it).
+        """
+        pattern = self.pattern
+        if pattern is not None and type(player_history) is PlayerHistory:
+            pattern.sync(player_history, skip)
+        return pattern
+
+    def choose_response(self, player_history, rng=random):
+        """
+        Determines the enemy's next action based on its traits and the player's history.
+        """
+        table = self.decision_table[self.decision_state(player_history)]
+        return ENEMY_ACTIONS[table.sample(rng)]
+
+    def get_adaptation_penalty(self, player_action, player_history, silent=False):
         """
         Returns a penalty modifier (0.0 to 1.0) based on how much the enemy 
         has adapted to this specific player action.
@@ -63,8 +120,12 @@ class Enemy:
         if not player_history:
             return 1.0
             
-        recent_5 = player_history[-5:]
-        occurrence = recent_5.count(player_action)
+        occurrence = player_history.window_count(player_action)
+        pattern = self._pattern(player_history)
+        if pattern is not None:
+            # An action the enemy saw coming counts as seen that often
+            expected = pattern.probability(action_code(player_action), player_history) * HISTORY_WINDOW
+            occurrence = max(occurrence, expected)
         
         # Every time the same action is in the history, effectiveness drops
         # based on the enemy's adapt_rate
@@ -72,8 +133,8 @@ class Enemy:
         
         modifier = max(0.4, 1.0 - penalty)
         
-        if modifier < 1.0:
-            print(f"[{self.name}] I've seen your {player_action} before. It won't work as well now.")
+        if modifier < 1.0 and not silent and EVENTS.wants(AdaptationTriggered):
+            EVENTS.publish(AdaptationTriggered(self.name, ACTIONS[action_code(player_action)], modifier))
             
         return modifier
 
@@ -1,29 +1,96 @@
-from .utils import clear_screen, safe_input, print_header, CLR, print_logo, box_text, print_subheader
+from .utils import clear_screen, safe_input, pause, print_header, CLR, print_logo, box_text, print_subheader
 from .player import Player
-from .enemy import Enemy
 from .combat import CombatManager
-import json
+from .history import PlayerHistory
+from .perks import PERKS
+from .floors import Tower, DEFAULT_CURVE
+from . import checkpoint
+from .storage import RunHistoryStore
+from .halloffame import HallOfFame
+from .metrics import METRICS
+from .inputs import SyncInput
+from .events import EVENTS, PermanentPenalty, StatChanged, UnknownStat, Recovered
+from time import perf_counter
+import asyncio
 import os
+import random
+
+
+def _narrate(event):
+    """Prints the player's rest and scar announcements between screens."""
+    print(f"\n{event}" if isinstance(event, PermanentPenalty) else event)
+
+
+# Player events the terminal announces while a run is in progress
+NARRATION = {PermanentPenalty: _narrate, StatChanged: _narrate, UnknownStat: _narrate, Recovered: _narrate}
 
 class GameEngine:
-    def __init__(self):
+    def __init__(self, seed=None, rng=None, input_fn=safe_input, pause_fn=pause, persist=True, policy=None,
+                 input_source=None, turn_timeout=None, checkpoint_path="checkpoint.bin", curve=DEFAULT_CURVE):
+        """
+        Args:
+            seed (int): Seed for this run's RNG; a fresh one is drawn when omitted.
+            rng (random.Random): RNG to use instead of random.Random(seed).
+            input_fn (callable): Reads a player choice; returns None when cancelled.
+            pause_fn (callable): Waits at "Press Enter" prompts.
+            input_source: Async source (see inputs.py) used instead of input_fn/pause_fn.
+            persist (bool): Record the run in the history store and Hall of Fame,
+                and checkpoint it after every floor.
+            policy (callable): Picks combat tactics instead of the player
+                (e.g. an autoplay.MCTSPlayer); menus still go through input_fn.
+            turn_timeout (float): Seconds to pick a tactic before being forced to
+                OBSERVE; needs a non-blocking input_source to take effect.
+            checkpoint_path (str): Where the run is checkpointed (None disables).
+            curve (dict): Tower scaling curve (see floors.py); endless unless it sets max_floor.
+        """
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+        self.seed = seed & checkpoint.SEED_MASK  # any int; checkpoints keep 64 bits of it
+        self.rng = rng if rng is not None else random.Random(self.seed)
+        self.input = input_source if input_source is not None else SyncInput(input_fn, pause_fn)
+        self.read_input = self.input.read
+        self.pause = self.input.pause
+        self.persist = persist
+        self.policy = policy
+        self.turn_timeout = turn_timeout
+        self.pending_saves = []
+        self.summary = None  # set once the run has ended
+        self.checkpoint_path = checkpoint_path if persist else None
+        self.resume_data = None   # checkpoint bytes to offer as "Continue" instead of checkpoint_path (replays)
+        self.resumed_from = None  # checkpoint bytes this session continued from
+        self.in_run = False       # a run was started or continued this session
+        self.floor = 1
+        self.curve = curve
+        self.ascended = False  # cleared the top floor of a finite tower
         self.is_running = True
         self.player = Player()
-        self.player_history = []
+        self.player_history = PlayerHistory()
         self.fight_count = 0
         self.state = "MENU" # MENU, PLAYING, EXIT
 
     def start(self):
-        """Starts the main game loop."""
-        while self.is_running:
-            if self.state == "MENU":
-                self._handle_menu()
-            elif self.state == "PLAYING":
-                self._handle_gameplay()
-            elif self.state == "EXIT":
-                self._shutdown()
+        """Runs the game to completion (blocking wrapper around run())."""
+        asyncio.run(self.run())
+
+    async def run(self):
+        """Main game loop; returns once the run is over and its history is saved."""
+        with EVENTS.subscribed(NARRATION):
+            while self.is_running:
+                state = self.state
+                if METRICS.enabled:
+                    started = perf_counter()
+                if state == "MENU":
+                    await self._handle_menu()
+                elif state == "PLAYING":
+                    await self._handle_gameplay()
+                elif state == "EXIT":
+                    await self._shutdown()
+                if METRICS.enabled:
+                    METRICS.state(state, perf_counter() - started)
+        if self.pending_saves:
+            await asyncio.gather(*self.pending_saves)
 
-    def _handle_menu(self):
+    async def _handle_menu(self):
         clear_screen()
         print_logo()
         
@@ -32,118 +99,181 @@ class GameEngine:
             "2. View Hall of Fame",
             "3. Quit"
         ]
+        can_continue = self.resume_data is not None or checkpoint.exists(self.checkpoint_path)
+        if can_continue:
+            menu_options.append("4. Continue Chronicle")
         box_text(menu_options, width=40, title="MAIN MENU", color="CYAN")
         
-        choice = safe_input("\nChoose an option: ")
+        choice = await self.read_input("\nChoose an option: ")
         
         if choice == "1":
-            name = safe_input("\nEnter your name, Traveler: ")
+            name = await self.read_input("\nEnter your name, Traveler: ")
             if name:
                 self.player.name = name
                 
+            self.in_run = True
             self.state = "PLAYING"
         elif choice == "2":
-            clear_screen()
-            print_header("HALL OF FAME")
-            print("Feature coming soon! (Wait for next upgrade, King!)")
-            input("\nPress Enter to return...")
+            await self._show_hall_of_fame()
         elif choice == "3" or choice is None:
             self.state = "EXIT"
+        elif choice == "4" and can_continue:
+            await self._continue_run()
         else:
             print(f"{CLR['RED']}Invalid choice.{CLR['RESET']}")
-            input("Press Enter to try again.")
+            await self.pause("Press Enter to try again.")
+
+    async def _continue_run(self):
+        try:
+            data = self.resume_data if self.resume_data is not None else checkpoint.read(self.checkpoint_path)
+            self.floor = checkpoint.decode(data, self)
+        except checkpoint.CheckpointError as e:
+            print(f"\n{CLR['RED']}[Warning] Could not continue: {e}{CLR['RESET']}")
+            await self.pause("\nPress Enter to return...")
+            return
+        self.resumed_from = data
+        print(f"\n{CLR['GREEN']}Welcome back, {self.player.name}. Floor {self.floor} awaits.{CLR['RESET']}")
+        self.in_run = True
+        self.state = "PLAYING"
+
+    def _save_checkpoint(self, floor):
+        self.floor = floor
+        if self.checkpoint_path is None:
+            return
+        try:
+            checkpoint.save(self, floor, self.checkpoint_path)
+        except (OSError, checkpoint.CheckpointError) as e:
+            print(f"\n{CLR['RED']}[Warning] Could not save checkpoint: {e}{CLR['RESET']}")
+
+    def _clear_checkpoint(self):
+        if checkpoint.exists(self.checkpoint_path):
+            try:
+                os.remove(self.checkpoint_path)
+            except OSError:
+                pass
+
+    async def _show_hall_of_fame(self):
+        clear_screen()
+        print_header("HALL OF FAME")
+
+        try:
+            # SQLite (and the first call's archive backfill) would block the event loop
+            top, decisions, endings = await asyncio.to_thread(self._read_hall_of_fame)
+        except Exception as e:
+            print(f"\n{CLR['RED']}[Warning] Could not read the Hall of Fame: {e}{CLR['RESET']}")
+            await self.pause("\nPress Enter to return...")
+            return
+
+        if not top:
+            print("\nNo chronicles have been written yet.")
+        else:
+            lines = [f"{i}. {r['player_name'][:16]:<16} Floor {r['fights']:<4} {r['dominant_decision']:<8} {r['ending_type']}"
+                     for i, r in enumerate(top, 1)]
+            box_text(lines, width=60, title="GREATEST ASCENSIONS", color="YELLOW")
+            tactics = ", ".join(f"{k}: {v}" for k, v in decisions.items())
+            fates = ", ".join(f"{k}: {v}" for k, v in endings.items())
+            box_text([f"Tactics : {tactics}", f"Fates   : {fates}"], width=60, title="LEGENDS", color="CYAN")
 
-    def _handle_gameplay(self):
-        floor = 1
+        await self.pause("\nPress Enter to return...")
+
+    @staticmethod
+    def _read_hall_of_fame():
+        hall = HallOfFame(store=RunHistoryStore())
+        try:
+            hall.import_from()
+            return hall.top(5), hall.decision_counts(), hall.ending_counts()
+        finally:
+            hall.close()
+
+    async def _handle_gameplay(self):
+        floor = self.floor
+        tower = Tower(self.curve, self.seed)
         tower_active = True
         
         while tower_active and self.player.hp > 0:
             clear_screen()
             print_header(f"FLOOR {floor}: THE ASCENSION", color="MAGENTA")
             
-            # 1. Scaling Difficulty
-            difficulty_mult = 1.0 + (floor - 1) * 0.15 # 15% stronger per floor
-            
-            # 2. Dynamic Enemy Spawning
-            enemy_name = "Shadow Stalker" if floor % 5 != 0 else "TOWER GUARDIAN"
-            aggro = min(10, 3 + floor // 2)
-            adaptation = min(10, 2 + floor // 4)
-            
-            enemy = Enemy(
-                enemy_name, 
-                aggression=aggro, 
-                patience=min(10, 2 + floor // 3), 
-                adapt_rate=adaptation
-            )
-            enemy.max_hp = int(enemy.max_hp * difficulty_mult)
-            enemy.hp = enemy.max_hp
+            # 1-2. Scaling Difficulty and Dynamic Enemy Spawning
+            spec = tower.spec(floor)
+            enemy = spec.spawn()
             
-            if floor % 5 == 0:
+            if spec.boss:
                 print(f"\n{CLR['RED']}{CLR['BOLD']}!!! WARNING: BOSS FLOOR !!!{CLR['RESET']}")
                 print(f"You feel an overwhelming presence at floor {floor}...")
             else:
                 print(f"\n{CLR['CYAN']}Floor {floor}: A new challenger awaits...{CLR['RESET']}")
             
-            input("\nPress Enter to engage...")
+            await self.pause("\nPress Enter to engage...")
             
             # 3. Combat
-            combat = CombatManager(self.player, enemy, self.player_history)
-            result = combat.start_encounter()
+            combat = CombatManager(self.player, enemy, self.player_history, rng=self.rng,
+                                   input_source=self.input, policy=self.policy, turn_timeout=self.turn_timeout)
+            result = await combat.start_encounter()
             
             if result == "EXIT":
                 self.state = "EXIT"
                 return
             
-            self._process_combat_result(result)
+            await self._process_combat_result(result)
             
             if self.player.hp <= 0:
                 tower_active = False
+                self._clear_checkpoint()
                 print_header("TOWER OVERRUN", color="RED")
                 print(f"\nYou fell at Floor {floor}. Your legend ends here.")
-                input("\nPress Enter to witness your chronicle...")
+                await self.pause("\nPress Enter to witness your chronicle...")
                 self.state = "EXIT"
                 return
 
             self.fight_count = floor # Track progress
+            if METRICS.enabled:
+                METRICS.count("floors")
             
             # 4. Perk Selection (EVERY FLOOR)
-            self._handle_perk_selection(floor)
+            await self._handle_perk_selection(floor)
             
             floor += 1
+            if not tower.has_floor(floor):
+                await self._handle_summit(floor - 1)
+                return
             
             # 5. Rest Stops (Every 2 floors)
             if tower_active and floor % 2 == 0:
-                self._handle_rest_stop()
+                await self._handle_rest_stop()
+
+            # 6. Checkpoint the start of the next floor
+            self._save_checkpoint(floor)
 
-    def _handle_perk_selection(self, floor):
-        import random
+    async def _handle_summit(self, floor):
+        self.ascended = True
+        self._clear_checkpoint()
+        clear_screen()
+        print_header("THE SUMMIT", color="YELLOW")
+        print(f"\nFloor {floor} was the last. The tower has nothing left to teach you.")
+        await self.pause("\nPress Enter to witness your chronicle...")
+        self.state = "EXIT"
+
+    async def _handle_perk_selection(self, floor):
         clear_screen()
         print_header(f"SOUL FRAGMENT: FLOOR {floor}", color="CYAN")
         
-        all_perks = {
-            "Focused Mind": "Attack Focus cost reduced by 1",
-            "Iron Resolve": "Reduce all damage taken by 2",
-            "Keen Insight": "Gain +1 extra Insight when Observing",
-            "Adrenaline": "Deal +4 damage if Risk is above 40%",
-            "Steady Breath": "Recover +1 Focus during local Observation"
-        }
-        
         # Pick 3 random perks the player doesn't have yet (if possible)
-        available = [p for p in all_perks.keys() if p not in self.player.perks]
+        available = [p for p in PERKS if not p.bit & self.player.perks]
         if not available:
             print("\nYou have mastered all fragments. Your soul is complete.")
-            input("\nPress Enter to continue...")
+            await self.pause("\nPress Enter to continue...")
             return
 
-        choices = random.sample(available, min(3, len(available)))
+        choices = self.rng.sample(available, min(3, len(available)))
         
         lines = []
         for i, p in enumerate(choices, 1):
-            lines.append(f"{i}. {p}: {all_perks[p]}")
+            lines.append(f"{i}. {p.name}: {p.description}")
         
         box_text(lines, width=55, title="CHOOSE A PERK", color="CYAN")
         
-        choice = safe_input("\nSelect a fragment to absorb: ")
+        choice = await self.read_input("\nSelect a fragment to absorb: ")
         
         idx = -1
         try:
@@ -151,16 +281,16 @@ class GameEngine:
                 idx = int(choice) - 1
             if 0 <= idx < len(choices):
                 chosen_perk = choices[idx]
-                self.player.perks.append(chosen_perk)
-                print(f"\n{CLR['GREEN']}[!] Inherited Perk: {chosen_perk}{CLR['RESET']}")
+                self.player.perks |= chosen_perk.bit
+                print(f"\n{CLR['GREEN']}[!] Inherited Perk: {chosen_perk.name}{CLR['RESET']}")
             else:
                 print("\nYou failed to grasp the soul. The fragment shatters...")
         except:
             print("\nThe fragment vanishes into the void.")
             
-        input("\nPress Enter to continue ascension...")
+        await self.pause("\nPress Enter to continue ascension...")
 
-    def _handle_rest_stop(self):
+    async def _handle_rest_stop(self):
         clear_screen()
         print_header("TOWER SANCTUARY", color="GREEN")
         
@@ -171,7 +301,7 @@ class GameEngine:
         ]
         box_text(options, width=45, title="REST STOP", color="GREEN")
         
-        choice = safe_input("\nChoose your respite: ")
+        choice = await self.read_input("\nChoose your respite: ")
         if choice == "1":
             self.player.recover(focus_amount=5)
         elif choice == "2":
@@ -179,9 +309,9 @@ class GameEngine:
         else:
             print("\nYou push forward without rest. Risk is the price of glory.")
             
-        input("\nPress Enter to climb higher...")
+        await self.pause("\nPress Enter to climb higher...")
 
-    def _process_combat_result(self, result):
+    async def _process_combat_result(self, result):
         clear_screen()
         print_header("CHRONICLE UPDATE", color="YELLOW")
         
@@ -203,7 +333,7 @@ class GameEngine:
             lines.append(f"Encounter ended with status: {result}")
             
         box_text(lines, width=60, title="AFTERMATH", color="MAGENTA")
-        input("\nPress Enter to continue...")
+        await self.pause("\nPress Enter to continue...")
 
     def _get_philosophical_ending(self, dominant, scars):
         """Returns a philosophical message based on playstyle."""
@@ -226,13 +356,11 @@ class GameEngine:
             
         return title, msg
 
-    def _shutdown(self):
+    async def _shutdown(self):
         clear_screen()
         print_header("FINAL CHRONICLE", color="MAGENTA")
         
-        dominant = "None"
-        if self.player_history:
-            dominant = max(set(self.player_history), key=self.player_history.count)
+        dominant = self.player_history.dominant() or "None"
             
         summary = {
             "player_name": self.player.name,
@@ -240,8 +368,9 @@ class GameEngine:
             "dominant_decision": dominant,
             "final_hp": f"{self.player.hp}/{self.player.max_hp}",
             "scars": self.player.permanent_scars,
-            "ending_type": "MANUAL_EXIT" if self.player.hp > 0 else "TERMINATED"
+            "ending_type": ("ASCENDED" if self.ascended else "MANUAL_EXIT") if self.player.hp > 0 else "TERMINATED"
         }
+        self.summary = summary
         
         # Display Ending Text
         title, philosophy = self._get_philosophical_ending(dominant, summary['scars'])
@@ -256,20 +385,29 @@ class GameEngine:
             print(f"Permanent Scars   : {CLR['MAGENTA']}{', '.join(summary['scars'])}{CLR['RESET']}")
         print(f"Ending Status     : {CLR['BOLD']}{summary['ending_type']}{CLR['RESET']}")
         
-        # Save to JSON
-        try:
-            history_file = "run_history.json"
-            history_data = []
-            if os.path.exists(history_file):
-                with open(history_file, "r") as f:
-                    history_data = json.load(f)
-            
-            history_data.append(summary)
-            with open(history_file, "w") as f:
-                json.dump(history_data, f, indent=4)
-            print(f"\n{CLR['BLUE']}[System] Chronicle updated in {history_file}{CLR['RESET']}")
-        except Exception as e:
-            print(f"\n{CLR['RED']}[Warning] Could not record history: {e}{CLR['RESET']}")
+        # A recorded run is over: its checkpoint must not resume (and be recorded) again
+        if self.in_run:
+            self._clear_checkpoint()
+
+        # Append to the run history store in the background; run() waits for it before returning
+        if self.persist:
+            self.pending_saves.append(asyncio.create_task(asyncio.to_thread(self._record_run, summary)))
 
         print(f"\n{CLR['CYAN']}Safe travels, {self.player.name}.{CLR['RESET']}")
         self.is_running = False
+
+    def _record_run(self, summary):
+        try:
+            store = RunHistoryStore()
+            hall = HallOfFame(store=store)
+            try:
+                # Backfill before the store holds this run; the store is written first, so a
+                # failed append never leaves the Hall of Fame with a run the archive lacks
+                hall.import_from()
+                store.append(summary)
+                hall.record(summary)
+            finally:
+                hall.close()
+            print(f"\n{CLR['BLUE']}[System] Chronicle updated in {store.directory}/{CLR['RESET']}")
+        except Exception as e:
+            print(f"\n{CLR['RED']}[Warning] Could not record history: {e}{CLR['RESET']}")
@@ -0,0 +1,252 @@
+"""
+Typed game events on a lightweight publish/subscribe bus.
+
+Game logic announces what happened (an enemy adapted, a perk fired, damage
+landed) as events instead of printing; the terminal UI, logs and telemetry
+subscribe to the types they care about. Publishers check EVENTS.wants(Type)
+before building an event, so a type nobody subscribes to costs one dict
+lookup: no event object, no string formatting.
+
+    EVENTS.subscribe(DamageDealt, handler)       # one type
+    EVENTS.subscribe(Event, handler)             # every type
+    with EVENTS.subscribed({PerkActivated: handler}):
+        ...
+"""
+
+class Event:
+    """Base class; events are small slotted records with a plain-text str()."""
+    __slots__ = ()
+
+    def to_dict(self):
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields["event"] = type(self).__name__
+        return fields
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+# --- Combat ---------------------------------------------------------------
+
+class FatigueApplied(Event):
+    """Overusing an action cost a stat (focus drained, risk raised)."""
+    __slots__ = ("action", "stat", "amount")
+
+    def __init__(self, action, stat, amount):
+        self.action = action
+        self.stat = stat
+        self.amount = amount
+
+    def __str__(self):
+        return f"[Fatigue] {self.action} overuse: {self.stat.upper()} {self.amount:+}"
+
+
+class AdaptationTriggered(Event):
+    """The enemy has seen an action often enough to blunt it."""
+    __slots__ = ("enemy", "action", "modifier")
+
+    def __init__(self, enemy, action, modifier):
+        self.enemy = enemy
+        self.action = action
+        self.modifier = modifier
+
+    def __str__(self):
+        return f"[{self.enemy}] I've seen your {self.action} before. It won't work as well now."
+
+
+class MemoryPenalty(Event):
+    """Repeating an action within the player's memory window lowered its effectiveness."""
+    __slots__ = ("action", "modifier")
+
+    def __init__(self, action, modifier):
+        self.action = action
+        self.modifier = modifier
+
+    def __str__(self):
+        if self.modifier <= 0.5:
+            return f"[Memory] STALE tactic! Your {self.action} is completely transparent (-50% effectiveness)"
+        if self.modifier <= 0.7:
+            return f"[Memory] Predictable! Your {self.action} is becoming expected (-30% effectiveness)"
+        return f"[Memory] Repetitive. Your {self.action} is losing its edge (-10% effectiveness)"
+
+
+class EnemyResponded(Event):
+    """The enemy's answer to the player's action."""
+    __slots__ = ("enemy", "action", "response")
+
+    def __init__(self, enemy, action, response):
+        self.enemy = enemy
+        self.action = action
+        self.response = response
+
+    def __str__(self):
+        return f"[{self.enemy}] {self.response} against {self.action}"
+
+
+class PerkActivated(Event):
+    __slots__ = ("perk",)
+
+    def __init__(self, perk):
+        self.perk = perk
+
+    def __str__(self):
+        return f"[Perk] {self.perk}"
+
+
+class DamageDealt(Event):
+    __slots__ = ("source", "target", "amount", "blocked")
+
+    def __init__(self, source, target, amount, blocked):
+        self.source = source
+        self.target = target
+        self.amount = amount
+        self.blocked = blocked
+
+    def __str__(self):
+        blocked = " (blocked)" if self.blocked else ""
+        return f"[Damage] {self.source} hit {self.target} for {self.amount}{blocked}"
+
+
+class TurnResolved(Event):
+    """Last event of a turn; result is the kernel's TurnResult."""
+    __slots__ = ("enemy", "result")
+
+    def __init__(self, enemy, result):
+        self.enemy = enemy
+        self.result = result
+
+    def to_dict(self):
+        result = self.result
+        return {"event": "TurnResolved", "enemy": self.enemy, "action": result.action,
+                "enemy_action": result.enemy_action, "outcome": result.outcome,
+                "modifier": result.modifier, "damage_dealt": result.damage_dealt,
+                "damage_taken": result.damage_taken, "insight_gain": result.insight_gain}
+
+    def __str__(self):
+        return f"[Turn] {self.result.action} vs {self.result.enemy_action}: {self.result.outcome}"
+
+
+# --- Player ---------------------------------------------------------------
+
+class PermanentPenalty(Event):
+    __slots__ = ("stat", "amount", "reason")
+
+    def __init__(self, stat, amount, reason):
+        self.stat = stat
+        self.amount = amount
+        self.reason = reason
+
+    def __str__(self):
+        return f"[!!!] PERMANENT PENALTY: {self.stat.upper()} decreased by {self.amount} due to {self.reason}."
+
+
+class StatChanged(Event):
+    __slots__ = ("stat", "amount")
+
+    def __init__(self, stat, amount):
+        self.stat = stat
+        self.amount = amount
+
+    def __str__(self):
+        return f"[Stat Update] {self.stat.upper()}: {self.amount:+}"
+
+
+class UnknownStat(Event):
+    """An effect named a stat the player doesn't have; it was ignored."""
+    __slots__ = ("stat",)
+
+    def __init__(self, stat):
+        self.stat = stat
+
+    def __str__(self):
+        return f"[Warning] Unknown stat: {self.stat}"
+
+
+class Recovered(Event):
+    __slots__ = ("stat", "amount")
+
+    def __init__(self, stat, amount):
+        self.stat = stat
+        self.amount = amount
+
+    def __str__(self):
+        label = "HP" if self.stat == "hp" else self.stat.capitalize()
+        return f"[Rest] Recovered {self.amount} {label}."
+
+
+def event_types(base=Event):
+    """Every concrete event class derived from base (base itself included unless it is Event)."""
+    found = [] if base is Event else [base]
+    for sub in base.__subclasses__():
+        found.extend(event_types(sub))
+    return found
+
+
+class _Subscription:
+    __slots__ = ("bus", "handlers")
+
+    def __init__(self, bus, handlers):
+        self.bus = bus
+        self.handlers = handlers
+
+    def __enter__(self):
+        for event_type, handler in self.handlers.items():
+            self.bus.subscribe(event_type, handler)
+        return self.bus
+
+    def __exit__(self, *exc):
+        for event_type, handler in self.handlers.items():
+            self.bus.unsubscribe(event_type, handler)
+
+
+class EventBus:
+    def __init__(self):
+        self.handlers = {}  # event type -> tuple of handlers, rebuilt on (un)subscribe
+        self._counts = {}   # event type -> {handler: subscriptions}
+        self.wants = self.handlers.__contains__
+
+    def subscribe(self, event_type, handler):
+        """
+        Calls handler(event) for every published event of event_type (or of its
+        subclasses). Subscribing the same handler again only counts the
+        subscription; it still runs once per event until unsubscribed as often.
+        """
+        kinds = event_types(event_type) if event_type.__subclasses__() or event_type is Event else (event_type,)
+        for kind in kinds:
+            counts = self._counts.get(kind)
+            if counts is None:
+                counts = self._counts[kind] = {}
+            counts[handler] = counts.get(handler, 0) + 1
+            self.handlers[kind] = tuple(counts)
+
+    def unsubscribe(self, event_type, handler):
+        kinds = event_types(event_type) if event_type.__subclasses__() or event_type is Event else (event_type,)
+        for kind in kinds:
+            counts = self._counts.get(kind)
+            if not counts or handler not in counts:
+                continue
+            if counts[handler] > 1:
+                counts[handler] -= 1
+                continue
+            del counts[handler]
+            if counts:
+                self.handlers[kind] = tuple(counts)
+            else:
+                del self._counts[kind]
+                del self.handlers[kind]
+
+    def subscribed(self, handlers):
+        """Context manager subscribing {event_type: handler} for the duration of a with block."""
+        return _Subscription(self, handlers)
+
+    def publish(self, event):
+        for handler in self.handlers.get(type(event), ()):
+            handler(event)
+
+    def clear(self):
+        self.handlers.clear()
+        self._counts.clear()
+
+
+EVENTS = EventBus()
@@ -0,0 +1,156 @@
+"""
+Procedural tower floors.
+
+A Tower turns a data-driven scaling curve (plain dict, JSON-friendly) and a
+seed into immutable EnemySpec objects. Every spec is computed straight from
+its floor number, so simulations can jump to floor 500 without walking the
+floors below, and the most recently used specs are cached per (curve, seed,
+floor) so the engine, batch runs and headless simulations share them. Towers are endless unless
+the curve sets max_floor.
+"""
+import json
+import random
+from collections import OrderedDict, namedtuple
+from .enemy import Enemy
+
+# The classic tower: 15% more enemy HP per floor, traits rising every few floors, a boss every 5th
+DEFAULT_CURVE = {
+    "hp": {"base": 50, "step": 0.15},
+    "aggression": {"base": 3, "every": 2, "cap": 10},
+    "patience": {"base": 2, "every": 3, "cap": 10},
+    "adapt_rate": {"base": 2, "every": 4, "cap": 10},
+    "boss_every": 5,
+    "pattern": {"order": 0, "decay": 0.9, "from_floor": 1},  # sequence learning (see patterns.py); 0 disables
+    "names": {"regular": "Shadow Stalker", "boss": "TOWER GUARDIAN"},
+    "jitter": 0,        # seeded +/- variation applied to each trait (0 keeps floors identical across seeds)
+    "max_floor": None,  # None: endless
+}
+
+SPEC_CACHE_SIZE = 4096  # a long-lived server sees a new key per session on jittered curves
+_SPECS = OrderedDict()  # ((curve JSON, seed), floor) -> EnemySpec, shared by every Tower, least recent first
+
+
+class EnemySpec(namedtuple("EnemySpec", "floor name boss max_hp aggression patience adapt_rate "
+                                        "pattern_order pattern_decay decision_table")):
+    """Immutable description of a floor's enemy, with its precomputed decision tables."""
+
+    __slots__ = ()
+
+    def spawn(self):
+        """A fresh Enemy at full HP."""
+        enemy = Enemy(self.name, aggression=self.aggression, patience=self.patience, adapt_rate=self.adapt_rate,
+                      pattern_order=self.pattern_order, pattern_decay=self.pattern_decay)
+        enemy.max_hp = enemy.hp = self.max_hp
+        return enemy
+
+    def stats(self):
+        """Stats dict in the enemy_curve format used by BatchSimulator."""
+        return {"max_hp": self.max_hp, "aggression": self.aggression,
+                "patience": self.patience, "adapt_rate": self.adapt_rate}
+
+
+def merge_curve(curve):
+    """
+    curve laid over DEFAULT_CURVE; nested rules (e.g. "hp") are merged key by
+    key, so {"hp": {"step": 0.25}} keeps the default base.
+
+    Raises:
+        ValueError: curve has a key DEFAULT_CURVE doesn't, or a scalar where a rule is expected.
+    """
+    merged = dict(DEFAULT_CURVE)
+    for key, value in curve.items():
+        if key not in DEFAULT_CURVE:
+            raise ValueError(f"Unknown curve key: {key!r}")
+        default = DEFAULT_CURVE[key]
+        if isinstance(default, dict):
+            if not isinstance(value, dict):
+                raise ValueError(f"Curve key {key!r} must be a mapping, got {value!r}")
+            for sub in value:
+                if sub not in default:
+                    raise ValueError(f"Unknown curve key: {key!r}.{sub!r}")
+            value = dict(default, **value)
+        merged[key] = value
+    return merged
+
+
+class Tower:
+    def __init__(self, curve=DEFAULT_CURVE, seed=0):
+        """
+        Args:
+            curve (dict): Scaling curve; missing keys, nested ones included, fall back to DEFAULT_CURVE.
+            seed (int): Seed for jittered traits (only used when curve["jitter"] > 0).
+
+        Raises:
+            ValueError: the curve has unknown keys (see merge_curve).
+        """
+        self.curve = merge_curve(curve)
+        self.seed = seed
+        self.max_floor = self.curve["max_floor"]
+        # Unjittered floors don't depend on the seed, so every seed shares one set of specs
+        self.key = (json.dumps(self.curve, sort_keys=True), seed if self.curve["jitter"] else 0)
+
+    @classmethod
+    def load(cls, path, seed=0):
+        """Tower from a JSON curve file."""
+        with open(path, "r") as f:
+            return cls(json.load(f), seed)
+
+    def __iter__(self):
+        return self.floors()
+
+    def __getitem__(self, floor):
+        return self.spec(floor)
+
+    def floors(self, start=1):
+        """Lazily yields specs from floor start to the top (forever in endless mode)."""
+        floor = start
+        while self.max_floor is None or floor <= self.max_floor:
+            yield self.spec(floor)
+            floor += 1
+
+    def has_floor(self, floor):
+        return floor >= 1 and (self.max_floor is None or floor <= self.max_floor)
+
+    def spec(self, floor):
+        """EnemySpec for a floor, computed in O(1) and cached."""
+        key = (self.key, floor)
+        spec = _SPECS.get(key)
+        if spec is None:
+            spec = _SPECS[key] = self._build(floor)
+            if len(_SPECS) > SPEC_CACHE_SIZE:
+                _SPECS.popitem(last=False)
+        else:
+            _SPECS.move_to_end(key)
+        return spec
+
+    def _build(self, floor):
+        curve = self.curve
+        hp = curve["hp"]
+        max_hp = int(hp["base"] * (1.0 + (floor - 1) * hp["step"]))
+
+        jitter = curve["jitter"]
+        rng = random.Random(self.seed * 1000003 + floor) if jitter else None
+        traits = []
+        for name in ("aggression", "patience", "adapt_rate"):
+            rule = curve[name]
+            value = rule["base"] + floor // rule["every"]
+            if rng is not None:
+                value += rng.randint(-jitter, jitter)
+            traits.append(max(1, min(rule["cap"], value)))
+
+        boss_every = curve["boss_every"]
+        boss = bool(boss_every) and floor % boss_every == 0
+        name = curve["names"]["boss" if boss else "regular"]
+        aggression, patience, adapt_rate = traits
+        pattern = curve["pattern"]
+        pattern_order = pattern["order"] if floor >= pattern["from_floor"] else 0
+        table = Enemy(name, aggression=aggression, patience=patience, adapt_rate=adapt_rate).decision_table
+        return EnemySpec(floor, name, boss, max_hp, aggression, patience, adapt_rate,
+                         pattern_order, pattern["decay"], table)
+
+
+DEFAULT_TOWER = Tower()
+
+
+def clear_cache():
+    _SPECS.clear()
@@ -0,0 +1,161 @@
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    player_name TEXT NOT NULL,
+    fights INTEGER NOT NULL,
+    dominant_decision TEXT NOT NULL,
+    final_hp TEXT,
+    scars INTEGER NOT NULL,
+    ending_type TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_fights ON runs (fights DESC, id);
+CREATE INDEX IF NOT EXISTS idx_runs_player ON runs (player_name, fights DESC);
+
+CREATE TABLE IF NOT EXISTS best_runs (
+    player_name TEXT PRIMARY KEY,
+    run_id INTEGER NOT NULL,
+    fights INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_best_fights ON best_runs (fights DESC);
+
+CREATE TABLE IF NOT EXISTS decision_counts (
+    dominant_decision TEXT PRIMARY KEY,
+    n INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ending_counts (
+    ending_type TEXT PRIMARY KEY,
+    n INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class HallOfFame:
+    """
+    Persistent leaderboard over recorded runs.
+
+    Every run is inserted once; the per-player best and the per-decision and
+    per-ending tallies are maintained as the run is recorded, so reads never
+    scan the run table.
+
+    Runs archived before the Hall of Fame existed are backfilled from the
+    run history store once, and a meta flag records that it happened.
+    Writers call import_from() before appending a run to the store and
+    record it here afterwards, so the backfill never sees a run twice and
+    the Hall of Fame never holds a run the store lacks.
+    """
+
+    def __init__(self, path="hall_of_fame.db", store=None):
+        """
+        Args:
+            path (str): SQLite database file.
+            store (RunHistoryStore): Archive to backfill from on the first write
+                (None: a standalone hall; its first write marks it backfilled).
+        """
+        self.path = path
+        self.store = store
+        self.conn = sqlite3.connect(path, timeout=10)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        with self.conn:
+            # Earlier versions backfilled only an empty table and kept no flag
+            self.conn.execute("INSERT OR IGNORE INTO meta SELECT 'imported', '1' WHERE EXISTS (SELECT 1 FROM runs)")
+
+    def close(self):
+        self.conn.close()
+
+    # --- Recording --------------------------------------------------------
+
+    def record(self, summary):
+        """Adds a single _shutdown summary."""
+        self.record_many([summary])
+
+    def record_many(self, summaries):
+        """Adds several run summaries in one transaction (after the one-time backfill)."""
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")  # serializes the backfill check across processes
+            self._backfill(self.store)
+            for s in summaries:
+                self._insert(s)
+
+    def _insert(self, s):
+        name = s.get("player_name", "Traveler")
+        fights = int(s.get("fights", 0))
+        decision = s.get("dominant_decision", "None")
+        ending = s.get("ending_type", "UNKNOWN")
+        cur = self.conn.execute(
+            "INSERT INTO runs (player_name, fights, dominant_decision, final_hp, scars, ending_type) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (name, fights, decision, s.get("final_hp"), len(s.get("scars", [])), ending),
+        )
+        self.conn.execute(
+            "INSERT INTO best_runs (player_name, run_id, fights) VALUES (?, ?, ?) "
+            "ON CONFLICT(player_name) DO UPDATE SET run_id = excluded.run_id, fights = excluded.fights "
+            "WHERE excluded.fights > best_runs.fights",
+            (name, cur.lastrowid, fights),
+        )
+        self.conn.execute(
+            "INSERT INTO decision_counts VALUES (?, 1) ON CONFLICT(dominant_decision) DO UPDATE SET n = n + 1",
+            (decision,),
+        )
+        self.conn.execute(
+            "INSERT INTO ending_counts VALUES (?, 1) ON CONFLICT(ending_type) DO UPDATE SET n = n + 1",
+            (ending,),
+        )
+
+    def import_from(self, store=None):
+        """Backfills the archived runs if that hasn't happened yet. Returns runs imported."""
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            return self._backfill(store if store is not None else self.store)
+
+    def _backfill(self, store):
+        if self.conn.execute("SELECT 1 FROM meta WHERE key = 'imported'").fetchone():
+            return 0
+        count = 0
+        if store is not None:
+            for run in store.iter_runs():
+                self._insert(run)
+                count += 1
+        self.conn.execute("INSERT INTO meta VALUES ('imported', '1')")
+        return count
+
+    # --- Queries ----------------------------------------------------------
+
+    def top(self, k=10):
+        """Top K runs by floors cleared."""
+        return self._rows(
+            "SELECT player_name, fights, dominant_decision, final_hp, ending_type "
+            "FROM runs ORDER BY fights DESC, id LIMIT ?", (k,))
+
+    def best_for(self, player_name):
+        """Best run of a single player, or None."""
+        rows = self._rows(
+            "SELECT r.player_name, r.fights, r.dominant_decision, r.final_hp, r.ending_type "
+            "FROM best_runs b JOIN runs r ON r.id = b.run_id WHERE b.player_name = ?", (player_name,))
+        return rows[0] if rows else None
+
+    def best_per_player(self, limit=10):
+        """Each player's best run, strongest players first."""
+        return self._rows(
+            "SELECT r.player_name, r.fights, r.dominant_decision, r.final_hp, r.ending_type "
+            "FROM best_runs b JOIN runs r ON r.id = b.run_id ORDER BY b.fights DESC LIMIT ?", (limit,))
+
+    def decision_counts(self):
+        """Number of runs per dominant decision."""
+        return dict(self.conn.execute("SELECT dominant_decision, n FROM decision_counts ORDER BY n DESC"))
+
+    def ending_counts(self):
+        """Number of runs per ending type."""
+        return dict(self.conn.execute("SELECT ending_type, n FROM ending_counts ORDER BY n DESC"))
+
+    def _rows(self, sql, params=()):
+        keys = ("player_name", "fights", "dominant_decision", "final_hp", "ending_type")
+        return [dict(zip(keys, row)) for row in self.conn.execute(sql, params)]
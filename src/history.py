@@ -0,0 +1,112 @@
+from array import array
+from collections import deque
+from .actions import ACTIONS, action_code
+
+# Number of recent actions enemies read their strategy from
+RECENT_WINDOW = 5
+
+MAX_RUN_LENGTH = 0xFFFFFFFF  # run lengths are stored as uint32
+
+
+class PlayerHistory:
+    """
+    Bounded record of the player's actions over a whole run.
+
+    Keeps lifetime per-action totals, a running tally over the last
+    RECENT_WINDOW actions, a short buffer of recent action codes and a
+    run-length encoding of the most recent stretch of the stream. Every
+    update and query is O(1) and memory stays bounded however long the run.
+    """
+
+    def __init__(self, buffer_size=64, max_runs=4096):
+        self.buffer = deque(maxlen=max(buffer_size, RECENT_WINDOW))
+        # Run-length encoding of the latest max_runs runs: a ring of codes and lengths
+        self.max_runs = max_runs
+        self.run_codes = bytearray(max_runs)
+        self.run_lengths = array("I", bytes(4 * max_runs))
+        self.run_start = 0  # ring index of the oldest run
+        self.run_count = 0
+        self.run_last = -1  # ring index of the newest run
+        self.totals = [0] * len(ACTIONS)
+        self.window_counts = [0] * len(ACTIONS)
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def __bool__(self):
+        return self.length > 0
+
+    def append(self, action):
+        """Records an action given by name or code."""
+        code = action_code(action)
+        buffer = self.buffer
+        if len(buffer) >= RECENT_WINDOW:
+            self.window_counts[buffer[-RECENT_WINDOW]] -= 1
+        buffer.append(code)
+        self.window_counts[code] += 1
+        self.totals[code] += 1
+        self.length += 1
+
+        last = self.run_last
+        if last >= 0 and self.run_codes[last] == code and self.run_lengths[last] < MAX_RUN_LENGTH:
+            self.run_lengths[last] += 1
+            return
+        if self.run_count < self.max_runs:
+            last = (self.run_start + self.run_count) % self.max_runs
+            self.run_count += 1
+        else:
+            last = self.run_start
+            self.run_start = (last + 1) % self.max_runs
+        self.run_codes[last] = code
+        self.run_lengths[last] = 1
+        self.run_last = last
+
+    def runs(self):
+        """(code, length) pairs of the retained runs, oldest first."""
+        codes, lengths, size = self.run_codes, self.run_lengths, self.max_runs
+        for i in range(self.run_start, self.run_start + self.run_count):
+            yield codes[i % size], lengths[i % size]
+
+    def last(self):
+        """Name of the most recent action, or None."""
+        return ACTIONS[self.buffer[-1]] if self.buffer else None
+
+    def recent(self, n=RECENT_WINDOW):
+        """Names of up to the last n actions (n is capped by the buffer), oldest first."""
+        buffer = self.buffer
+        n = min(n, len(buffer))
+        return [ACTIONS[buffer[i]] for i in range(len(buffer) - n, len(buffer))]
+
+    def context(self, n, skip=0):
+        """
+        (packed codes, count) of up to n actions ending before the last skip:
+        two bits per action, newest lowest.
+        """
+        buffer = self.buffer
+        end = max(0, len(buffer) - skip)
+        n = min(n, end)
+        packed = 0
+        for i in range(end - n, end):
+            packed = (packed << 2) | buffer[i]
+        return packed, n
+
+    def window_count(self, action):
+        """How often an action appears in the last RECENT_WINDOW actions."""
+        return self.window_counts[action_code(action)]
+
+    def most_frequent_recent(self):
+        """(code, count) of the most common recent action; ties go to canonical order."""
+        counts = self.window_counts
+        best = 0
+        for code in range(1, len(counts)):
+            if counts[code] > counts[best]:
+                best = code
+        return best, counts[best]
+
+    def dominant(self):
+        """Name of the most used action over the whole run, or None."""
+        if not self.length:
+            return None
+        totals = self.totals
+        return ACTIONS[max(range(len(totals)), key=totals.__getitem__)]
@@ -0,0 +1,95 @@
+"""
+Async input sources for the game loop.
+
+GameEngine and CombatManager await source.read(prompt) for choices (None
+means cancelled) and source.pause(prompt) at "Press Enter" prompts.
+"""
+import asyncio
+import sys
+import threading
+from .utils import CLR, safe_input, pause
+
+
+class SyncInput:
+    """Adapts blocking input_fn/pause_fn callables (the classic CLI, scripts, replays)."""
+
+    def __init__(self, input_fn=safe_input, pause_fn=pause):
+        self.input_fn = input_fn
+        self.pause_fn = pause_fn
+
+    async def read(self, prompt="> "):
+        return self.input_fn(prompt)
+
+    async def pause(self, prompt=""):
+        self.pause_fn(prompt)
+
+
+class QueueInput:
+    """Lines pushed with feed(); close() makes every later read return None."""
+
+    def __init__(self):
+        self.queue = asyncio.Queue()
+        self.closed = False
+
+    def feed(self, line):
+        self.queue.put_nowait(line)
+
+    def close(self):
+        self.closed = True
+        self.queue.put_nowait(None)
+
+    async def read(self, prompt="> "):
+        if self.closed and self.queue.empty():
+            return None
+        line = await self.queue.get()
+        return line.strip() if line is not None else None
+
+    async def pause(self, prompt=""):
+        await self.read(prompt)
+
+
+class ConsoleInput(QueueInput):
+    """
+    Non-blocking stdin: a daemon thread feeds lines into the queue, so the
+    event loop keeps running (timers, background saves) while the player
+    thinks, and a timed-out read leaves the next line for the next prompt.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__()
+        self.stream = stream if stream is not None else sys.stdin
+        self.reader = None
+
+    def _start(self):
+        loop = asyncio.get_running_loop()
+
+        def pump():
+            while True:
+                try:
+                    line = self.stream.readline()
+                except (OSError, ValueError):
+                    line = ""
+                if not line:
+                    loop.call_soon_threadsafe(self.close)
+                    return
+                loop.call_soon_threadsafe(self.feed, line)
+
+        self.reader = threading.Thread(target=pump, name="outplay-stdin", daemon=True)
+        self.reader.start()
+
+    async def read(self, prompt="> "):
+        if self.reader is None:
+            self._start()
+        sys.stdout.write(f"{CLR['CYAN']}{prompt}{CLR['RESET']}")
+        sys.stdout.flush()
+        line = await super().read(prompt)
+        if line is None:
+            print(f"\n{CLR['RED']}[!] Input cancelled.{CLR['RESET']}")
+        return line
+
+    async def pause(self, prompt=""):
+        if self.reader is None:
+            self._start()
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        await QueueInput.read(self, prompt)
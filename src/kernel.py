@@ -0,0 +1,295 @@
+import inspect
+import random
+from .player import Player, StatEffect
+from .enemy import Enemy
+from .memory import MemorySystem
+from .history import PlayerHistory
+from .actions import ACTIONS
+from .metrics import METRICS
+from .perks import compile_hooks
+from .events import (EVENTS, FatigueApplied, AdaptationTriggered, MemoryPenalty, EnemyResponded,
+                     PerkActivated, DamageDealt, TurnResolved)
+from time import perf_counter
+
+# Fixed per-action stat changes, compiled once
+PRESSURE_COST = StatEffect({"risk": 2, "focus": -1})
+BAIT_COST = StatEffect({"risk": 15})
+COUNTER_RELIEF = StatEffect({"risk": -10, "focus": 2})
+EXHAUSTED_RECOVERY = StatEffect({"focus": 1})
+
+
+class TurnResult:
+    """Structured, I/O-free outcome of a single resolved combat turn."""
+
+    def __init__(self, action):
+        self.action = action
+        self.enemy_action = None
+        self.mem_modifier = 1.0
+        self.enemy_modifier = 1.0
+        self.modifier = 1.0
+        self.fatigue = {}
+        self.perks_triggered = []
+        self.outcome = None  # CAUGHT, INSIGHT, FORCED_GUARD, STRESSED, COUNTER, NO_BITE, STRUCK, EXHAUSTED
+        self.blocked = False
+        self.damage_dealt = 0
+        self.damage_taken = 0
+        self.insight_gain = 0
+
+    @property
+    def adapted(self):
+        """True when the enemy's adaptation, not player memory, limited the turn."""
+        return self.modifier < 1.0 and self.enemy_modifier < self.mem_modifier
+
+
+def resolve_turn(player, enemy, memory, player_history, action, rng=random):
+    """
+    Resolves one turn of combat without any terminal I/O.
+    Mutates player, enemy, memory and player_history and returns a TurnResult.
+    """
+    timed = METRICS.enabled
+    if timed:
+        started = perf_counter()
+    result = prepare_turn(player, enemy, memory, player_history, action)
+
+    if timed:
+        decided = perf_counter()
+        METRICS.phase("modifiers", decided - started)
+    enemy_action = enemy.choose_response(player_history, rng=rng)
+    roll = rng.randint(3, 7) if action == "PRESSURE" else 0
+    if timed:
+        started = perf_counter()
+        METRICS.phase("decision", started - decided)
+
+    resolve_action(player, enemy, result, enemy_action, roll)
+
+    if timed:
+        METRICS.phase("resolution", perf_counter() - started)
+        METRICS.count("turns")
+        if result.adapted:
+            METRICS.count("adaptations")
+        if result.fatigue:
+            METRICS.count("fatigue_triggers")
+    if EVENTS.handlers:
+        announce_turn(player, enemy, result)
+    return result
+
+
+def announce_turn(player, enemy, result):
+    """
+    Publishes a resolved turn as events, in the order the combat log reads them;
+    only the types someone subscribes to are built.
+    """
+    wants, publish = EVENTS.wants, EVENTS.publish
+    action = result.action
+    if result.fatigue and wants(FatigueApplied):
+        for stat, amount in result.fatigue.items():
+            publish(FatigueApplied(action, stat, amount))
+    if result.modifier < 1.0:
+        if result.adapted:
+            if wants(AdaptationTriggered):
+                publish(AdaptationTriggered(enemy.name, action, result.enemy_modifier))
+        elif wants(MemoryPenalty):
+            publish(MemoryPenalty(action, result.mem_modifier))
+    if wants(EnemyResponded):
+        publish(EnemyResponded(enemy.name, action, result.enemy_action))
+    if result.perks_triggered and wants(PerkActivated):
+        for perk in result.perks_triggered:
+            publish(PerkActivated(perk))
+    if wants(DamageDealt):
+        if result.damage_dealt:
+            publish(DamageDealt(player.name, enemy.name, result.damage_dealt, result.blocked))
+        if result.damage_taken:
+            publish(DamageDealt(enemy.name, player.name, result.damage_taken, False))
+    if wants(TurnResolved):
+        publish(TurnResolved(enemy.name, result))
+
+
+def prepare_turn(player, enemy, memory, player_history, action):
+    """
+    First half of a turn: effectiveness modifiers and fatigue, then the action is
+    recorded. Returns the TurnResult to pass to resolve_action.
+    """
+    result = TurnResult(action)
+
+    # Calculate modifiers
+    result.mem_modifier = memory.get_effectiveness_modifier(action, silent=True)
+    result.enemy_modifier = enemy.get_adaptation_penalty(action, player_history, silent=True)
+    result.modifier = min(result.mem_modifier, result.enemy_modifier)
+
+    # Apply Fatigue System
+    fatigue_effects = memory.get_fatigue_triggers(action)
+    if fatigue_effects:
+        result.fatigue = fatigue_effects
+        player.adjust(focus=fatigue_effects.get("focus", 0), risk=fatigue_effects.get("risk", 0))
+
+    player_history.append(action)
+    memory.record_decision(action)
+    return result
+
+
+def resolve_action(player, enemy, result, enemy_action, roll=0):
+    """
+    Second half of a turn: applies the player's action against the enemy's
+    response. roll is the PRESSURE damage roll (3-7), ignored for other actions.
+    """
+    action = result.action
+    modifier = result.modifier
+    result.enemy_action = enemy_action
+    hooks = compile_hooks(player.perks)
+
+    # RESOLUTION LOGIC
+    if action == "OBSERVE":
+        insight_gain = int(2 * modifier)
+        for hook in hooks.observe_insight:
+            insight_gain = hook(player, result, insight_gain)
+        result.insight_gain = insight_gain
+
+        player.adjust(insight=insight_gain, risk=-5)
+
+        for hook in hooks.observe_after:
+            hook(player, result, None)
+
+        if enemy_action == "ATTACK":
+            risk_multiplier = 1.0 + (player.risk / 100.0)
+            dmg = int(5 * risk_multiplier)
+
+            for hook in hooks.damage_taken:
+                dmg = hook(player, result, dmg)
+
+            player.adjust(hp=-dmg, insight=1)
+            result.damage_taken = dmg
+            result.outcome = "CAUGHT"
+        else:
+            result.outcome = "INSIGHT"
+
+    elif action == "PRESSURE":
+        dmg = int(roll * modifier)
+        enemy.hp -= dmg
+        player.apply_effect(PRESSURE_COST)
+        result.damage_dealt = dmg
+        result.outcome = "FORCED_GUARD" if enemy_action == "DEFEND" else "STRESSED"
+
+    elif action == "BAIT":
+        player.apply_effect(BAIT_COST)
+        if enemy_action == "ATTACK":
+            counter_dmg = int((15 + (player.insight // 2)) * modifier)
+            enemy.hp -= counter_dmg
+            player.apply_effect(COUNTER_RELIEF)
+            result.damage_dealt = counter_dmg
+            result.outcome = "COUNTER"
+        else:
+            result.outcome = "NO_BITE"
+
+    elif action == "ATTACK":
+        required_focus = 2
+        for hook in hooks.attack_focus_min:
+            required_focus = hook(player, result, required_focus)
+        if player.focus >= required_focus:
+            base_dmg = int((8 + (player.insight // 3)) * modifier)
+
+            for hook in hooks.attack_damage:
+                base_dmg = hook(player, result, base_dmg)
+
+            if enemy_action == "DEFEND":
+                base_dmg //= 2
+                result.blocked = True
+
+            enemy.hp -= base_dmg
+
+            focus_cost = -2
+            for hook in hooks.attack_focus_cost:
+                focus_cost = hook(player, result, focus_cost)
+
+            player.adjust(focus=focus_cost, risk=5)
+            result.damage_dealt = base_dmg
+            result.outcome = "STRUCK"
+        else:
+            player.apply_effect(EXHAUSTED_RECOVERY)
+            result.outcome = "EXHAUSTED"
+
+    return result
+
+
+def determine_defeat_type(player, player_history):
+    """Logic to decide the nature of the player's defeat."""
+    last_action = player_history.last() or "NONE"
+
+    if player.risk > 50:
+        return "PHYSICAL_TRAUMA"  # Hit 0 HP with high risk
+    elif player.focus <= 2:
+        return "MENTAL_COLLAPSE"  # Hit 0 HP while mentally exhausted
+    elif last_action == "OBSERVE":
+        return "ESCAPED_COWARDLY" # Lost while being passive
+    else:
+        return "DEFEAT"
+
+
+def make_random_policy(seed=None):
+    """Returns a policy that picks a tactic uniformly at random."""
+    rng = random.Random(seed)
+
+    def policy(player, enemy, player_history, memory=None):
+        return rng.choice(ACTIONS)
+
+    return policy
+
+
+def with_memory(policy):
+    """
+    Returns policy as policy(player, enemy, player_history, memory). Policies
+    written for the original three-argument form are wrapped to drop memory.
+    """
+    try:
+        params = list(inspect.signature(policy).parameters.values())
+    except (TypeError, ValueError):
+        return policy  # builtins and the like: assume the current form
+    if any(p.kind is p.VAR_POSITIONAL for p in params):
+        return policy
+    positional = [p for p in params if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)]
+    if len(positional) >= 4:
+        return policy
+    return lambda player, enemy, player_history, memory: policy(player, enemy, player_history)
+
+
+def simulate_encounter(policy, seed=None, player=None, enemy=None, player_history=None, max_turns=500, memory_size=5):
+    """
+    Plays a full encounter headlessly.
+
+    Args:
+        policy (callable): policy(player, enemy, player_history, memory) -> action name
+            (policy(player, enemy, player_history) is accepted too).
+        seed (int): Seed for the encounter's private RNG.
+        player, enemy: Combatants to use (fresh defaults when omitted).
+        player_history (PlayerHistory): Shared run history, appended to in place.
+        max_turns (int): Safety cap; the encounter ends as "STALEMATE" past it.
+        memory_size (int): Length of the player's memory window.
+
+    Returns:
+        dict: outcome, turns played and both combatants' final HP.
+    """
+    rng = random.Random(seed)
+    player = player if player is not None else Player()
+    enemy = enemy if enemy is not None else Enemy()
+    player_history = player_history if player_history is not None else PlayerHistory()
+    memory = MemorySystem(size=memory_size)
+    policy = with_memory(policy)
+
+    outcome = "STALEMATE"
+    turns = 0
+    while turns < max_turns:
+        action = policy(player, enemy, player_history, memory)
+        resolve_turn(player, enemy, memory, player_history, action, rng)
+        turns += 1
+        if enemy.hp <= 0:
+            outcome = "VICTORY"
+            break
+        if player.hp <= 0:
+            outcome = determine_defeat_type(player, player_history)
+            break
+
+    return {
+        "outcome": outcome,
+        "turns": turns,
+        "player_hp": player.hp,
+        "enemy_hp": enemy.hp,
+    }
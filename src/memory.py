@@ -1,60 +1,82 @@
 from collections import deque
+from .actions import ACTIONS, OBSERVE, ATTACK, action_code
+from .events import EVENTS, MemoryPenalty
+
+def effectiveness_modifier(repetition_count):
+    """Effectiveness left after repeating an action repetition_count times in memory."""
+    modifier = 1.0
+    if repetition_count >= 4:
+        modifier -= 0.5
+    elif repetition_count == 3:
+        modifier -= 0.3
+    elif repetition_count == 2:
+        modifier -= 0.1
+    return max(0.3, modifier)
+
+def fatigue_penalties(code, count):
+    """Stat penalties for overusing an action that appears count times in memory."""
+    penalties = {}
+    
+    # Observe Overuse -> Focus drain (Mental exhaustion from over-analysis)
+    if code == OBSERVE and count >= 2:
+        penalties["focus"] = -(count)
+    
+    # Attack Overuse -> Risk increase (Physical recklessness/tunnel vision)
+    if code == ATTACK and count >= 2:
+        penalties["risk"] = count * 5
+            
+    return penalties
 
 class MemorySystem:
     def __init__(self, size=5):
         """
         Initializes the memory system with a fixed size.
+        Decisions are stored as integer action codes with a running tally per
+        action, so recording and lookups cost O(1) whatever the window size.
         """
         self.size = size
-        self.decisions = deque(maxlen=size)
+        self.codes = deque(maxlen=size)
+        self.counts = [0] * len(ACTIONS)
+
+    @property
+    def decisions(self):
+        """The remembered decisions as action names, oldest first."""
+        return tuple(ACTIONS[c] for c in self.codes)
 
     def record_decision(self, action):
-        """Records a new player decision."""
-        self.decisions.append(action)
+        """Records a new player decision (name or code)."""
+        code = action_code(action)
+        codes = self.codes
+        if len(codes) == self.size:
+            if not codes:
+                return  # size 0: nothing is remembered
+            self.counts[codes[0]] -= 1  # about to be evicted by append()
+        codes.append(code)
+        self.counts[code] += 1
 
-    def get_effectiveness_modifier(self, current_action):
+    def get_effectiveness_modifier(self, current_action, silent=False):
         """
         Calculates a modifier based on repetitive or varied behavior.
         """
-        if not self.decisions:
+        if not self.codes:
             return 1.0
 
-        repetition_count = list(self.decisions).count(current_action)
-        modifier = 1.0
+        code = action_code(current_action)
+        repetition_count = self.counts[code]
+        modifier = effectiveness_modifier(repetition_count)
         
-        if repetition_count >= 4:
-            modifier -= 0.5
-            print(f"[Memory] STALE tactic! Your {current_action} is completely transparent (-50% effectiveness)")
-        elif repetition_count == 3:
-            modifier -= 0.3
-            print(f"[Memory] Predictable! Your {current_action} is becoming expected (-30% effectiveness)")
-        elif repetition_count == 2:
-            modifier -= 0.1
-            print(f"[Memory] Repetitive. Your {current_action} is losing its edge (-10% effectiveness)")
+        if modifier < 1.0 and not silent and EVENTS.wants(MemoryPenalty):
+            EVENTS.publish(MemoryPenalty(ACTIONS[code], modifier))
             
-        return max(0.3, modifier)
+        return modifier
 
     def get_fatigue_triggers(self, current_action):
         """
         Calculates stat penalties based on overuse of specific mechanics.
         """
-        penalties = {}
-        history_list = list(self.decisions)
-        
-        # Observe Overuse -> Focus drain (Mental exhaustion from over-analysis)
-        if current_action == "OBSERVE":
-            observe_count = history_list.count("OBSERVE")
-            if observe_count >= 2:
-                penalties["focus"] = -(observe_count) 
-        
-        # Attack Overuse -> Risk increase (Physical recklessness/tunnel vision)
-        if current_action == "ATTACK":
-            attack_count = history_list.count("ATTACK")
-            if attack_count >= 2:
-                penalties["risk"] = attack_count * 5
-                
-        return penalties
+        code = action_code(current_action)
+        return fatigue_penalties(code, self.counts[code])
 
     def get_history_summary(self):
         """Returns a string representation of recent decisions."""
-        return " -> ".join(self.decisions)
+        return " -> ".join(ACTIONS[c] for c in self.codes)
@@ -0,0 +1,130 @@
+"""
+Opt-in instrumentation for the game's hot paths.
+
+Hooks check METRICS.enabled before doing any work, so a disabled collector
+costs one attribute read per hook. Enable with METRICS.enable() (or
+`python main.py --metrics FILE`) and export with to_openmetrics()/to_json().
+"""
+import json
+
+# Phases of a combat turn, in the order they happen
+PHASES = ("modifiers", "decision", "resolution", "render")
+COUNTERS = ("turns", "floors", "adaptations", "fatigue_triggers")
+
+# Histogram bucket upper bounds in seconds; states can wait on the player for a long time
+STATE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 120.0, float("inf"))
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram."""
+
+    def __init__(self, bounds=STATE_BUCKETS):
+        self.bounds = bounds
+        self.buckets = [0] * len(bounds)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.buckets[i] += 1
+                break
+
+    def cumulative(self):
+        total = 0
+        for bound, n in zip(self.bounds, self.buckets):
+            total += n
+            yield bound, total
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.phase_sum = dict.fromkeys(PHASES, 0.0)
+        self.phase_count = dict.fromkeys(PHASES, 0)
+        self.state_latency = {}
+
+    # --- Recording --------------------------------------------------------
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def phase(self, name, seconds):
+        self.phase_sum[name] += seconds
+        self.phase_count[name] += 1
+
+    def state(self, name, seconds):
+        histogram = self.state_latency.get(name)
+        if histogram is None:
+            histogram = self.state_latency[name] = Histogram()
+        histogram.observe(seconds)
+
+    # --- Export -----------------------------------------------------------
+
+    def to_dict(self):
+        return {
+            "counters": dict(self.counters),
+            "turn_phases": {
+                name: {"count": self.phase_count[name], "sum_seconds": self.phase_sum[name]}
+                for name in PHASES
+            },
+            "state_latency": {
+                name: {
+                    "count": h.count,
+                    "sum_seconds": h.sum,
+                    "buckets": {_le(bound): n for bound, n in h.cumulative()},
+                }
+                for name, h in self.state_latency.items()
+            },
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_openmetrics(self):
+        lines = []
+        for name, value in self.counters.items():
+            lines.append(f"# TYPE outplay_{name} counter")
+            lines.append(f"outplay_{name}_total {value}")
+
+        lines.append("# TYPE outplay_turn_phase_seconds summary")
+        lines.append("# UNIT outplay_turn_phase_seconds seconds")
+        for name in PHASES:
+            lines.append(f'outplay_turn_phase_seconds_count{{phase="{name}"}} {self.phase_count[name]}')
+            lines.append(f'outplay_turn_phase_seconds_sum{{phase="{name}"}} {self.phase_sum[name]}')
+
+        lines.append("# TYPE outplay_state_seconds histogram")
+        lines.append("# UNIT outplay_state_seconds seconds")
+        for state, h in self.state_latency.items():
+            for bound, n in h.cumulative():
+                lines.append(f'outplay_state_seconds_bucket{{state="{state}",le="{_le(bound)}"}} {n}')
+            lines.append(f'outplay_state_seconds_count{{state="{state}"}} {h.count}')
+            lines.append(f'outplay_state_seconds_sum{{state="{state}"}} {h.sum}')
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Writes JSON for *.json paths, OpenMetrics text otherwise."""
+        text = self.to_json() if path.endswith(".json") else self.to_openmetrics()
+        with open(path, "w") as f:
+            f.write(text)
+
+
+def _le(bound):
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+METRICS = Metrics()
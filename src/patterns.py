@@ -0,0 +1,151 @@
+"""
+N-gram model of the player's action stream.
+
+A PatternModel counts which action followed each of the last 1..order
+actions. Contexts are packed two bits per action, so every order has a
+fixed table of 4**k contexts x 4 next actions: updates and predictions are
+O(order) and memory is bounded by the order alone, never by the run length.
+Counts decay geometrically per observed action; the decay is applied lazily
+through a growing scale factor instead of touching the table every turn.
+"""
+import hashlib
+from array import array
+from .actions import ACTIONS
+
+N_ACTIONS = len(ACTIONS)
+MAX_ORDER = 5  # contexts come from the last RECENT_WINDOW actions
+_RESCALE_AT = 1e150
+
+
+class PatternModel:
+    __slots__ = ("order", "decay", "min_evidence", "counts", "totals", "count_offsets", "total_offsets",
+                 "scale", "context", "filled", "seen", "source")
+
+    def __init__(self, order=2, decay=0.9, min_evidence=2.0):
+        """
+        Args:
+            order (int): Longest context, in actions (1 to MAX_ORDER).
+            decay (float): Weight kept by each observation per later action (0 < decay <= 1).
+            min_evidence (float): Decayed observations a context needs before it predicts.
+        """
+        if not 1 <= order <= MAX_ORDER:
+            raise ValueError(f"order must be between 1 and {MAX_ORDER}")
+        if not 0.0 < decay <= 1.0:
+            raise ValueError("decay must be in (0, 1]")
+        self.order = order
+        self.decay = decay
+        self.min_evidence = min_evidence
+        self.count_offsets = [0] * (order + 1)
+        self.total_offsets = [0] * (order + 1)
+        counts = totals = 0
+        for k in range(1, order + 1):
+            self.count_offsets[k] = counts
+            self.total_offsets[k] = totals
+            counts += N_ACTIONS ** k * N_ACTIONS
+            totals += N_ACTIONS ** k
+        self.counts = array("d", bytes(8 * counts))
+        self.totals = array("d", bytes(8 * totals))
+        self.reset()
+
+    def reset(self):
+        """Forgets everything learned."""
+        for i in range(len(self.counts)):
+            self.counts[i] = 0.0
+        for i in range(len(self.totals)):
+            self.totals[i] = 0.0
+        self.scale = 1.0     # weight of the newest observation; older ones hold scale * decay**age
+        self.context = 0     # last `order` actions, two bits each, newest lowest
+        self.filled = 0      # actions in context (up to order)
+        self.seen = 0        # history length already learned from
+        self.source = None   # the PlayerHistory being followed
+
+    # --- Learning ---------------------------------------------------------
+
+    def observe(self, code):
+        """Learns that action code followed the current context."""
+        decay = self.decay
+        if decay < 1.0:
+            self.scale /= decay
+            if self.scale > _RESCALE_AT:
+                self._rescale()
+        weight = self.scale
+        context = self.context
+        counts, totals = self.counts, self.totals
+        for k in range(1, self.filled + 1):
+            ctx = context & ((1 << 2 * k) - 1)
+            counts[self.count_offsets[k] + ctx * N_ACTIONS + code] += weight
+            totals[self.total_offsets[k] + ctx] += weight
+        self.context = ((context << 2) | code) & ((1 << 2 * self.order) - 1)
+        if self.filled < self.order:
+            self.filled += 1
+
+    def _rescale(self):
+        inverse = 1.0 / self.scale
+        counts, totals = self.counts, self.totals
+        for i in range(len(counts)):
+            counts[i] *= inverse
+        for i in range(len(totals)):
+            totals[i] *= inverse
+        self.scale = 1.0
+
+    def sync(self, player_history, skip=0):
+        """Learns the actions player_history gained since the last sync, except the last skip."""
+        if player_history is not self.source or player_history.length < self.seen:
+            self.reset()
+            self.source = player_history
+        target = player_history.length - skip
+        new = target - self.seen
+        if new <= 0:
+            return
+        buffer = player_history.buffer
+        end = len(buffer) - skip
+        if new > end:
+            new = end  # only the retained tail can be learned from
+        for i in range(end - new, end):
+            self.observe(buffer[i])
+        self.seen = target
+
+    def fingerprint(self):
+        """Hashable digest of the configuration and everything learned (for caches of predictions)."""
+        learned = hashlib.sha1(self.counts.tobytes())
+        learned.update(self.totals.tobytes())
+        return self.order, self.decay, self.min_evidence, self.scale, learned.hexdigest()
+
+    # --- Predicting -------------------------------------------------------
+
+    def _row(self, player_history, skip=0):
+        """(offset into counts, context total) of the longest context with enough evidence, or None."""
+        context, n = player_history.context(self.order, skip)
+        needed = self.min_evidence * self.scale
+        totals = self.totals
+        for k in range(n, 0, -1):
+            ctx = context & ((1 << 2 * k) - 1)
+            total = totals[self.total_offsets[k] + ctx]
+            if total >= needed:
+                return self.count_offsets[k] + ctx * N_ACTIONS, total
+        return None
+
+    def predict(self, player_history, skip=0):
+        """
+        (code, probability) of the player's most likely next action, or None
+        without enough evidence. skip=1 predicts the latest action instead,
+        from the actions before it.
+        """
+        row = self._row(player_history, skip)
+        if row is None:
+            return None
+        offset, total = row
+        counts = self.counts
+        best = 0
+        for code in range(1, N_ACTIONS):
+            if counts[offset + code] > counts[offset + best]:
+                best = code
+        return best, counts[offset + best] / total
+
+    def probability(self, code, player_history):
+        """Predicted probability that the player's next action is code (0.0 without enough evidence)."""
+        row = self._row(player_history)
+        if row is None:
+            return 0.0
+        offset, total = row
+        return self.counts[offset + code] / total
@@ -0,0 +1,121 @@
+"""
+Perk registry.
+
+Perks are defined once, here, and a player's perks are an int bitmask
+(Perk.bit). Each perk contributes hooks at named points of turn
+resolution; compile_hooks(mask) turns a mask into PerkHooks, one tuple of
+hooks per point, cached per mask, so a turn only runs the hooks the player
+actually owns, however many perks exist.
+
+A hook is hook(player, result, value) -> value: it gets the value being
+computed at its point (insight gained, damage, focus cost...) and returns
+the adjusted value, appending its perk's name to result.perks_triggered
+when it fires.
+"""
+from .player import StatEffect
+
+# Hook points, in the order resolve_action reaches them
+OBSERVE_INSIGHT = "observe_insight"      # insight gained by OBSERVE
+OBSERVE_AFTER = "observe_after"          # after OBSERVE's own stat changes (value unused)
+DAMAGE_TAKEN = "damage_taken"            # damage from being caught observing
+ATTACK_FOCUS_MIN = "attack_focus_min"    # focus needed to ATTACK
+ATTACK_DAMAGE = "attack_damage"          # ATTACK damage before the enemy's DEFEND
+ATTACK_FOCUS_COST = "attack_focus_cost"  # focus change (negative) after attacking
+HOOK_POINTS = (OBSERVE_INSIGHT, OBSERVE_AFTER, DAMAGE_TAKEN, ATTACK_FOCUS_MIN, ATTACK_DAMAGE, ATTACK_FOCUS_COST)
+
+
+class Perk:
+    __slots__ = ("name", "description", "bit", "hooks")
+
+    def __init__(self, name, description, hooks):
+        self.name = name
+        self.description = description
+        self.bit = 0  # assigned on registration
+        self.hooks = hooks  # {hook point: hook}
+
+
+class PerkHooks:
+    """Per-point hook tuples for one perk mask."""
+
+    __slots__ = HOOK_POINTS
+
+    def __init__(self, mask):
+        for point in HOOK_POINTS:
+            setattr(self, point, tuple(perk.hooks[point] for perk in PERKS
+                                       if perk.bit & mask and point in perk.hooks))
+
+
+# --- Perk effects ---------------------------------------------------------
+
+STEADY_BREATH = StatEffect({"focus": 1})
+
+
+def _keen_insight(player, result, gain):
+    result.perks_triggered.append("Keen Insight")
+    return gain + 1
+
+
+def _steady_breath(player, result, value):
+    player.apply_effect(STEADY_BREATH)
+    result.perks_triggered.append("Steady Breath")
+    return value
+
+
+def _iron_resolve(player, result, dmg):
+    result.perks_triggered.append("Iron Resolve")
+    return max(1, dmg - 2)
+
+
+def _focused_mind_min(player, result, required):
+    return min(required, 1)
+
+
+def _focused_mind_cost(player, result, cost):
+    result.perks_triggered.append("Focused Mind")
+    return -1
+
+
+def _adrenaline(player, result, dmg):
+    if player.risk > 40:
+        result.perks_triggered.append("Adrenaline")
+        return dmg + 4
+    return dmg
+
+
+# Offer order matters: perk selection samples from this order with the run's RNG
+PERKS = (
+    Perk("Focused Mind", "Attack Focus cost reduced by 1",
+         {ATTACK_FOCUS_MIN: _focused_mind_min, ATTACK_FOCUS_COST: _focused_mind_cost}),
+    Perk("Iron Resolve", "Reduce all damage taken by 2", {DAMAGE_TAKEN: _iron_resolve}),
+    Perk("Keen Insight", "Gain +1 extra Insight when Observing", {OBSERVE_INSIGHT: _keen_insight}),
+    Perk("Adrenaline", "Deal +4 damage if Risk is above 40%", {ATTACK_DAMAGE: _adrenaline}),
+    Perk("Steady Breath", "Recover +1 Focus during local Observation", {OBSERVE_AFTER: _steady_breath}),
+)
+for _i, _perk in enumerate(PERKS):
+    _perk.bit = 1 << _i
+
+PERK_BY_NAME = {perk.name: perk for perk in PERKS}
+PERK_NAMES = tuple(perk.name for perk in PERKS)
+
+_COMPILED = {}
+
+
+def compile_hooks(mask):
+    """PerkHooks for a perk mask (cached)."""
+    hooks = _COMPILED.get(mask)
+    if hooks is None:
+        hooks = _COMPILED[mask] = PerkHooks(mask)
+    return hooks
+
+
+def perk_mask(names):
+    """Bitmask for an iterable of perk names."""
+    mask = 0
+    for name in names:
+        mask |= PERK_BY_NAME[name].bit
+    return mask
+
+
+def perk_names(mask):
+    """Names of the perks in a mask, in registry order."""
+    return [perk.name for perk in PERKS if perk.bit & mask]
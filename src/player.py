@@ -1,6 +1,52 @@
 from .utils import print_header, CLR
+from .events import EVENTS, PermanentPenalty, StatChanged, UnknownStat, Recovered
+
+# Stats with a dedicated fast path in Player.adjust
+FAST_STATS = ("hp", "focus", "insight", "risk")
+MAX_STATS = ("max_hp", "max_focus")
+
+
+class StatEffect:
+    """
+    A stat change compiled once into per-stat deltas, so applying it is a few
+    direct attribute updates with the clamping bounds already resolved.
+    Example: StatEffect({"insight": 2, "risk": -5})
+    """
+
+    __slots__ = ("items", "hp", "focus", "insight", "risk", "extra", "unknown")
+
+    def __init__(self, effects):
+        self.items = tuple(effects.items())
+        self.hp = self.focus = self.insight = self.risk = 0
+        extra = []
+        unknown = []
+        for stat, value in self.items:
+            if stat in FAST_STATS:
+                setattr(self, stat, getattr(self, stat) + value)
+            elif stat in MAX_STATS:
+                extra.append((stat, value))
+            else:
+                unknown.append(stat)
+        self.extra = tuple(extra)
+        self.unknown = tuple(unknown)
+
+
+_COMPILED_EFFECTS = {}
+
+def compile_effect(effects):
+    """Returns a cached StatEffect for an effects dict."""
+    key = tuple(effects.items())
+    effect = _COMPILED_EFFECTS.get(key)
+    if effect is None:
+        if len(_COMPILED_EFFECTS) >= 4096:
+            _COMPILED_EFFECTS.clear()
+        effect = _COMPILED_EFFECTS[key] = StatEffect(effects)
+    return effect
+
 
 class Player:
+    __slots__ = ("name", "hp", "max_hp", "insight", "focus", "max_focus", "risk", "permanent_scars", "perks")
+
     def __init__(self, name="Traveler", hp=100, insight=10, focus=10, risk=0):
         self.name = name
         self.hp = hp
@@ -10,7 +56,7 @@ class Player:
         self.max_focus = focus
         self.risk = risk
         self.permanent_scars = []
-        self.perks = []
+        self.perks = 0  # bitmask of perks.PERKS bits
 
     def display_status(self):
         """Displays the player's current status and statistics."""
@@ -25,49 +71,65 @@ class Player:
 
     def apply_permanent_penalty(self, stat, value, reason):
         """Reduces max stats permanently."""
-        if hasattr(self, stat):
-            current_val = getattr(self, stat)
-            setattr(self, stat, max(1, current_val - value))
+        if stat == "max_hp":
+            self.max_hp = max(1, self.max_hp - value)
+            self.hp = min(self.hp, self.max_hp)
+        elif stat == "max_focus":
+            self.max_focus = max(1, self.max_focus - value)
+            self.focus = min(self.focus, self.max_focus)
+        elif stat in FAST_STATS:
+            setattr(self, stat, max(1, getattr(self, stat) - value))
+        else:
+            return
             
-            # If we reduce max_hp or max_focus, we should also clamp current values
-            if stat == "max_hp":
-                self.hp = min(self.hp, self.max_hp)
-            elif stat == "max_focus":
-                self.focus = min(self.focus, self.max_focus)
-                
-            self.permanent_scars.append(reason)
-            print(f"\n[!!!] PERMANENT PENALTY: {stat.upper()} decreased by {value} due to {reason}.")
-
-    def apply_decision_effect(self, effects: dict, silent=False):
+        self.permanent_scars.append(reason)
+        if EVENTS.wants(PermanentPenalty):
+            EVENTS.publish(PermanentPenalty(stat, value, reason))
+
+    def adjust(self, hp=0, focus=0, insight=0, risk=0):
+        """Applies stat deltas directly, keeping HP, Focus and Risk in bounds."""
+        if hp:
+            hp += self.hp
+            self.hp = 0 if hp < 0 else (self.max_hp if hp > self.max_hp else hp)
+        if focus:
+            focus += self.focus
+            self.focus = 0 if focus < 0 else (self.max_focus if focus > self.max_focus else focus)
+        if insight:
+            self.insight += insight
+        if risk:
+            risk += self.risk
+            self.risk = risk if risk > 0 else 0
+
+    def apply_effect(self, effect):
+        """Applies a precompiled StatEffect."""
+        for stat, value in effect.extra:
+            setattr(self, stat, getattr(self, stat) + value)
+        self.adjust(effect.hp, effect.focus, effect.insight, effect.risk)
+
+    def apply_decision_effect(self, effects, silent=False):
         """
         Applies changes to the player's stats based on a decision.
         Example effects: {"hp": -10, "insight": 5, "risk": 2}
+        Accepts a dict or a precompiled StatEffect.
         """
-        for stat, value in effects.items():
-            if hasattr(self, stat):
-                setattr(self, stat, getattr(self, stat) + value)
-                
-                # Boundary checks
-                if stat == "hp":
-                    self.hp = max(0, min(self.hp, self.max_hp))
-                elif stat == "focus":
-                    self.focus = max(0, min(self.focus, self.max_focus))
-                elif stat == "risk":
-                    self.risk = max(0, self.risk)
-                
-                # Feedback to user
-                if not silent:
-                    change = f"+{value}" if value > 0 else f"{value}"
-                    print(f"[Stat Update] {stat.upper()}: {change}")
-            else:
-                if not silent:
-                    print(f"[Warning] Unknown stat: {stat}")
+        effect = effects if isinstance(effects, StatEffect) else compile_effect(effects)
+        self.apply_effect(effect)
+
+        # Feedback to subscribers
+        if not silent and (EVENTS.wants(StatChanged) or EVENTS.wants(UnknownStat)):
+            for stat, value in effect.items:
+                if stat in effect.unknown:
+                    EVENTS.publish(UnknownStat(stat))
+                else:
+                    EVENTS.publish(StatChanged(stat, value))
 
     def recover(self, hp_amount=0, focus_amount=0):
         """Restores HP and Focus, capped at max values."""
         if hp_amount > 0:
             self.hp = min(self.max_hp, self.hp + hp_amount)
-            print(f"[Rest] Recovered {hp_amount} HP.")
+            if EVENTS.wants(Recovered):
+                EVENTS.publish(Recovered("hp", hp_amount))
         if focus_amount > 0:
             self.focus = min(self.max_focus, self.focus + focus_amount)
-            print(f"[Rest] Recovered {focus_amount} Focus.")
+            if EVENTS.wants(Recovered):
+                EVENTS.publish(Recovered("focus", focus_amount))
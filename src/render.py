@@ -0,0 +1,40 @@
+import sys
+from .utils import CLEAR_SEQ, enable_ansi
+
+
+class FrameRenderer:
+    """
+    Double-buffered terminal renderer.
+
+    A frame is composed off-screen as a list of lines, compared against the
+    previous frame, and only the rows that changed are rewritten using ANSI
+    cursor moves in a single buffered write. Lines must fit the terminal width.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.previous = None
+
+    def invalidate(self):
+        """Forces a full redraw on the next frame (e.g. after another screen drew)."""
+        self.previous = None
+
+    def render(self, lines):
+        """Draws a frame and leaves the cursor on the row just below it."""
+        out = []
+        previous = self.previous
+        if previous is None:
+            enable_ansi()
+            out.append(CLEAR_SEQ)
+            previous = []
+
+        for row, line in enumerate(lines):
+            if row >= len(previous) or previous[row] != line:
+                out.append(f"\033[{row + 1};1H{line}\033[K")
+
+        # Park the cursor below the frame and wipe stale rows and prompt echoes
+        out.append(f"\033[{len(lines) + 1};1H\033[J")
+
+        self.stream.write("".join(out))
+        self.stream.flush()
+        self.previous = list(lines)
@@ -0,0 +1,145 @@
+import base64
+import contextlib
+import json
+import random
+from .floors import DEFAULT_CURVE
+from .utils import safe_input, pause
+
+RECORDING_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)  # version 1 predates resumed sessions
+
+
+class CountingRandom(random.Random):
+    """random.Random that counts every draw, so recordings can pin RNG usage per input."""
+
+    def __init__(self, seed=None):
+        self.draws = 0
+        super().__init__(seed)
+
+    def random(self):
+        self.draws += 1
+        return super().random()
+
+    def getrandbits(self, k):
+        self.draws += 1
+        return super().getrandbits(k)
+
+
+class ReplayMismatch(Exception):
+    """Raised when a replayed session consumes the RNG differently than recorded."""
+
+
+class SessionRecorder:
+    """
+    Records a session as its seed and tower curve plus every player input,
+    together with the number of RNG draws made before each input. Pauses are not recorded since
+    they never affect the game. A session that continued a checkpointed run
+    also stores the checkpoint it resumed from.
+    """
+
+    def __init__(self, seed, rng, input_fn=safe_input, curve=DEFAULT_CURVE):
+        self.seed = seed
+        self.curve = curve
+        self.rng = rng
+        self.input_fn = input_fn
+        self.inputs = []
+        self.draws = []
+        self.engine = None  # set by start_recording
+
+    def read_input(self, prompt="> "):
+        self.draws.append(self.rng.draws)
+        value = self.input_fn(prompt)
+        self.inputs.append(value)
+        return value
+
+    def to_dict(self):
+        recording = {
+            "version": RECORDING_VERSION,
+            "seed": self.seed,
+            "curve": self.curve,
+            "inputs": self.inputs,
+            "draws": self.draws,
+            "total_draws": self.rng.draws,
+        }
+        if self.engine is not None and self.engine.resumed_from is not None:
+            recording["checkpoint"] = base64.b64encode(self.engine.resumed_from).decode("ascii")
+        return recording
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+
+class ScriptedInput:
+    """Feeds recorded inputs back, checking RNG usage against the recording."""
+
+    def __init__(self, recording, rng):
+        self.inputs = recording["inputs"]
+        self.draws = recording["draws"]
+        self.rng = rng
+        self.position = 0
+
+    def read_input(self, prompt="> "):
+        i = self.position
+        if i >= len(self.inputs):
+            return None  # Recording ended (e.g. the session was interrupted): cancel out
+        if self.rng.draws != self.draws[i]:
+            raise ReplayMismatch(f"RNG diverged before input #{i + 1}: "
+                                 f"{self.rng.draws} draws, recorded {self.draws[i]}.")
+        self.position += 1
+        return self.inputs[i]
+
+    def pause(self, prompt=""):
+        pass
+
+
+class _NullWriter:
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def start_recording(seed=None, persist=True, curve=DEFAULT_CURVE):
+    """Creates a GameEngine on the given tower curve whose inputs and RNG usage are recorded."""
+    from .engine import GameEngine
+
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 32)
+    rng = CountingRandom(seed)
+    recorder = SessionRecorder(seed, rng, curve=curve)
+    engine = GameEngine(seed=seed, rng=rng, input_fn=recorder.read_input, pause_fn=pause, persist=persist,
+                        curve=curve)
+    recorder.engine = engine
+    return engine, recorder
+
+
+def load_recording(path):
+    with open(path, "r") as f:
+        recording = json.load(f)
+    if recording.get("version") not in SUPPORTED_VERSIONS:
+        raise ReplayMismatch(f"Unsupported recording version: {recording.get('version')}")
+    return recording
+
+
+def replay(recording):
+    """
+    Re-runs a recorded session headlessly, as fast as possible, without touching
+    run history. Returns the finished GameEngine.
+    """
+    from .engine import GameEngine
+
+    if isinstance(recording, str):
+        recording = load_recording(recording)
+    rng = CountingRandom(recording["seed"])
+    script = ScriptedInput(recording, rng)
+    engine = GameEngine(seed=recording["seed"], rng=rng, input_fn=script.read_input,
+                        pause_fn=script.pause, persist=False, curve=recording.get("curve", DEFAULT_CURVE))
+    if "checkpoint" in recording:
+        engine.resume_data = base64.b64decode(recording["checkpoint"])
+    with contextlib.redirect_stdout(_NullWriter()):
+        engine.start()
+    if rng.draws != recording.get("total_draws", rng.draws):
+        raise ReplayMismatch(f"Replay made {rng.draws} RNG draws, recorded {recording['total_draws']}.")
+    return engine
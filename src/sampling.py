@@ -0,0 +1,37 @@
+import random
+
+
+class AliasTable:
+    """
+    Walker/Vose alias table: draws from a fixed discrete distribution in O(1)
+    with a single uniform random number.
+    """
+
+    __slots__ = ("prob", "alias", "n")
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+
+        self.prob = prob
+        self.alias = alias
+        self.n = n
+
+    def sample(self, rng=random):
+        """Returns an index drawn with probability proportional to its weight."""
+        u = rng.random() * self.n
+        i = int(u)
+        return i if u - i < self.prob[i] else self.alias[i]
@@ -0,0 +1,237 @@
+"""
+Multi-session game server.
+
+Every TCP or Unix-socket connection plays its own GameEngine on one shared
+event loop. The game prints to sys.stdout, so while serving, sys.stdout is
+replaced by SessionStdout, which sends each write to the connection whose
+task is running (tracked in a ContextVar). Finished runs are queued and
+written to the run history and Hall of Fame in batches, off the loop.
+"""
+import asyncio
+import contextvars
+import random
+import sys
+import time
+from .engine import GameEngine
+from .halloffame import HallOfFame
+from .inputs import QueueInput
+from .storage import RunHistoryStore
+
+SESSION_OUTPUT = contextvars.ContextVar("session_output", default=None)
+
+
+class SessionStdout:
+    """sys.stdout stand-in that routes writes to the current session's connection."""
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+
+    def write(self, text):
+        output = SESSION_OUTPUT.get()
+        return (output or self.fallback).write(text)
+
+    def flush(self):
+        output = SESSION_OUTPUT.get()
+        (output or self.fallback).flush()
+
+    def isatty(self):
+        return False
+
+
+class _ConnectionOutput:
+    def __init__(self, writer):
+        self.writer = writer
+
+    def write(self, text):
+        if not self.writer.is_closing():
+            self.writer.write(text.encode("utf-8"))
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class SocketInput(QueueInput):
+    """Lines from a connection; prompts are written back and flushed before waiting."""
+
+    def __init__(self, writer):
+        super().__init__()
+        self.writer = writer
+
+    async def _prompt(self, prompt):
+        if self.closed or self.writer.is_closing():
+            return False
+        self.writer.write(prompt.encode("utf-8"))
+        try:
+            await self.writer.drain()
+        except ConnectionError:
+            self.close()
+            return False
+        return True
+
+    async def read(self, prompt="> "):
+        if not await self._prompt(prompt):
+            return None
+        return await super().read(prompt)
+
+    async def pause(self, prompt=""):
+        if await self._prompt(prompt or "\n[Press Enter]"):
+            await super().read(prompt)
+
+
+class RunBatcher:
+    """Collects finished runs and writes them together in a worker thread."""
+
+    def __init__(self, store_dir="run_history", hall_path="hall_of_fame.db", batch_size=64, interval=1.0):
+        self.store = RunHistoryStore(store_dir)
+        self.hall_path = hall_path
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pending = []
+        self.written = 0
+        self.wakeup = asyncio.Event()
+
+    def add(self, summary):
+        self.pending.append(summary)
+        if len(self.pending) >= self.batch_size:
+            self.wakeup.set()
+
+    async def run(self):
+        """Flushes every interval (or as soon as a batch fills) until cancelled."""
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+                self.wakeup.clear()
+                await self.flush()
+        finally:
+            await self.flush()
+
+    async def flush(self):
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        try:
+            await asyncio.to_thread(self._write, batch)
+            self.written += len(batch)
+        except Exception as e:
+            print(f"[Warning] Could not record {len(batch)} runs: {e}", file=sys.stderr)
+
+    def _write(self, batch):
+        hall = HallOfFame(self.hall_path, store=self.store)
+        try:
+            # The archive is the source of truth: backfill, append, and only then rank the batch
+            hall.import_from()
+            self.store.append_many(batch)
+            hall.record_many(batch)
+        finally:
+            hall.close()
+
+
+class GameServer:
+    def __init__(self, address="127.0.0.1:7777", turn_timeout=None, batcher=None):
+        """
+        Args:
+            address (str): "host:port" for TCP or "unix:/path" for a Unix socket.
+            turn_timeout (float): Per-turn decision timeout for every session.
+            batcher (RunBatcher): Shared persistence; a default one when omitted.
+        """
+        self.address = address
+        self.turn_timeout = turn_timeout
+        self.batcher = batcher
+        self.seeds = random.SystemRandom()
+        self.active = 0
+        self.completed = 0
+        self.started = None
+
+    async def serve(self, ready=None):
+        """Serves until cancelled. ready(bound address) is called once listening."""
+        if self.batcher is None:
+            self.batcher = RunBatcher()
+        if self.address.startswith("unix:"):
+            server = await asyncio.start_unix_server(self._handle, path=self.address[5:])
+            bound = self.address
+        else:
+            host, _, port = self.address.rpartition(":")
+            server = await asyncio.start_server(self._handle, host or "127.0.0.1", int(port))
+            host, port = server.sockets[0].getsockname()[:2]
+            bound = f"{host}:{port}"
+
+        saved_stdout = sys.stdout
+        sys.stdout = SessionStdout(saved_stdout)
+        flusher = asyncio.create_task(self.batcher.run())
+        self.started = time.perf_counter()
+        try:
+            if ready:
+                ready(bound)
+            async with server:
+                await server.serve_forever()
+        finally:
+            flusher.cancel()
+            try:
+                await flusher
+            except asyncio.CancelledError:
+                pass
+            sys.stdout = saved_stdout
+
+    async def _handle(self, reader, writer):
+        SESSION_OUTPUT.set(_ConnectionOutput(writer))
+        source = SocketInput(writer)
+        pump = asyncio.create_task(self._pump(reader, source))
+        self.active += 1
+        try:
+            engine = GameEngine(seed=self.seeds.randrange(2 ** 32), input_source=source,
+                                persist=False, turn_timeout=self.turn_timeout)
+            await engine.run()
+            if engine.summary is not None:
+                self.batcher.add(engine.summary)
+            self.completed += 1
+        except Exception as e:
+            print(f"[Warning] Session failed: {e!r}", file=sys.__stderr__)
+        finally:
+            self.active -= 1
+            pump.cancel()
+            writer.close()
+
+    @staticmethod
+    async def _pump(reader, source):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                source.feed(line.decode("utf-8", errors="replace"))
+        except ConnectionError:
+            pass
+        finally:
+            source.close()
+
+    def stats(self):
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        return {"active": self.active, "completed": self.completed,
+                "written": self.batcher.written if self.batcher else 0, "uptime": elapsed}
+
+
+def run_server(address, turn_timeout=None):
+    """Blocking entry point: serves until interrupted (Ctrl+C or SIGTERM), then flushes pending runs."""
+
+    async def main():
+        server = GameServer(address, turn_timeout=turn_timeout)
+        task = asyncio.current_task()
+        try:
+            import signal
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+        except (ImportError, NotImplementedError, AttributeError):
+            pass  # No SIGTERM handling on this platform
+        try:
+            await server.serve(ready=lambda bound: print(f"Serving Outplay on {bound}", flush=True))
+        except asyncio.CancelledError:
+            pass
+        print(f"Served {server.completed} sessions.")
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,211 @@
+"""
+Exact encounter solver.
+
+Treats a fight as a Markov decision process over the real turn rules: the
+player picks a tactic, the enemy answers with the probabilities of its
+decision table and PRESSURE rolls 3-7 uniformly.
+
+Without a turn limit the answer follows from the rules alone: the player
+only takes damage when OBSERVE meets an ATTACK, and PRESSURE always deals
+at least 1 (3 * the 0.4 floor on modifiers), so repeating PRESSURE wins
+every live position with certainty. EncounterSolver returns that exact
+value by default. Fights differ in how quickly they can be won, which is
+what a turn horizon measures: with one, it computes by memoized expectimax
+the probability of winning within that many turns under optimal play, and
+the tactic that achieves it. Horizons too short to deal the enemy's HP at
+all are rejected.
+
+Solved values are keyed by the full combat state and turns left, and can be
+pickled to disk so later lookups are dictionary reads. A table is only
+reused for the same enemy model (traits and everything its pattern model
+has learned), player memory size and horizon.
+"""
+import hashlib
+import json
+import os
+import pickle
+from collections import namedtuple
+from .actions import ACTIONS, ENEMY_ACTIONS
+from .history import RECENT_WINDOW
+from .state import CombatState, ENEMY_HP, HP, INSIGHT
+
+SOLVER_VERSION = 3
+PRESSURE_ROLLS = (3, 4, 5, 6, 7)
+
+# Rule bounds used for pruning: one turn deals at most MAX_HIT + insight // 2
+# (a perfect COUNTER) and only OBSERVE raises insight, by at most MAX_INSIGHT_GAIN
+MAX_HIT = 15
+MAX_INSIGHT_GAIN = 4
+
+# Response probabilities per (traits, decision state), shared by all solvers
+_RESPONSES = {}
+
+# probability: chance of winning (within `horizon` turns, unless horizon is None) under optimal play;
+# tactic: the action achieving it (None when decided or unwinnable in time)
+Solution = namedtuple("Solution", ("probability", "tactic", "horizon"))
+
+
+def response_probabilities(enemy, decision_state):
+    """(enemy action, probability) pairs with non-zero weight for a decision state."""
+    key = (enemy.aggression, enemy.patience, enemy.adapt_rate, decision_state)
+    pairs = _RESPONSES.get(key)
+    if pairs is None:
+        if decision_state == 0:
+            weights = enemy.response_weights()
+        else:
+            code, freq = divmod(decision_state - 1, RECENT_WINDOW)
+            weights = enemy.response_weights(ACTIONS[code], freq + 1)
+        total = float(sum(weights))
+        pairs = _RESPONSES[key] = tuple((action, w / total)
+                                        for action, w in zip(ENEMY_ACTIONS, weights) if w > 0)
+    return pairs
+
+
+def max_damage(insight, turns):
+    """Upper bound on the damage the player can still deal in the given number of turns."""
+    best = 0
+    for observing in range(turns):
+        hits = turns - observing
+        best = max(best, hits * (MAX_HIT + (insight + MAX_INSIGHT_GAIN * observing) // 2))
+    return best
+
+
+def enemy_model(enemy, memory_size=5):
+    """Hashable identity of everything a solved table depends on besides the position."""
+    pattern = enemy.pattern.fingerprint() if enemy.pattern is not None else None
+    return enemy.aggression, enemy.patience, enemy.adapt_rate, pattern, memory_size
+
+
+def min_horizon(enemy_hp, insight):
+    """Fewest turns in which the rules allow dealing enemy_hp damage at all."""
+    turns = 1
+    while max_damage(insight, turns) < enemy_hp:
+        turns += 1
+    return turns
+
+
+class EncounterSolver:
+    def __init__(self, enemy, horizon=None, path=None, memory_size=5):
+        """
+        Args:
+            enemy (Enemy): Opponent; its traits and pattern model define the decision tables.
+            horizon (int): Turns the player has to win in; results are then
+                P(win within horizon turns). None solves the untimed fight.
+            path (str): Pickle file to load solved states from and save them to.
+            memory_size (int): Size of the player memory window positions are solved for.
+        """
+        self.enemy = enemy
+        self.horizon = horizon
+        self.path = path
+        self.memory_size = memory_size
+        self.table = {}  # (state key, turns left) -> (win probability, best action code)
+        self.model = enemy_model(enemy, memory_size)
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def solve(self, player, memory=None, player_history=None):
+        """
+        Solution(probability, tactic, horizon) for a position; tactic is None
+        when the fight is decided or unwinnable in time.
+
+        Raises:
+            ValueError: memory has another size than the solver's, or the
+                horizon is too short to deal the enemy's HP.
+        """
+        state = CombatState.capture(player, self.enemy, memory, player_history)
+        if state.memory_size != self.memory_size:
+            raise ValueError(f"memory size {state.memory_size} does not match the solver's {self.memory_size}")
+        values = state.values
+        if self.horizon is None:
+            if values[ENEMY_HP] <= 0 or values[HP] <= 0:
+                return Solution(float(values[ENEMY_HP] <= 0), None, None)
+            return Solution(1.0, "PRESSURE", None)  # see the module docstring
+        if values[ENEMY_HP] > 0 and values[ENEMY_HP] > max_damage(values[INSIGHT], self.horizon):
+            needed = min_horizon(values[ENEMY_HP], values[INSIGHT])
+            raise ValueError(f"horizon {self.horizon} is too short to deal {values[ENEMY_HP]} damage "
+                             f"(needs at least {needed} turns)")
+        probability, code = self._value(state, self.horizon)
+        return Solution(probability, ACTIONS[code] if code is not None else None, self.horizon)
+
+    def _value(self, state, turns_left):
+        values = state.values
+        if values[ENEMY_HP] <= 0:
+            return 1.0, None
+        if values[HP] <= 0 or values[ENEMY_HP] > max_damage(values[INSIGHT], turns_left):
+            return 0.0, None
+
+        key = (state.key(), turns_left)
+        known = self.table.get(key)
+        if known is not None:
+            return known
+
+        enemy = self.enemy
+        best, best_code = -1.0, None
+        for code, action in enumerate(ACTIONS):
+            rolls = PRESSURE_ROLLS if action == "PRESSURE" else (0,)
+            # The enemy decides after this turn's action enters the history
+            mark = state.snapshot()
+            state.history.append(action)
+            responses = response_probabilities(enemy, enemy.decision_state(state.history))
+            state.undo(mark)
+
+            expected = 0.0
+            for enemy_action, p in responses:
+                for roll in rolls:
+                    state.step_outcome(action, enemy_action, roll)
+                    expected += p * self._value(state, turns_left - 1)[0]
+                    state.undo(mark)
+            expected /= len(rolls)
+            if expected > best:
+                best, best_code = expected, code
+                if best >= 1.0:
+                    break
+
+        result = self.table[key] = (best, best_code)
+        return result
+
+    # --- Persistence ------------------------------------------------------
+
+    def save(self, path=None):
+        path = path or self.path
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump({"version": SOLVER_VERSION, "model": self.model, "horizon": self.horizon,
+                         "table": self.table},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+    def load(self, path):
+        """Merges solved states from path; ignores files for other versions, enemy models, memory sizes or horizons."""
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        if (data.get("version") == SOLVER_VERSION and data.get("model") == self.model
+                and data.get("horizon") == self.horizon):
+            self.table.update(data["table"])
+
+
+def solve_floors(floors, player=None, horizon=None, directory="solver_cache", tower=None):
+    """
+    Solves the opening position of every floor enemy the tower spawns. With a
+    horizon, each floor's table is cached in directory, one file per tower
+    (curve and seed), floor and horizon.
+    Returns {floor: Solution}.
+    """
+    from .floors import DEFAULT_TOWER
+    from .player import Player
+
+    tower = tower if tower is not None else DEFAULT_TOWER
+    tower_id = hashlib.sha1(json.dumps(tower.key).encode("utf-8")).hexdigest()[:12]
+    if horizon is not None:
+        os.makedirs(directory, exist_ok=True)
+    player = player if player is not None else Player()
+    results = {}
+    for floor in floors:
+        enemy = tower.spec(floor).spawn()
+        path = os.path.join(directory, f"{tower_id}_floor{floor}_h{horizon}.pkl") if horizon is not None else None
+        solver = EncounterSolver(enemy, horizon=horizon, path=path)
+        solved_before = len(solver.table)
+        results[floor] = solver.solve(player)
+        if path and len(solver.table) != solved_before:
+            solver.save()
+    return results
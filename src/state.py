@@ -0,0 +1,233 @@
+"""
+Compact, reversible combat state for lookahead search.
+
+CombatState packs both combatants, the memory window, the enemy's recent
+history window and the perks into one flat list. Every write goes through
+an undo journal, so snapshot() is O(1) and undo() costs only the number of
+changes made since the snapshot. Turns run the real kernel rules through
+lightweight views that stand in for Player, Enemy, MemorySystem and
+PlayerHistory.
+"""
+import random
+from .actions import ACTIONS, action_code
+from .history import RECENT_WINDOW
+from .kernel import prepare_turn, resolve_action, determine_defeat_type
+from .memory import effectiveness_modifier, fatigue_penalties
+
+# Field indexes into CombatState.values
+HP, MAX_HP, FOCUS, MAX_FOCUS, INSIGHT, RISK, PERKS, ENEMY_HP, MEMORY, RECENT, TURNS = range(11)
+
+
+class CombatState:
+    __slots__ = ("values", "journal", "enemy", "memory_size", "player", "foe", "memory", "history")
+
+    def __init__(self, values, enemy, memory_size=5):
+        self.values = values
+        self.journal = []
+        self.enemy = enemy
+        self.memory_size = memory_size
+        self.player = _PlayerView(self)
+        self.foe = _EnemyView(self)
+        self.memory = _MemoryView(self)
+        self.history = _HistoryView(self)
+
+    @classmethod
+    def capture(cls, player, enemy, memory=None, player_history=None):
+        """Builds a state from live game objects (memory and history are optional)."""
+        memory_codes = tuple(memory.codes) if memory is not None else ()
+        memory_size = memory.size if memory is not None else 5
+        recent = ()
+        if player_history:
+            recent = tuple(action_code(a) for a in player_history.recent(RECENT_WINDOW))
+        values = [player.hp, player.max_hp, player.focus, player.max_focus, player.insight,
+                  player.risk, player.perks, enemy.hp, memory_codes, recent, 0]
+        return cls(values, enemy, memory_size)
+
+    # --- Journal ----------------------------------------------------------
+
+    def set(self, field, value):
+        values = self.values
+        self.journal.append((field, values[field]))
+        values[field] = value
+
+    def snapshot(self):
+        """Returns a mark to pass to undo(). O(1)."""
+        return len(self.journal)
+
+    def undo(self, mark):
+        """Reverts every change made since mark was taken."""
+        values = self.values
+        journal = self.journal
+        while len(journal) > mark:
+            field, old = journal.pop()
+            values[field] = old
+
+    def commit(self):
+        """Forgets the journal, making the current state the new baseline."""
+        self.journal.clear()
+
+    def clone(self):
+        """Independent copy of the current state with an empty journal."""
+        return CombatState(list(self.values), self.enemy, self.memory_size)
+
+    def key(self):
+        """Hashable identity of the state (turn count excluded)."""
+        return tuple(self.values[:TURNS])
+
+    # --- Turns ------------------------------------------------------------
+
+    def outcome(self):
+        """"VICTORY", a defeat type, or None while the fight goes on."""
+        values = self.values
+        if values[ENEMY_HP] <= 0:
+            return "VICTORY"
+        if values[HP] <= 0:
+            return determine_defeat_type(self.player, self.history)
+        return None
+
+    def step(self, action, rng=random):
+        """Plays a turn with the enemy's response and rolls drawn from rng (same draws as resolve_turn)."""
+        self.set(TURNS, self.values[TURNS] + 1)
+        result = prepare_turn(self.player, self.foe, self.memory, self.history, action)
+        enemy_action = self.enemy.choose_response(self.history, rng=rng)
+        roll = rng.randint(3, 7) if action == "PRESSURE" else 0
+        return resolve_action(self.player, self.foe, result, enemy_action, roll)
+
+    def step_outcome(self, action, enemy_action, roll=0):
+        """Plays a turn with a fixed enemy response and PRESSURE roll (for exact search)."""
+        self.set(TURNS, self.values[TURNS] + 1)
+        result = prepare_turn(self.player, self.foe, self.memory, self.history, action)
+        return resolve_action(self.player, self.foe, result, enemy_action, roll)
+
+    def response_table(self):
+        """The enemy's AliasTable for the current history (read after prepare)."""
+        return self.enemy.decision_table[self.enemy.decision_state(self.history)]
+
+
+class _PlayerView:
+    """Player-shaped view over a CombatState."""
+
+    __slots__ = ("state",)
+
+    def __init__(self, state):
+        self.state = state
+
+    hp = property(lambda self: self.state.values[HP])
+    max_hp = property(lambda self: self.state.values[MAX_HP])
+    focus = property(lambda self: self.state.values[FOCUS])
+    max_focus = property(lambda self: self.state.values[MAX_FOCUS])
+    insight = property(lambda self: self.state.values[INSIGHT])
+    risk = property(lambda self: self.state.values[RISK])
+    perks = property(lambda self: self.state.values[PERKS])
+
+    def adjust(self, hp=0, focus=0, insight=0, risk=0):
+        state = self.state
+        values = state.values
+        if hp:
+            hp += values[HP]
+            state.set(HP, 0 if hp < 0 else min(hp, values[MAX_HP]))
+        if focus:
+            focus += values[FOCUS]
+            state.set(FOCUS, 0 if focus < 0 else min(focus, values[MAX_FOCUS]))
+        if insight:
+            state.set(INSIGHT, values[INSIGHT] + insight)
+        if risk:
+            risk += values[RISK]
+            state.set(RISK, risk if risk > 0 else 0)
+
+    def apply_effect(self, effect):
+        self.adjust(effect.hp, effect.focus, effect.insight, effect.risk)
+
+
+class _EnemyView:
+    """Enemy-shaped view: traits and decisions come from the real Enemy, HP from the state."""
+
+    __slots__ = ("state",)
+
+    def __init__(self, state):
+        self.state = state
+
+    @property
+    def hp(self):
+        return self.state.values[ENEMY_HP]
+
+    @hp.setter
+    def hp(self, value):
+        self.state.set(ENEMY_HP, value)
+
+    @property
+    def name(self):
+        return self.state.enemy.name
+
+    def get_adaptation_penalty(self, player_action, player_history, silent=True):
+        return self.state.enemy.get_adaptation_penalty(player_action, player_history, silent=True)
+
+    def choose_response(self, player_history, rng=random):
+        return self.state.enemy.choose_response(player_history, rng=rng)
+
+
+class _MemoryView:
+    """MemorySystem-shaped view over the state's memory window tuple."""
+
+    __slots__ = ("state",)
+
+    def __init__(self, state):
+        self.state = state
+
+    def get_effectiveness_modifier(self, current_action, silent=True):
+        window = self.state.values[MEMORY]
+        if not window:
+            return 1.0
+        return effectiveness_modifier(window.count(action_code(current_action)))
+
+    def get_fatigue_triggers(self, current_action):
+        code = action_code(current_action)
+        return fatigue_penalties(code, self.state.values[MEMORY].count(code))
+
+    def record_decision(self, action):
+        state = self.state
+        if state.memory_size <= 0:
+            return
+        window = state.values[MEMORY] + (action_code(action),)
+        state.set(MEMORY, window[-state.memory_size:])
+
+
+class _HistoryView:
+    """PlayerHistory-shaped view over the state's recent-actions tuple."""
+
+    __slots__ = ("state",)
+
+    def __init__(self, state):
+        self.state = state
+
+    def __bool__(self):
+        return bool(self.state.values[RECENT])
+
+    def append(self, action):
+        state = self.state
+        state.set(RECENT, (state.values[RECENT] + (action_code(action),))[-RECENT_WINDOW:])
+
+    def last(self):
+        recent = self.state.values[RECENT]
+        return ACTIONS[recent[-1]] if recent else None
+
+    def context(self, n, skip=0):
+        recent = self.state.values[RECENT]
+        end = max(0, len(recent) - skip)
+        n = min(n, end)
+        packed = 0
+        for code in recent[end - n:end]:
+            packed = (packed << 2) | code
+        return packed, n
+
+    def window_count(self, action):
+        return self.state.values[RECENT].count(action_code(action))
+
+    def most_frequent_recent(self):
+        recent = self.state.values[RECENT]
+        counts = [recent.count(code) for code in range(len(ACTIONS))]
+        best = 0
+        for code in range(1, len(counts)):
+            if counts[code] > counts[best]:
+                best = code
+        return best, counts[best]
@@ -0,0 +1,242 @@
+import json
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class _FileLock:
+    """
+    Inter-process lock held on a dedicated lock file: exclusive for writers,
+    shared for readers (shared falls back to exclusive where flock is missing).
+    """
+
+    def __init__(self, path, shared=False):
+        self.path = path
+        self.shared = shared
+        self.fd = None
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl:
+            fcntl.flock(self.fd, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(self.fd, msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self.fd, 0, os.SEEK_SET)
+            msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+        os.close(self.fd)
+        self.fd = None
+
+
+def _atomic_write(path, data, sync=True):
+    """Writes bytes to a temporary file, fsyncs it (unless sync=False) and renames it over path."""
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class RunHistoryStore:
+    """
+    Append-only, crash-safe store for run summaries.
+
+    Runs are written as JSON lines to an active segment (current.jsonl) under an
+    exclusive file lock, so appending costs the same regardless of history size
+    and concurrent sessions never interleave. Full segments are sealed and listed
+    in a MANIFEST that is only ever replaced atomically. A torn trailing line left
+    by a crash is skipped on read and dropped on compaction.
+    """
+
+    def __init__(self, directory="run_history", legacy_file="run_history.json", max_segment_bytes=4 * 1024 * 1024):
+        self.directory = directory
+        self.legacy_file = legacy_file
+        self.max_segment_bytes = max_segment_bytes
+        self.current_path = os.path.join(directory, "current.jsonl")
+        self.manifest_path = os.path.join(directory, "MANIFEST")
+        os.makedirs(directory, exist_ok=True)
+        self._lock = _FileLock(os.path.join(directory, ".lock"))
+        self._read_lock = _FileLock(os.path.join(directory, ".lock"), shared=True)
+        self._migrated = False
+
+    # --- Writing ----------------------------------------------------------
+
+    def append(self, summary):
+        """Appends a single run summary."""
+        self.append_many([summary])
+
+    def append_many(self, summaries):
+        """Appends several run summaries with one lock acquisition and one fsync."""
+        if not summaries:
+            return
+        data = "".join(json.dumps(s, separators=(",", ":")) + "\n" for s in summaries).encode("utf-8")
+        with self._lock:
+            self._migrate_locked()
+            fd = os.open(self.current_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                size = os.fstat(fd).st_size
+                if size >= self.max_segment_bytes:
+                    os.close(fd)
+                    self._rotate_locked()
+                    fd = os.open(self.current_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                elif size and not self._ends_with_newline():
+                    data = b"\n" + data  # Fence off a torn line left by a crash
+                os.write(fd, data)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _ends_with_newline(self):
+        with open(self.current_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return []
+
+    def _write_manifest(self, segments):
+        _atomic_write(self.manifest_path, json.dumps(segments).encode("utf-8"))
+
+    def _rotate_locked(self):
+        """Seals the active segment under a new name."""
+        name = f"segment-{time.time_ns():020d}.jsonl"
+        # Manifest first: a crash before the rename leaves a dangling entry, never lost runs
+        self._write_manifest(self._read_manifest() + [name])
+        os.replace(self.current_path, os.path.join(self.directory, name))
+
+    # --- Reading ----------------------------------------------------------
+
+    def segment_paths(self, migrate=True):
+        """
+        Sealed segments in order, followed by the active segment (migrate=False
+        leaves the legacy file alone). A compaction or rotation may retire a path
+        right after it is listed; readers that need a stable view use open_segments().
+        """
+        if migrate:
+            self._ensure_migrated()
+        with self._read_lock:
+            return self._existing_paths()
+
+    def open_segments(self, migrate=True, legacy=False):
+        """
+        Opens every segment, oldest first, as one consistent snapshot: the listing
+        and the opens happen under a shared lock, so a concurrent compaction,
+        rotation or migration can neither delete nor rename a file in between.
+        legacy=True (with migrate=False) also opens a not-yet-migrated legacy
+        file, first since it holds the oldest runs. The open handles stay
+        readable afterwards; the caller closes them.
+        """
+        if migrate:
+            self._ensure_migrated()
+        files = []
+        with self._read_lock:
+            try:
+                if legacy and os.path.exists(self.legacy_file):
+                    files.append(open(self.legacy_file, "rb"))
+                for path in self._existing_paths():
+                    files.append(open(path, "rb"))
+            except BaseException:
+                for f in files:
+                    f.close()
+                raise
+        return files
+
+    def _existing_paths(self):
+        paths = [os.path.join(self.directory, name) for name in self._read_manifest()]
+        paths.append(self.current_path)
+        return [p for p in paths if os.path.exists(p)]
+
+    def iter_runs(self):
+        """Yields every stored run summary, oldest first, from a snapshot taken on the first call to next()."""
+        files = self.open_segments()
+        try:
+            for f in files:
+                yield from self._iter_lines(f)
+        finally:
+            for f in files:
+                f.close()
+
+    @classmethod
+    def _iter_segment(cls, path):
+        with open(path, "rb") as f:
+            yield from cls._iter_lines(f)
+
+    @staticmethod
+    def _iter_lines(f):
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # Torn write from a crash
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+    # --- Maintenance ------------------------------------------------------
+
+    def compact(self):
+        """Merges all sealed segments into one, dropping torn or corrupt lines."""
+        with self._lock:
+            self._migrate_locked()
+            old = self._read_manifest()
+            if len(old) < 2:
+                return
+            name = f"segment-{time.time_ns():020d}.jsonl"
+            path = os.path.join(self.directory, name)
+            tmp = f"{path}.tmp"
+            with open(tmp, "wb") as out:
+                for seg in old:
+                    seg_path = os.path.join(self.directory, seg)
+                    if not os.path.exists(seg_path):
+                        continue
+                    for run in self._iter_segment(seg_path):
+                        out.write(json.dumps(run, separators=(",", ":")).encode("utf-8") + b"\n")
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp, path)
+            self._write_manifest([name])
+            for seg in old:
+                try:
+                    os.remove(os.path.join(self.directory, seg))
+                except (FileNotFoundError, PermissionError):
+                    pass  # already gone, or (on Windows) still open in a reader
+
+    def _ensure_migrated(self):
+        if not self._migrated and os.path.exists(self.legacy_file):
+            with self._lock:
+                self._migrate_locked()
+        self._migrated = True
+
+    def _migrate_locked(self):
+        """One-time import of the legacy run_history.json array as the oldest segment."""
+        if self._migrated or not os.path.exists(self.legacy_file):
+            self._migrated = True
+            return
+        try:
+            with open(self.legacy_file, "r") as f:
+                legacy = json.load(f)
+        except ValueError:
+            legacy = []
+        name = "segment-00000000000000000000.jsonl"
+        data = "".join(json.dumps(s, separators=(",", ":")) + "\n" for s in legacy).encode("utf-8")
+        _atomic_write(os.path.join(self.directory, name), data)
+        manifest = self._read_manifest()
+        if name not in manifest:
+            self._write_manifest([name] + manifest)
+        os.replace(self.legacy_file, self.legacy_file + ".migrated")
+        self._migrated = True
@@ -0,0 +1,227 @@
+"""
+Policy tournaments.
+
+Plays player policies against a grid of enemy trait configurations and
+tower seeds. A match is one headless climb of a finite tower whose every
+floor fields an enemy with the cell's traits (HP still scales per floor):
+the policy plays every tactic and menus are answered by a fixed script.
+Matches are spread across a process pool and cached on disk, keyed by a hash
+of policy, configuration, seed and tower height, so a re-run only plays the
+cells it hasn't seen.
+"""
+import contextlib
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .actions import ACTIONS
+from .autoplay import MCTSPlayer
+from .floors import DEFAULT_CURVE
+from .kernel import make_random_policy
+from .storage import _atomic_write
+
+TOURNAMENT_VERSION = 2  # bump when game rules or match results change, to invalidate cached matches
+MAX_TURNS = 5000        # per match; some scripted policies can stall an encounter forever
+SAVE_EVERY = 64         # matches between cache writes
+
+
+class MatchAborted(Exception):
+    """Raised inside a match that hit MAX_TURNS."""
+
+
+# --- Policies -------------------------------------------------------------
+
+def _cycle_policy(seed):
+    """Plays the four tactics in turn."""
+    position = [seed % len(ACTIONS)]
+
+    def policy(player, enemy, player_history, memory=None):
+        position[0] = (position[0] + 1) % len(ACTIONS)
+        return ACTIONS[position[0]]
+
+    return policy
+
+
+def _striker_policy(seed):
+    """Attacks whenever Focus allows, otherwise observes."""
+
+    def policy(player, enemy, player_history, memory=None):
+        return "ATTACK" if player.focus >= 2 else "OBSERVE"
+
+    return policy
+
+
+def _mcts_policy(seed, iterations="200"):
+    return MCTSPlayer(iterations=int(iterations), seed=seed)
+
+
+# name -> factory(seed, *params); a policy spec is "name" or "name:param"
+POLICIES = {
+    "random": lambda seed: make_random_policy(seed),
+    "cycle": _cycle_policy,
+    "striker": _striker_policy,
+    "mcts": _mcts_policy,
+}
+
+
+def make_policy(spec, seed):
+    """Builds the policy for a spec such as "random" or "mcts:500"."""
+    name, *params = spec.split(":")
+    if name not in POLICIES:
+        raise ValueError(f"Unknown policy: {name} (choose from {', '.join(POLICIES)})")
+    return POLICIES[name](seed, *params)
+
+
+# --- Matches --------------------------------------------------------------
+
+def tower_curve(config, floors):
+    """A tower of `floors` floors whose enemies all have the traits in config."""
+    aggression, patience, adapt_rate = config
+    return dict(DEFAULT_CURVE, max_floor=floors,
+                aggression={"base": aggression, "every": floors + 1, "cap": aggression},
+                patience={"base": patience, "every": floors + 1, "cap": patience},
+                adapt_rate={"base": adapt_rate, "every": floors + 1, "cap": adapt_rate})
+
+
+def match_key(spec, config, seed, floors):
+    raw = json.dumps([TOURNAMENT_VERSION, spec, list(config), seed, floors])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _NullWriter:
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def _script(prompt="> "):
+    if "option" in prompt:
+        return "1"
+    if "name" in prompt:
+        return "Contender"
+    if "respite" in prompt:
+        return "2"
+    return "1"  # perk fragments
+
+
+def play_match(job):
+    """
+    Plays one (policy spec, config, seed, floors) match.
+
+    Returns:
+        dict: floors cleared, whether the summit was reached, turns played, and
+        whether the match was cut off at MAX_TURNS.
+    """
+    from .engine import GameEngine
+
+    spec, config, seed, floors = job
+    policy = make_policy(spec, seed)
+    turns = [0]
+
+    def counted(player, enemy, player_history, memory):
+        turns[0] += 1
+        if turns[0] > MAX_TURNS:
+            raise MatchAborted()
+        return policy(player, enemy, player_history, memory)
+
+    engine = GameEngine(seed=seed, input_fn=_script, pause_fn=lambda prompt="": None, persist=False,
+                        policy=counted, curve=tower_curve(config, floors))
+    aborted = False
+    with contextlib.redirect_stdout(_NullWriter()):
+        try:
+            engine.start()
+        except MatchAborted:
+            aborted = True
+    return {"cleared": engine.fight_count, "won": engine.ascended, "turns": turns[0], "aborted": aborted}
+
+
+# --- Tournament -----------------------------------------------------------
+
+class Tournament:
+    def __init__(self, policies, configs, seeds, floors=10, cache_path="tournament_cache.json", workers=None):
+        """
+        Args:
+            policies (list): Policy specs (see make_policy).
+            configs (list): (aggression, patience, adapt_rate) enemy traits.
+            seeds (list): Tower seeds; every cell plays one match per seed.
+            floors (int): Tower height; reaching the top counts as a win.
+            cache_path (str): JSON file of finished matches (None disables).
+            workers (int): Worker processes (default: one per CPU; 1 plays in-process).
+        """
+        for spec in policies:
+            make_policy(spec, 0)  # fail fast on a bad spec, before the pool starts
+        self.policies = list(policies)
+        self.configs = [tuple(config) for config in configs]
+        self.seeds = list(seeds)
+        self.floors = floors
+        self.cache_path = cache_path
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = self._load_cache()
+        self.played = 0  # matches computed by the last run()
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r") as f:
+                return json.load(f)
+        except ValueError:
+            return {}
+
+    def _save_cache(self):
+        if self.cache_path:
+            _atomic_write(self.cache_path, json.dumps(self.cache, separators=(",", ":")).encode("utf-8"))
+
+    def jobs(self):
+        return [(spec, config, seed, self.floors)
+                for spec in self.policies for config in self.configs for seed in self.seeds]
+
+    def run(self, progress=None):
+        """Plays every match missing from the cache; progress(done, total) is called as they finish."""
+        pending = [job for job in self.jobs() if match_key(*job) not in self.cache]
+        self.played = 0
+        try:
+            if pending and self.workers > 1:
+                with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                    futures = {pool.submit(play_match, job): job for job in pending}
+                    try:
+                        for future in as_completed(futures):
+                            self._record(futures[future], future.result(), len(pending), progress)
+                    except BaseException:
+                        pool.shutdown(cancel_futures=True)  # report a failed match without playing out the rest
+                        raise
+            else:
+                for job in pending:
+                    self._record(job, play_match(job), len(pending), progress)
+        finally:
+            # Keep every finished match, even when one of them failed
+            if self.played % SAVE_EVERY:
+                self._save_cache()
+        return self.matrix()
+
+    def _record(self, job, result, total, progress):
+        self.cache[match_key(*job)] = result
+        self.played += 1
+        if self.played % SAVE_EVERY == 0:
+            self._save_cache()
+        if progress:
+            progress(self.played, total)
+
+    def matrix(self):
+        """{policy: {config: {"win_rate", "avg_cleared", "matches", "aborted"}}} over the cached matches."""
+        matrix = {}
+        for spec in self.policies:
+            row = matrix[spec] = {}
+            for config in self.configs:
+                keys = (match_key(spec, config, seed, self.floors) for seed in self.seeds)
+                results = [self.cache[key] for key in keys if key in self.cache]
+                n = len(results)
+                row[config] = {
+                    "win_rate": sum(r["won"] for r in results) / n if n else None,
+                    "avg_cleared": sum(r["cleared"] for r in results) / n if n else None,
+                    "matches": n,
+                    "aborted": sum(r["aborted"] for r in results),
+                }
+        return matrix
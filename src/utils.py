@@ -1,5 +1,6 @@
 import os
 import sys
+from collections import OrderedDict
 
 # ANSI Color Codes
 CLR = {
@@ -14,8 +15,65 @@ CLR = {
     "WHITE": "\033[97m",
 }
 
+CLEAR_SEQ = "\033[2J\033[H"
+
+class ComponentCache:
+    """Bounded LRU cache of rendered UI fragments with hit/miss counters."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key, build, *args):
+        """Returns the cached fragment for key, building it with build(*args) on a miss."""
+        data = self._data
+        try:
+            value = data[key]
+        except KeyError:
+            self.misses += 1
+            value = data[key] = build(*args)
+            if len(data) > self.maxsize:
+                data.popitem(last=False)
+            return value
+        self.hits += 1
+        data.move_to_end(key)
+        return value
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = 0
+
+COMPONENT_CACHE = ComponentCache()
+
+_ansi_ready = False
+
+def enable_ansi():
+    """Turns on ANSI escape processing for the Windows console (no-op elsewhere)."""
+    global _ansi_ready
+    if _ansi_ready:
+        return
+    _ansi_ready = True
+    if os.name == 'nt':
+        try:
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+            mode = ctypes.c_uint32()
+            if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+                kernel32.SetConsoleMode(handle, mode.value | 0x0004)  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        except Exception:
+            pass
+
 def clear_screen():
-    os.system('cls' if os.name == 'nt' else 'clear')
+    """Clears the terminal with an ANSI sequence instead of spawning a shell."""
+    enable_ansi()
+    sys.stdout.write(CLEAR_SEQ)
+    sys.stdout.flush()
 
 def safe_input(prompt="> "):
     try:
@@ -26,28 +84,49 @@ def safe_input(prompt="> "):
         print(f"\n{CLR['RED']}[!] Input cancelled.{CLR['RESET']}")
         return None
 
+def pause(prompt=""):
+    """Waits for Enter; cancelling simply continues."""
+    try:
+        input(prompt)
+    except (KeyboardInterrupt, EOFError):
+        print()
+
 def get_progress_bar(current, max_val, length=20, full_char="█", empty_char="░", color_mapping=None):
     """Returns a colored progress bar string."""
     percent = max(0, min(100, (current / max_val) * 100))
     filled_length = int(length * percent // 100)
-    bar = full_char * filled_length + empty_char * (length - filled_length)
-    
-    color = CLR["WHITE"]
+    color = _bar_color(percent, color_mapping)
+    # Keyed on what the text depends on, so nearby ratios share an entry
+    return COMPONENT_CACHE.get(("bar", filled_length, int(percent), color, length, full_char, empty_char),
+                               _build_progress_bar, filled_length, int(percent), color, length, full_char, empty_char)
+
+def _bar_color(percent, color_mapping):
     if color_mapping == "HP":
-        if percent > 60: color = CLR["GREEN"]
-        elif percent > 30: color = CLR["YELLOW"]
-        else: color = CLR["RED"]
+        if percent > 60: return "GREEN"
+        elif percent > 30: return "YELLOW"
+        else: return "RED"
     elif color_mapping == "FOCUS":
-        color = CLR["BLUE"]
+        return "BLUE"
     elif color_mapping == "RISK":
-        if percent < 30: color = CLR["GREEN"]
-        elif percent < 70: color = CLR["YELLOW"]
-        else: color = CLR["RED"]
-        
-    return f"{color}[{bar}]{CLR['RESET']} {int(percent)}%"
+        if percent < 30: return "GREEN"
+        elif percent < 70: return "YELLOW"
+        else: return "RED"
+    return "WHITE"
 
-def box_text(lines, width=60, title=None, color="CYAN"):
-    """Wraps lines of text in an ASCII box."""
+def _build_progress_bar(filled_length, percent, color, length, full_char, empty_char):
+    bar = full_char * filled_length + empty_char * (length - filled_length)
+    return f"{CLR[color]}[{bar}]{CLR['RESET']} {percent}%"
+
+def render_box(lines, width=60, title=None, color="CYAN"):
+    """Returns the lines of an ASCII box wrapped around the given text."""
+    top, bottom = COMPONENT_CACHE.get(("box", width, title, color), _build_box_borders, width, title, color)
+    out = [top]
+    for line in lines:
+        out.append(COMPONENT_CACHE.get(("row", line, width, color), _build_box_row, line, width, color))
+    out.append(bottom)
+    return out
+
+def _build_box_borders(width, title, color):
     c = CLR.get(color, CLR["CYAN"])
     reset = CLR["RESET"]
     
@@ -58,38 +137,58 @@ def box_text(lines, width=60, title=None, color="CYAN"):
         title_text = f" {title} "
         top = f"┌─{title_text}{'─' * (width - 4 - len(title_text))}┐"
     
-    print(f"{c}{top}{reset}")
-    for line in lines:
-        content = line[:width-4]
-        padding = " " * (width - 4 - len(content))
-        print(f"{c}│{reset} {content}{padding} {c}│{reset}")
-    print(f"{c}{bottom}{reset}")
+    return f"{c}{top}{reset}", f"{c}{bottom}{reset}"
 
-def print_header(text, color="CYAN"):
+def _build_box_row(line, width, color):
+    c = CLR.get(color, CLR["CYAN"])
+    reset = CLR["RESET"]
+    content = line[:width-4]
+    padding = " " * (width - 4 - len(content))
+    return f"{c}│{reset} {content}{padding} {c}│{reset}"
+
+def box_text(lines, width=60, title=None, color="CYAN"):
+    """Wraps lines of text in an ASCII box."""
+    print("\n".join(render_box(lines, width, title, color)))
+
+def render_header(text, color="CYAN"):
+    """Returns the lines of a full-width header, starting with a blank spacer line."""
+    return list(COMPONENT_CACHE.get(("header", text, color), _build_header, text, color))
+
+def _build_header(text, color):
     width = 60
     c = CLR.get(color, CLR["CYAN"])
-    print(f"\n{c}{'=' * width}")
-    print(f"{CLR['BOLD']}{text.center(width)}{CLR['RESET']}")
-    print(f"{c}{'=' * width}{CLR['RESET']}")
+    return (
+        "",
+        f"{c}{'=' * width}{CLR['RESET']}",
+        f"{c}{CLR['BOLD']}{text.center(width)}{CLR['RESET']}",
+        f"{c}{'=' * width}{CLR['RESET']}",
+    )
+
+def print_header(text, color="CYAN"):
+    print("\n".join(render_header(text, color)))
 
 def print_subheader(text, color="WHITE"):
     c = CLR.get(color, CLR["WHITE"])
     print(f"{c}--- {text} ---{CLR['RESET']}")
 
+PLAYER_ASCII = (
+    "   _O_   ",
+    "    |    ",
+    "   / \\   "
+)
+
+# Default for "Stalker" or others
+DEFAULT_ENEMY_ASCII = (
+    "  / V \\  ",
+    " /  |  \\ ",
+    "  ^---^  "
+)
+
 def get_player_ascii():
-    return [
-        "   _O_   ",
-        "    |    ",
-        "   / \\   "
-    ]
+    return PLAYER_ASCII
 
 def get_enemy_ascii(name):
-    # Default for "Stalker" or others
-    return [
-        "  / V \\  ",
-        " /  |  \\ ",
-        "  ^---^  "
-    ]
+    return DEFAULT_ENEMY_ASCII
 
 def print_logo():
     logo = f"""
@@ -0,0 +1,121 @@
+import json
+import os
+
+import pytest
+
+from src.analytics import DEDUP_SAMPLE, RunReport, _scan_reopened, _scan_task, analyze, analyze_store, iter_array
+from src.storage import RunHistoryStore
+
+GOOD = {"player_name": "ada", "fights": 3, "dominant_decision": "BAIT", "final_hp": "40/100",
+        "scars": ["Shattered Ribs"], "ending_type": "TERMINATED"}
+
+MALFORMED = [
+    {"scars": "Shattered Ribs"},
+    {"scars": [1, 2]},
+    {"fights": "3"},
+    {"fights": None},
+    {"dominant_decision": None},
+    {"player_name": 7},
+    {"ending_type": ["TERMINATED"]},
+]
+
+
+def encode(run):
+    return json.dumps(run).encode("utf-8")
+
+
+def per_record(runs):
+    report = RunReport()
+    for run in runs:
+        report.add_record(run)
+    return report.to_dict()
+
+
+def varied(n):
+    return [dict(GOOD, player_name=f"p{i % 7}", fights=i % 11, final_hp=f"{i % 100}/100",
+                 ending_type="TERMINATED" if i % 3 else "MANUAL_EXIT") for i in range(n)]
+
+
+@pytest.mark.parametrize("repeats", [1, 200])  # distinct lines (batch path) or mostly repeated (dedup path)
+@pytest.mark.parametrize("change", MALFORMED)
+def test_fast_paths_agree_with_add_record_on_malformed_records(change, repeats):
+    runs = varied(20) * repeats + [dict(GOOD, **change)]
+    report = RunReport()
+    report.add_lines([encode(run) for run in runs])
+    assert report.to_dict() == per_record(runs)
+
+
+def test_scars_string_is_skipped_not_split_into_letters():
+    report = RunReport()
+    report.add_lines([encode(run) for run in varied(5) + [dict(GOOD, scars="Shattered Ribs")]])
+    assert report.skipped == 1
+    assert report.runs == 5
+    assert "S" not in report.scars
+
+
+@pytest.mark.parametrize("lines", [
+    [encode(run) for run in varied(50)],
+    [encode(GOOD)] * DEDUP_SAMPLE + [encode(run) for run in varied(10)],
+])
+def test_fast_paths_match_per_record_totals(lines):
+    report = RunReport()
+    report.add_lines(lines)
+    assert report.skipped == 0
+    assert report.to_dict() == per_record(map(json.loads, lines))
+
+
+def test_torn_lines_are_skipped():
+    report = RunReport()
+    report.add_lines([encode(GOOD), b'{"player_name": "to', encode(GOOD)])
+    assert (report.runs, report.skipped) == (2, 1)
+
+
+def test_merged_reports_equal_one_pass():
+    runs = varied(60)
+    first, second, whole = RunReport(), RunReport(), RunReport()
+    first.add_lines([encode(run) for run in runs[:25]])
+    second.add_lines([encode(run) for run in runs[25:]])
+    whole.add_lines([encode(run) for run in runs])
+    assert first.merge(second).to_dict() == whole.to_dict()
+
+
+def test_iter_array_resyncs_after_a_malformed_record(tmp_path):
+    path = tmp_path / "legacy.json"
+    records = [json.dumps(dict(GOOD, fights=i)) for i in range(30)]
+    records[10] = '{"player_name": "bad", "fights": 3,, "scars": []}'
+    path.write_text("[" + ",\n".join(records) + "]")
+    read = list(iter_array(str(path), read_bytes=64))
+    assert read.count(None) == 1
+    assert [r["fights"] for r in read if r is not None] == [i for i in range(30) if i != 10]
+
+
+def test_iter_array_stops_at_a_truncated_tail(tmp_path):
+    path = tmp_path / "legacy.json"
+    path.write_text("[" + ",".join(json.dumps(GOOD) for _ in range(5)) + ', {"player_na')
+    assert list(iter_array(str(path), read_bytes=32)) == [GOOD] * 5
+
+
+def test_analyze_store_counts_legacy_and_segments(tmp_path):
+    legacy = tmp_path / "legacy.json"
+    legacy.write_text(json.dumps([GOOD, GOOD, "not a run"]))
+    store = RunHistoryStore(str(tmp_path / "history"), legacy_file=str(legacy), max_segment_bytes=500)
+    report = analyze_store(store, workers=1)
+    assert (report.runs, report.skipped) == (2, 1)
+    store.append_many(varied(20))
+    report = analyze_store(store, workers=1)
+    assert (report.runs, report.skipped) == (22, 1)
+    assert analyze(store.segment_paths(), workers=1).to_dict() == report.to_dict()
+
+
+def test_worker_scan_declines_a_replaced_file(tmp_path):
+    path = str(tmp_path / "segment.jsonl")
+    with open(path, "wb") as f:
+        f.write(b"".join(encode(run) + b"\n" for run in varied(10)))
+    with open(path, "rb") as snapshot:
+        task = _scan_task((snapshot, 0, os.fstat(snapshot.fileno()).st_size))
+        assert _scan_reopened(task).runs == 10
+        os.remove(path)
+        assert _scan_reopened(task) is None
+        with open(path, "wb") as f:
+            f.write(encode(GOOD) + b"\n")
+        assert _scan_reopened(task) is None
@@ -0,0 +1,104 @@
+import struct
+
+import pytest
+
+from src import checkpoint
+from src.checkpoint import CheckpointError
+from src.engine import GameEngine
+from src.perks import perk_mask
+
+
+def played_engine(seed=7, **kwargs):
+    engine = GameEngine(seed=seed, persist=False, **kwargs)
+    player = engine.player
+    player.name = "Ada"
+    player.hp, player.insight, player.focus, player.risk = 61, 12, 3, 40
+    player.perks = perk_mask(["Iron Resolve", "Adrenaline"])
+    player.permanent_scars = ["Shattered Ribs", "Hollow Gaze"]
+    for action in ["OBSERVE", "BAIT", "ATTACK", "ATTACK", "PRESSURE"] * 30:
+        engine.player_history.append(action)
+    engine.fight_count = 4
+    engine.rng.random()
+    return engine
+
+
+def fresh_engine():
+    return GameEngine(seed=1, persist=False)
+
+
+def test_round_trip_restores_the_run():
+    engine = played_engine(curve={"hp": {"base": 20, "step": 0.5}, "max_floor": 9})
+    restored = fresh_engine()
+    assert checkpoint.decode(checkpoint.encode(engine, 5), restored) == 5
+
+    for stat in ("name", "hp", "max_hp", "insight", "focus", "max_focus", "risk", "perks", "permanent_scars"):
+        assert getattr(restored.player, stat) == getattr(engine.player, stat)
+    assert restored.fight_count == 4
+    assert restored.seed == 7
+    assert restored.curve == engine.curve
+    history, original = restored.player_history, engine.player_history
+    assert len(history) == len(original)
+    assert list(history.runs()) == list(original.runs())
+    assert history.recent() == original.recent()
+    assert history.totals == original.totals
+    assert history.dominant() == original.dominant()
+    assert restored.rng.random() == engine.rng.random()
+
+
+def test_save_and_load_through_a_file(tmp_path):
+    engine = played_engine()
+    path = str(tmp_path / "checkpoint.bin")
+    checkpoint.save(engine, 3, path)
+    assert checkpoint.exists(path)
+    assert checkpoint.load(path, fresh_engine()) == 3
+
+
+def test_damaged_payload_is_rejected():
+    data = bytearray(checkpoint.encode(played_engine(), 2))
+    data[-20] ^= 0xFF
+    with pytest.raises(CheckpointError, match="damaged"):
+        checkpoint.decode(bytes(data), fresh_engine())
+
+
+def test_other_version_is_rejected():
+    data = bytearray(checkpoint.encode(played_engine(), 2))
+    struct.pack_into("<H", data, 4, checkpoint.CHECKPOINT_VERSION + 1)
+    with pytest.raises(CheckpointError, match="version"):
+        checkpoint.decode(bytes(data), fresh_engine())
+
+
+def test_truncated_and_foreign_data_is_rejected():
+    data = checkpoint.encode(played_engine(), 2)
+    with pytest.raises(CheckpointError):
+        checkpoint.decode(data[:5], fresh_engine())
+    with pytest.raises(CheckpointError, match="Not an Outplay"):
+        checkpoint.decode(b"XXXX" + data[4:], fresh_engine())
+    with pytest.raises(CheckpointError):
+        checkpoint.load("/nonexistent/checkpoint.bin", fresh_engine())
+
+
+@pytest.mark.parametrize("seed", [-1, 2 ** 64, 2 ** 70 + 5])
+def test_any_int_seed_checkpoints(seed):
+    engine = played_engine(seed=seed)
+    restored = fresh_engine()
+    checkpoint.decode(checkpoint.encode(engine, 2), restored)
+    assert restored.seed == engine.seed == seed & checkpoint.SEED_MASK
+
+
+def test_long_names_fit():
+    engine = played_engine()
+    engine.player.name = "N" * 70000
+    restored = fresh_engine()
+    checkpoint.decode(checkpoint.encode(engine, 2), restored)
+    assert restored.player.name == engine.player.name
+
+
+def test_unencodable_state_raises_checkpoint_error_and_spares_the_run(tmp_path, capsys):
+    engine = played_engine()
+    engine.player.insight = 2 ** 40
+    with pytest.raises(CheckpointError):
+        checkpoint.encode(engine, 2)
+    engine.checkpoint_path = str(tmp_path / "checkpoint.bin")
+    engine._save_checkpoint(2)
+    assert "Could not save checkpoint" in capsys.readouterr().out
+    assert not checkpoint.exists(engine.checkpoint_path)
@@ -0,0 +1,43 @@
+import pytest
+
+from src import floors
+from src.floors import DEFAULT_CURVE, Tower, merge_curve
+
+
+def test_partial_nested_override_keeps_defaults():
+    tower = Tower({"hp": {"step": 0.25}, "max_floor": 3})
+    assert tower.curve["hp"] == {"base": DEFAULT_CURVE["hp"]["base"], "step": 0.25}
+    assert tower.spec(3).max_hp == int(DEFAULT_CURVE["hp"]["base"] * 1.5)
+    assert [spec.floor for spec in tower] == [1, 2, 3]
+
+
+def test_unknown_keys_are_rejected():
+    with pytest.raises(ValueError, match="'hpp'"):
+        merge_curve({"hpp": {"base": 10}})
+    with pytest.raises(ValueError, match="'hp'.'stepp'"):
+        merge_curve({"hp": {"stepp": 0.1}})
+    with pytest.raises(ValueError, match="mapping"):
+        merge_curve({"hp": 10})
+
+
+def test_default_tower_matches_explicit_defaults():
+    assert merge_curve({}) == DEFAULT_CURVE
+    assert Tower().spec(7) is Tower(DEFAULT_CURVE).spec(7)
+
+
+def test_specs_depend_on_seed_only_when_jittered():
+    assert Tower(seed=1).spec(4) is Tower(seed=2).spec(4)
+    jittered = {"jitter": 3}
+    traits = {Tower(jittered, seed).spec(9)[4:7] for seed in range(20)}
+    assert len(traits) > 1
+    assert Tower(jittered, 5).spec(9) == Tower(jittered, 5).spec(9)
+
+
+def test_spec_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(floors, "SPEC_CACHE_SIZE", 8)
+    floors.clear_cache()
+    tower = Tower({"jitter": 1}, seed=3)
+    for floor in range(1, 50):
+        tower.spec(floor)
+    assert len(floors._SPECS) == 8
+    assert tower.spec(49) is tower.spec(49)
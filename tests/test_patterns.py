@@ -0,0 +1,47 @@
+from src.actions import action_code
+from src.enemy import Enemy
+from src.history import PlayerHistory, RECENT_WINDOW
+from src.patterns import PatternModel
+
+
+def countered(state):
+    return (state - 1) // RECENT_WINDOW
+
+
+def alternating(turns):
+    history = PlayerHistory()
+    for i in range(turns):
+        history.append("BAIT" if i % 2 == 0 else "ATTACK")
+    return history
+
+
+def test_decision_state_counters_the_action_being_answered():
+    enemy = Enemy(pattern_order=1, pattern_decay=1.0)
+    history = alternating(40)  # ends on ATTACK, which the enemy is answering
+    assert countered(enemy.decision_state(history)) == action_code("ATTACK")
+    history.append("BAIT")
+    assert countered(enemy.decision_state(history)) == action_code("BAIT")
+
+
+def test_answered_action_is_predicted_from_the_actions_before_it():
+    enemy = Enemy(pattern_order=1, pattern_decay=1.0)
+    history = alternating(40)
+    enemy.decision_state(history)
+    assert enemy.pattern.seen == len(history) - 1
+    assert enemy.pattern.predict(history, skip=1)[0] == action_code("ATTACK")
+
+
+def test_sync_with_skip_catches_up_like_a_plain_sync():
+    history = alternating(25)
+    staged, plain = PatternModel(order=2), PatternModel(order=2)
+    staged.sync(history, skip=1)
+    staged.sync(history)
+    plain.sync(history)
+    assert staged.fingerprint() == plain.fingerprint()
+    assert staged.predict(history) == plain.predict(history)
+
+
+def test_context_skip_drops_the_latest_actions():
+    history = alternating(6)
+    assert history.context(2, skip=1) == PlayerHistory.context(alternating(5), 2)
+    assert history.context(3, skip=6)[1] == 0
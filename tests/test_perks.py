@@ -0,0 +1,70 @@
+from src.kernel import prepare_turn, resolve_action
+from src.player import Player
+from src.enemy import Enemy
+from src.memory import MemorySystem
+from src.history import PlayerHistory
+from src.perks import PERKS, PERK_NAMES, compile_hooks, perk_mask, perk_names
+
+
+def play(perks, action, enemy_action, **stats):
+    player = Player()
+    player.perks = perk_mask(perks)
+    for stat, value in stats.items():
+        setattr(player, stat, value)
+    enemy = Enemy("Dummy", aggression=5, patience=5, adapt_rate=2)
+    result = prepare_turn(player, enemy, MemorySystem(), PlayerHistory(), action)
+    resolve_action(player, enemy, result, enemy_action)
+    return player, enemy, result
+
+
+def test_bits_are_distinct_powers_of_two():
+    bits = [perk.bit for perk in PERKS]
+    assert len(set(bits)) == len(PERKS)
+    assert all(bit and bit & (bit - 1) == 0 for bit in bits)
+
+
+def test_mask_round_trips_names_in_registry_order():
+    assert perk_names(perk_mask(reversed(PERK_NAMES))) == list(PERK_NAMES)
+    assert perk_names(perk_mask(["Adrenaline", "Iron Resolve"])) == ["Iron Resolve", "Adrenaline"]
+    assert perk_mask([]) == 0
+    assert perk_names(0) == []
+
+
+def test_compiled_hooks_only_include_owned_perks():
+    hooks = compile_hooks(perk_mask(["Focused Mind"]))
+    assert len(hooks.attack_focus_min) == 1 and len(hooks.attack_focus_cost) == 1
+    assert hooks.observe_insight == () and hooks.damage_taken == ()
+    assert compile_hooks(perk_mask(["Focused Mind"])) is hooks
+    assert all(getattr(compile_hooks(0), point) == () for point in hooks.__slots__)
+
+
+def test_keen_insight_and_steady_breath_fire_on_observe():
+    plain, _, _ = play([], "OBSERVE", "DEFEND", focus=5)
+    player, _, result = play(["Keen Insight", "Steady Breath"], "OBSERVE", "DEFEND", focus=5)
+    assert player.insight == plain.insight + 1
+    assert player.focus == plain.focus + 1
+    assert result.perks_triggered == ["Keen Insight", "Steady Breath"]
+
+
+def test_iron_resolve_reduces_damage_taken():
+    plain, _, _ = play([], "OBSERVE", "ATTACK")
+    player, _, result = play(["Iron Resolve"], "OBSERVE", "ATTACK")
+    assert player.hp == plain.hp + 2
+    assert "Iron Resolve" in result.perks_triggered
+
+
+def test_focused_mind_attacks_on_one_focus_for_one_focus():
+    _, _, exhausted = play([], "ATTACK", "DEFEND", focus=1)
+    assert exhausted.outcome == "EXHAUSTED"
+    player, _, result = play(["Focused Mind"], "ATTACK", "DEFEND", focus=1)
+    assert result.outcome == "STRUCK"
+    assert player.focus == 0
+
+
+def test_adrenaline_needs_high_risk():
+    _, _, calm = play(["Adrenaline"], "ATTACK", "ATTACK", risk=0)
+    _, _, plain = play([], "ATTACK", "ATTACK", risk=50)
+    _, _, rushed = play(["Adrenaline"], "ATTACK", "ATTACK", risk=50)
+    assert calm.damage_dealt == plain.damage_dealt
+    assert rushed.damage_dealt == plain.damage_dealt + 4
+    assert rushed.perks_triggered == ["Adrenaline"]
@@ -0,0 +1,97 @@
+import json
+import os
+
+from src.storage import RunHistoryStore
+
+
+def run(i):
+    return {"player_name": f"p{i}", "fights": i, "dominant_decision": "BAIT",
+            "final_hp": "10/100", "scars": [], "ending_type": "TERMINATED"}
+
+
+def make_store(tmp_path, **kwargs):
+    return RunHistoryStore(str(tmp_path / "history"), legacy_file=str(tmp_path / "legacy.json"), **kwargs)
+
+
+def fights(store):
+    return [r["fights"] for r in store.iter_runs()]
+
+
+def test_appends_read_back_in_order(tmp_path):
+    store = make_store(tmp_path)
+    store.append(run(0))
+    store.append_many([run(1), run(2)])
+    store.append_many([])
+    assert fights(store) == [0, 1, 2]
+
+
+def test_torn_line_is_skipped_and_fenced_off(tmp_path):
+    store = make_store(tmp_path)
+    store.append(run(0))
+    with open(store.current_path, "ab") as f:
+        f.write(b'{"player_name": "torn", "fig')
+    assert fights(store) == [0]
+    store.append(run(1))
+    assert fights(store) == [0, 1]
+
+
+def test_rotation_seals_full_segments(tmp_path):
+    store = make_store(tmp_path, max_segment_bytes=300)
+    for i in range(20):
+        store.append(run(i))
+    sealed = json.load(open(store.manifest_path))
+    assert len(sealed) > 1
+    assert store.segment_paths()[-1] == store.current_path
+    assert fights(store) == list(range(20))
+
+
+def test_compaction_merges_segments_and_drops_corrupt_lines(tmp_path):
+    store = make_store(tmp_path, max_segment_bytes=300)
+    for i in range(20):
+        store.append(run(i))
+    first = os.path.join(store.directory, json.load(open(store.manifest_path))[0])
+    with open(first, "ab") as f:
+        f.write(b"not json\n")
+    store.compact()
+    assert len(json.load(open(store.manifest_path))) == 1
+    assert not os.path.exists(first)
+    assert fights(store) == list(range(20))
+
+
+def test_legacy_file_is_migrated_once_as_the_oldest_runs(tmp_path):
+    legacy = tmp_path / "legacy.json"
+    legacy.write_text(json.dumps([run(0), run(1)]))
+    store = make_store(tmp_path)
+    assert store.segment_paths(migrate=False) == []
+    store.append(run(2))
+    assert not legacy.exists()
+    assert (tmp_path / "legacy.json.migrated").exists()
+    assert fights(store) == [0, 1, 2]
+    assert fights(make_store(tmp_path)) == [0, 1, 2]
+
+
+def test_open_segments_snapshot_survives_compaction(tmp_path):
+    store = make_store(tmp_path, max_segment_bytes=300)
+    for i in range(20):
+        store.append(run(i))
+    files = store.open_segments()
+    try:
+        store.compact()
+        store.append(run(20))
+        seen = [json.loads(line)["fights"] for f in files for line in f]
+    finally:
+        for f in files:
+            f.close()
+    assert seen[:20] == list(range(20))
+
+
+def test_open_segments_can_include_the_unmigrated_legacy_file(tmp_path):
+    legacy = tmp_path / "legacy.json"
+    legacy.write_text(json.dumps([run(0)]))
+    store = make_store(tmp_path)
+    files = store.open_segments(migrate=False, legacy=True)
+    try:
+        assert [f.name for f in files] == [str(legacy)]
+    finally:
+        for f in files:
+            f.close()
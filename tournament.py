@@ -0,0 +1,79 @@
+"""
+Policy tournament runner.
+
+    python tournament.py                                  # default policies x enemy grid x 8 seeds
+    python tournament.py --policies random,striker,mcts:500 --aggression 3,6,9 --seeds 20
+    python tournament.py --json matrix.json
+
+Matches are cached in tournament_cache.json; re-runs only play new cells.
+See src/tournament.py.
+"""
+import argparse
+import itertools
+import json
+import sys
+import time
+
+from src.tournament import Tournament
+
+
+def int_list(text):
+    return [int(x) for x in text.split(",")]
+
+
+def print_matrix(matrix, configs):
+    policies = list(matrix)
+    print(f"{'enemy (agg/pat/adapt)':<22}" + "".join(f"{spec:>18}" for spec in policies))
+    for config in configs:
+        cells = []
+        for spec in policies:
+            cell = matrix[spec][config]
+            if cell["matches"]:
+                cells.append(f"{cell['win_rate']:>7.0%} {cell['avg_cleared']:>5.1f}fl")
+            else:
+                cells.append("-")
+        print(f"{'/'.join(map(str, config)):<22}" + "".join(f"{cell:>18}" for cell in cells))
+    print("\ncells: summit win rate, average floors cleared")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Outplay policy tournament")
+    parser.add_argument("--policies", default="random,cycle,striker,mcts:200",
+                        help="Comma-separated policy specs (random, cycle, striker, mcts:ITERATIONS).")
+    parser.add_argument("--aggression", type=int_list, default=[3, 6, 9])
+    parser.add_argument("--patience", type=int_list, default=[3, 6])
+    parser.add_argument("--adapt", type=int_list, default=[2, 5])
+    parser.add_argument("--seeds", type=int, default=8, help="Tower seeds per cell (0..N-1).")
+    parser.add_argument("--floors", type=int, default=10, help="Tower height; the summit is a win.")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU).")
+    parser.add_argument("--cache", default="tournament_cache.json", help="Match cache file.")
+    parser.add_argument("--json", metavar="FILE", help="Also write the matrix as JSON.")
+    args = parser.parse_args()
+
+    configs = list(itertools.product(args.aggression, args.patience, args.adapt))
+    try:
+        tournament = Tournament(args.policies.split(","), configs, range(args.seeds),
+                                floors=args.floors, cache_path=args.cache, workers=args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+
+    def progress(done, total):
+        sys.stderr.write(f"\r{done}/{total} matches")
+        sys.stderr.flush()
+
+    started = time.perf_counter()
+    matrix = tournament.run(progress)
+    elapsed = time.perf_counter() - started
+    if tournament.played:
+        sys.stderr.write("\n")
+    print_matrix(matrix, configs)
+    total = len(tournament.jobs())
+    print(f"{tournament.played} of {total} matches played in {elapsed:.1f}s ({total - tournament.played} cached)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({spec: {"/".join(map(str, config)): cell for config, cell in row.items()}
+                       for spec, row in matrix.items()}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()